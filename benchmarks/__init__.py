@@ -0,0 +1,7 @@
+"""
+Benchmarks timing each StoreABC operation against the store implementations. Run with:
+
+python -m benchmarks --sizes 1000 10000 --output results.json
+
+Results are emitted as json so runs may be compared between versions.
+"""
@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+
+from benchmarks.benchmark_backend import BACKENDS
+from benchmarks.benchmark_fixture import FIXTURES
+from benchmarks.benchmark_runner import run_benchmarks
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time store operations, outputting results as json",
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS)
+    )
+    parser.add_argument(
+        "--fixtures", nargs="+", choices=list(FIXTURES), default=list(FIXTURES)
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[1000],
+        help="Number of items with which to populate each store (e.g.: 1000 10000 100000 1000000)",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=1000,
+        help="Max number of items used for read, read_batch and edit_batch",
+    )
+    parser.add_argument("--output", help="File to which results are written")
+    parsed = parser.parse_args(args)
+    run = run_benchmarks(
+        backends=[BACKENDS[b] for b in parsed.backends],
+        fixtures=[FIXTURES[f] for f in parsed.fixtures],
+        sizes=parsed.sizes,
+        sample=parsed.sample,
+    )
+    if parsed.output:
+        with open(parsed.output, "w") as writer:
+            json.dump(run.to_json(), writer, indent=2)
+    else:
+        json.dump(run.to_json(), sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Iterator
+
+from persisty.impl.mem.mem_store_factory import MemStoreFactory
+from persisty.store.store_abc import StoreABC
+from persisty.store_meta import StoreMeta
+
+
+@dataclass(frozen=True)
+class BenchmarkBackend:
+    """
+    Backend against which benchmarks are run. new_store returns a context manager yielding an empty store
+    for the meta given, and cleaning up any resources associated with it on exit.
+    """
+
+    name: str
+    new_store: Callable[[StoreMeta], ContextManager[StoreABC]]
+
+
+@contextmanager
+def mem_store(store_meta: StoreMeta) -> Iterator[StoreABC]:
+    sorted_attr_names = tuple(a.name for a in store_meta.attrs if a.sortable)
+    yield MemStoreFactory(triggers=False, sorted_attr_names=sorted_attr_names).create(
+        store_meta
+    )
+
+
+@contextmanager
+def sqlite_store(store_meta: StoreMeta) -> Iterator[StoreABC]:
+    from sqlalchemy import create_engine
+    from persisty.impl.sqlalchemy.sqlalchemy_context import SqlalchemyContext
+    from persisty.impl.sqlalchemy.sqlalchemy_table_store_factory import (
+        SqlalchemyTableStoreFactory,
+    )
+
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    try:
+        context = SqlalchemyContext(engine, developer_mode=True)
+        yield SqlalchemyTableStoreFactory(context, triggers=False).create(store_meta)
+    finally:
+        engine.dispose()
+
+
+@contextmanager
+def dynamodb_store(store_meta: StoreMeta) -> Iterator[StoreABC]:
+    """
+    Dynamodb store backed by moto. If AWS_ENDPOINT_URL_DYNAMODB is set (e.g.: to point at dynamodb local),
+    the endpoint is used directly instead.
+    """
+    from persisty.impl.dynamodb.dynamodb_store_factory import DynamodbStoreFactory
+
+    if os.environ.get("AWS_ENDPOINT_URL_DYNAMODB"):
+        mock = None
+    else:
+        from moto import mock_dynamodb
+
+        mock = mock_dynamodb()
+        mock.start()
+    try:
+        store_factory = DynamodbStoreFactory()
+        store_factory.derive_from_meta(store_meta)
+        store_factory.create_table_in_aws(store_meta)
+        try:
+            yield store_factory.create(store_meta)
+        finally:
+            dynamodb = store_factory.get_session().client("dynamodb")
+            dynamodb.delete_table(TableName=store_factory.table_name)
+    finally:
+        if mock:
+            mock.stop()
+
+
+BACKENDS = {
+    "mem": BenchmarkBackend("mem", mem_store),
+    "sqlite": BenchmarkBackend("sqlite", sqlite_store),
+    "dynamodb": BenchmarkBackend("dynamodb", dynamodb_store),
+}
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Generic, Iterator, Optional, Type, TypeVar
+from uuid import UUID
+
+from persisty.search_filter.filter_factory import filter_factory
+from persisty.search_filter.search_filter_abc import SearchFilterABC
+from persisty.search_order.search_order import SearchOrder
+from tests.fixtures.book import Book
+from tests.fixtures.number_name import NumberName, NUMBER_NAMES
+from tests.fixtures.super_bowl_results import SuperBowlResult, SUPER_BOWL_RESULTS
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class BenchmarkFixture(Generic[T]):
+    """
+    Scalable source of items for benchmarks, derived from the test fixtures. Items are generated by index so
+    that any number of distinct items may be produced.
+    """
+
+    name: str
+    type_: Type[T]
+    new_item: Callable[[int], T]
+    # Creates an item containing only the key of the stored item given and some updated values
+    new_update: Callable[[T], T]
+    # Filter matching roughly half of the items in a store of the size given
+    half_filter: Callable[[int], SearchFilterABC[T]]
+    search_order: Optional[SearchOrder[T]] = None
+
+    def generate(self, size: int) -> Iterator[T]:
+        for index in range(size):
+            yield self.new_item(index)
+
+
+def _number_name(index: int) -> NumberName:
+    template = NUMBER_NAMES[index % len(NUMBER_NAMES)]
+    timestamp = datetime.fromtimestamp(index, tz=timezone.utc)
+    return NumberName(
+        id=UUID(int=index + 1),
+        title=f"{template.title} {index}",
+        num_value=index,
+        created_at=timestamp,
+        updated_at=timestamp,
+    )
+
+
+def _number_name_update(item: NumberName) -> NumberName:
+    return NumberName(id=item.id, title=f"Updated {item.title}")
+
+
+def _super_bowl_result(index: int) -> SuperBowlResult:
+    template = SUPER_BOWL_RESULTS[index % len(SUPER_BOWL_RESULTS)]
+    return SuperBowlResult(
+        code=f"{template.code}_{index}",
+        result_year=template.result_year + index // len(SUPER_BOWL_RESULTS),
+        result_date=template.result_date + timedelta(days=index),
+        winner_code=template.winner_code,
+        runner_up_code=template.runner_up_code,
+        winner_score=template.winner_score,
+        runner_up_score=template.runner_up_score,
+    )
+
+
+def _super_bowl_result_update(item: SuperBowlResult) -> SuperBowlResult:
+    return SuperBowlResult(code=item.code, winner_score=item.winner_score + 1)
+
+
+def _book(index: int) -> Book:
+    # Book ids are generated by the store
+    return Book(title=f"Book {index}", author_id=str(index % 2 + 1))
+
+
+def _book_update(item: Book) -> Book:
+    return Book(id=item.id, title=f"Updated {item.title}")
+
+
+FIXTURES = {
+    "number_name": BenchmarkFixture(
+        name="number_name",
+        type_=NumberName,
+        new_item=_number_name,
+        new_update=_number_name_update,
+        half_filter=lambda size: filter_factory(NumberName).num_value.lt(size // 2),
+        search_order=filter_factory(NumberName).num_value.desc(),
+    ),
+    "super_bowl_result": BenchmarkFixture(
+        name="super_bowl_result",
+        type_=SuperBowlResult,
+        new_item=_super_bowl_result,
+        new_update=_super_bowl_result_update,
+        half_filter=lambda size: filter_factory(SuperBowlResult).winner_score.gte(30),
+        search_order=filter_factory(SuperBowlResult).result_year.asc(),
+    ),
+    "book": BenchmarkFixture(
+        name="book",
+        type_=Book,
+        new_item=_book,
+        new_update=_book_update,
+        half_filter=lambda size: filter_factory(Book).author_id.eq("1"),
+    ),
+}
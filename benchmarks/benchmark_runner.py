@@ -0,0 +1,161 @@
+import platform
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from marshy import dump
+
+from benchmarks.benchmark_backend import BenchmarkBackend
+from benchmarks.benchmark_fixture import BenchmarkFixture
+from persisty.batch_edit import BatchEdit
+from persisty.errors import PersistyError
+from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.store.store_abc import StoreABC
+from persisty.store_meta import get_meta
+from persisty.util.undefined import UNDEFINED
+
+
+@dataclass
+class BenchmarkResult:
+    backend: str
+    fixture: str
+    size: int
+    operation: str
+    # Number of operations (Items created / read / edited, pages loaded, etc) timed
+    ops: int
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def seconds_per_op(self) -> Optional[float]:
+        if self.seconds is None or not self.ops:
+            return None
+        return self.seconds / self.ops
+
+
+@dataclass
+class BenchmarkRun:
+    started_at: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
+    python_version: str = field(default_factory=lambda: sys.version.split()[0])
+    platform: str = field(default_factory=platform.platform)
+    results: List[BenchmarkResult] = field(default_factory=list)
+
+    def to_json(self) -> Dict:
+        result = dump(self)
+        for dumped, benchmark_result in zip(result["results"], self.results):
+            dumped["seconds_per_op"] = benchmark_result.seconds_per_op
+        return result
+
+
+def run_benchmark(
+    backend: BenchmarkBackend, fixture: BenchmarkFixture, size: int, sample: int
+) -> Iterator[BenchmarkResult]:
+    """
+    Time each store operation against a new store for the backend and fixture given, populated with size
+    items. Operations on individual items (read, read_batch, edit_batch) use at most sample items. Operations
+    which a store rejects (e.g.: sorting a large dynamodb table locally) are reported with an error code
+    rather than a time.
+    """
+    store_meta = get_meta(fixture.type_)
+    with backend.new_store(store_meta) as store:
+        for operation, ops, fn in _get_operations(store, fixture, size, sample):
+            result = BenchmarkResult(backend.name, fixture.name, size, operation, ops)
+            start = perf_counter()
+            try:
+                fn()
+                result.seconds = perf_counter() - start
+            except PersistyError as e:
+                result.error = str(e)
+            yield result
+
+
+def _get_operations(
+    store: StoreABC, fixture: BenchmarkFixture, size: int, sample: int
+) -> Iterator[Tuple[str, int, Callable[[], Any]]]:
+    key_config = store.get_meta().key_config
+    batch_size = store.get_meta().batch_size
+    sample_step = max(size // sample, 1)
+    # Keys may be generated by the store, so the sample is taken from the created items
+    sample_items = []
+    keys = []
+    search_order = fixture.search_order
+
+    def create():
+        for index, item in enumerate(fixture.generate(size)):
+            item = store.create(item)
+            if not index % sample_step and len(sample_items) < sample:
+                sample_items.append(item)
+        keys.extend(key_config.to_key_str(item) for item in sample_items)
+
+    def read():
+        for key in keys:
+            store.read(key)
+
+    def read_batch():
+        for index in range(0, len(keys), batch_size):
+            store.read_batch(keys[index : index + batch_size])
+
+    yield "create", size, create
+    yield "read", min(size, sample), read
+    yield "read_batch", min(size, sample), read_batch
+    yield "search", 1, store.search
+    if search_order:
+        yield "search_ordered", 1, lambda: store.search(search_order=search_order)
+
+    # The page keys collected while paging are used to time loading the last page directly
+    page_keys = []
+    pages = max((size + batch_size - 1) // batch_size, 1)
+    yield "page_all", pages, lambda: page_keys.extend(_page_through(store, fixture))
+
+    def deep_page():
+        if not page_keys:
+            raise PersistyError("no_page_keys")
+        store.search(search_order=search_order, page_key=page_keys[-1])
+
+    if size > batch_size:
+        yield "deep_page", 1, deep_page
+
+    yield "count", 1, store.count
+    yield "count_filtered", 1, lambda: store.count(fixture.half_filter(size))
+
+    def edit_batch():
+        edits = [BatchEdit(update_item=fixture.new_update(i)) for i in sample_items]
+        for index in range(0, len(edits), batch_size):
+            store.edit_batch(edits[index : index + batch_size])
+
+    def update_all():
+        updates = fixture.new_update(sample_items[0])
+        for attr_name in key_config.get_key_attrs():
+            setattr(updates, attr_name, UNDEFINED)
+        store.update_all(fixture.half_filter(size), updates)
+
+    yield "edit_batch", min(size, sample), edit_batch
+    yield "update_all", 1, update_all
+    yield "delete_all", 1, lambda: store.delete_all(INCLUDE_ALL)
+
+
+def _page_through(store: StoreABC, fixture: BenchmarkFixture) -> Iterator[str]:
+    """Load every page in order, yielding the key of each page after the first"""
+    page_key = None
+    while True:
+        result_set = store.search(search_order=fixture.search_order, page_key=page_key)
+        page_key = result_set.next_page_key
+        if not page_key:
+            return
+        yield page_key
+
+
+def run_benchmarks(
+    backends: List[BenchmarkBackend],
+    fixtures: List[BenchmarkFixture],
+    sizes: List[int],
+    sample: int,
+) -> BenchmarkRun:
+    run = BenchmarkRun()
+    for size in sizes:
+        for backend in backends:
+            for fixture in fixtures:
+                run.results.extend(run_benchmark(backend, fixture, size, sample))
+    return run
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Tuple, Optional, Any
+from operator import attrgetter
+from typing import Tuple, Optional, Any, Callable
 
 import marshy
 
@@ -7,6 +8,7 @@ from persisty.attr.attr import Attr
 from persisty.attr.attr_filter_op import AttrFilterOp
 from persisty.errors import PersistyError
 from persisty.search_filter.search_filter_abc import SearchFilterABC, T
+from persisty.util.undefined import UNDEFINED
 
 
 @dataclass(frozen=True)
@@ -19,7 +21,10 @@ class AttrFilter(SearchFilterABC[T]):
         try:
             attr = next(attr for attr in attrs if attr.name == self.name)
             assert attr.readable and self.op in attr.permitted_filter_ops
-            value = attr.sanitize_type(self.value)
+            if self.op == AttrFilterOp.oneof:
+                value = tuple(attr.sanitize_type(v) for v in self.value)
+            else:
+                value = attr.sanitize_type(self.value)
             return AttrFilter(self.name, self.op, value)
         except (StopIteration, AssertionError) as exc:
             raise PersistyError("attr_filter_invalid_for_attrs") from exc
@@ -32,6 +37,29 @@ class AttrFilter(SearchFilterABC[T]):
         except TypeError:
             return False  # Comparison failed
 
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        getter = attrgetter(self.name)
+        op = self.op
+        value = self.value
+        if op in _STR_OPS:
+            value = str(value).lower()
+            return _STR_OPS[op](getter, value)
+        if op == AttrFilterOp.exists:
+            return lambda item: getter(item) not in (None, UNDEFINED)
+        if op == AttrFilterOp.not_exists:
+            return lambda item: getter(item) in (None, UNDEFINED)
+        if op == AttrFilterOp.oneof:
+            return _compile_oneof(getter, value)
+        fn = op.value
+
+        def match(item: T) -> bool:
+            try:
+                return fn(getter(item), value)
+            except TypeError:
+                return False  # Comparison failed
+
+        return match
+
     def build_filter_expression(
         self, attrs: Tuple[Attr, ...]
     ) -> Tuple[Optional[Any], bool]:
@@ -55,5 +83,45 @@ class AttrFilter(SearchFilterABC[T]):
         return None, False
 
 
+def _compile_contains(getter: Callable, value: str) -> Callable[[T], bool]:
+    return lambda item: value in str(getter(item)).lower()
+
+
+def _compile_startswith(getter: Callable, value: str) -> Callable[[T], bool]:
+    return lambda item: str(getter(item)).lower().startswith(value)
+
+
+def _compile_endswith(getter: Callable, value: str) -> Callable[[T], bool]:
+    return lambda item: str(getter(item)).lower().endswith(value)
+
+
+_STR_OPS = {
+    AttrFilterOp.contains: _compile_contains,
+    AttrFilterOp.startswith: _compile_startswith,
+    AttrFilterOp.endswith: _compile_endswith,
+}
+
+
+def _compile_oneof(getter: Callable, value: Any) -> Callable[[T], bool]:
+    values = value
+    if isinstance(value, (list, tuple, set)):
+        try:
+            values = frozenset(value)
+        except TypeError:
+            pass  # Some values were not hashable
+
+    def match(item: T) -> bool:
+        item_value = getter(item)
+        try:
+            return item_value in values
+        except TypeError:
+            try:
+                return item_value in value
+            except TypeError:
+                return False
+
+    return match
+
+
 def attr_eq(name: str, value: T):
     return AttrFilter(name, AttrFilterOp.eq, value)
@@ -11,19 +11,23 @@ U = TypeVar("U")
 @dataclass
 class BatchEdit(Generic[C, U]):
     """
-    Batch edit should define one of create_item, update_item, or delete_key. Defining multiple is not valid.
+    Batch edit should define one of create_item, update_item, upsert_item or delete_key. Defining multiple is
+    not valid. An upsert_item is created if no item with the same key exists, and updated otherwise.
     """
 
     id: UUID = field(default_factory=uuid4)
     create_item: Optional[C] = None
     update_item: Optional[U] = None
     delete_key: Optional[str] = None
+    upsert_item: Optional[C] = None
 
     def get_key(self, key_config: KeyConfigABC) -> str:
         if self.create_item:
             return key_config.to_key_str(self.create_item)
         if self.update_item:
             return key_config.to_key_str(self.update_item)
+        if self.upsert_item:
+            return key_config.to_key_str(self.upsert_item)
         return self.delete_key
 
 
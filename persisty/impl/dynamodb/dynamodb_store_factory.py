@@ -35,6 +35,10 @@ class DynamodbStoreFactory(StoreFactoryABC):
     index: Optional[PartitionSortIndex] = None
     global_secondary_indexes: Optional[Dict[str, PartitionSortIndex]] = None
     referential_integrity: bool = False
+    # If set, full table scans are split into this many segments, scanned in parallel
+    scan_segments: Optional[int] = None
+    # If set, batch edits use TransactWriteItems, so each batch is atomic
+    transactional: bool = False
 
     def create(self, store_meta: StoreMeta) -> StoreABC:
         store = DynamodbTableStore(
@@ -44,6 +48,8 @@ class DynamodbStoreFactory(StoreFactoryABC):
             global_secondary_indexes=self.global_secondary_indexes or {},
             aws_profile_name=self.aws_profile_name,
             region_name=self.region_name,
+            scan_segments=self.scan_segments,
+            transactional=self.transactional,
         )
         store = SchemaValidatingStore(store)
         store = restrict_access_store(store, store_meta.store_access)
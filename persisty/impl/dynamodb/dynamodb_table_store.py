@@ -1,17 +1,38 @@
 import os
-from copy import deepcopy
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import Optional, Dict, Tuple, List, Set
+from functools import partial
+from itertools import islice
+from queue import Full, Queue
+from threading import Event
+from time import sleep
+from typing import (
+    Optional,
+    Dict,
+    Tuple,
+    List,
+    Set,
+    Callable,
+    Iterator,
+    Iterable,
+    Union,
+)
 from dataclasses import dataclass, field
 
 import boto3
 import marshy
-from boto3.dynamodb.conditions import Not as DynNot, ConditionBase, Key
+from boto3.dynamodb.conditions import (
+    Not as DynNot,
+    ConditionBase,
+    ConditionExpressionBuilder,
+    Key,
+)
 from botocore.exceptions import ClientError
 from marshy.types import ExternalItemType
 
-from persisty.attr.attr import Attr
-from persisty.attr.generator.attr_value_generator_abc import AttrValueGeneratorABC
+from persisty.attr.attr_type import AttrType
 from persisty.errors import PersistyError
 from persisty.impl.dynamodb.partition_sort_index import PartitionSortIndex
 from persisty.search_filter.and_filter import And
@@ -26,10 +47,16 @@ from persisty.search_order.search_order import SearchOrder
 from persisty.store.store_abc import StoreABC, T
 from persisty.store_meta import StoreMeta
 from persisty.util import filter_none, get_logger
+from persisty.util.codegen import compile_function
 from persisty.util.undefined import UNDEFINED
 
 logger = get_logger(__name__)
 
+# Maximum number of keys in a single BatchGetItem request
+_MAX_BATCH_GET_KEYS = 100
+# Maximum number of actions in a single TransactWriteItems request
+_MAX_TRANSACT_ITEMS = 100
+
 
 def catch_client_error(fn):
     def wrapper(*args, **kwargs):
@@ -58,6 +85,16 @@ class DynamodbTableStore(StoreABC[T]):
     )
     decimal_format: str = "%.9f"
     max_local_search_size: int = None
+    # Maximum number of concurrent requests for a single read
+    max_workers: int = 4
+    # Retries for unprocessed keys, with a delay of up to retry_base_delay * 2**attempt seconds before each
+    max_retries: int = 8
+    retry_base_delay: float = 0.05
+    # If set, searches and counts requiring a full table scan use a parallel scan with this many segments
+    scan_segments: Optional[int] = None
+    # If set, batch edits are atomic (Provided the batch_size is at most 100) and updates only write changed
+    # attributes, at around twice the cost
+    transactional: bool = False
 
     def __post_init__(self):
         if self.max_local_search_size is None:
@@ -76,6 +113,14 @@ class DynamodbTableStore(StoreABC[T]):
         loaded = self._load(item)
         return loaded
 
+    @catch_client_error
+    def upsert(self, item: T) -> T:
+        """Unconditional put, replacing any existing item with the same key in a single request"""
+        item = self._dump_create(item)
+        self._dynamodb_table().put_item(Item=item)
+        loaded = self._load(item)
+        return loaded
+
     @catch_client_error
     def read(self, key: str) -> Optional[T]:
         table = self._dynamodb_table()
@@ -86,30 +131,74 @@ class DynamodbTableStore(StoreABC[T]):
         loaded = self._load(response.get("Item"))
         return loaded
 
-    @catch_client_error
     def read_batch(self, keys: List[str]) -> List[Optional[T]]:
         assert len(keys) <= self.meta.batch_size
-        key_config = self.meta.key_config
-        resource = self._dynamodb_resource()
+        return self._read_keys(keys)
+
+    def read_all(
+        self, keys: Union[Iterator[str], Iterable[str]]
+    ) -> Iterator[Optional[T]]:
+        """Keys are read in windows large enough to give every worker a full BatchGetItem request"""
+        keys = iter(keys)
+        window_size = _MAX_BATCH_GET_KEYS * self.max_workers
+        while True:
+            window = list(islice(keys, window_size))
+            if not window:
+                return
+            yield from self._read_keys(window)
 
-        kwargs = {
-            "RequestItems": {
-                self.table_name: {
-                    "Keys": [key_config.to_key_dict(key) for key in set(keys)]
-                }
-            }
-        }
+    @catch_client_error
+    def _read_keys(self, keys: List[str]) -> List[Optional[T]]:
+        """
+        Read the keys given using BatchGetItem requests of at most 100 keys, issued concurrently where there
+        is more than one.
+        """
+        key_config = self.meta.key_config
+        unique_keys = list(dict.fromkeys(keys))
+        chunks = [
+            [
+                key_config.to_key_dict(key)
+                for key in unique_keys[i : i + _MAX_BATCH_GET_KEYS]
+            ]
+            for i in range(0, len(unique_keys), _MAX_BATCH_GET_KEYS)
+        ]
+        if len(chunks) <= 1:
+            items = self._batch_get_item(chunks[0]) if chunks else []
+        else:
+            # Boto3 clients (unlike resources) are thread safe, so a single client is created up front and
+            # shared between workers
+            self._dynamodb_client()
+            with ThreadPoolExecutor(min(self.max_workers, len(chunks))) as executor:
+                items = [
+                    i for c in executor.map(self._batch_get_item, chunks) for i in c
+                ]
         results_by_key = {}
-        response = resource.batch_get_item(**kwargs)
-        for item in response["Responses"][self.table_name]:
+        for item in items:
             loaded = self._load(item)
-            key = key_config.to_key_str(loaded)
-            results_by_key[key] = loaded
-        assert not response.get(
-            "UnprocessedKeys"
-        )  # Batch size would have been greater than 16 Mb
+            results_by_key[key_config.to_key_str(loaded)] = loaded
         return [results_by_key.get(key) for key in keys]
 
+    def _batch_get_item(self, keys: List[ExternalItemType]) -> List[ExternalItemType]:
+        """
+        Issue a BatchGetItem request, retrying any unprocessed keys (Due to throttling or the 16Mb response
+        limit) with exponential backoff and full jitter
+        """
+        client = self._dynamodb_client()
+        request_items = {self.table_name: {"Keys": keys}}
+        items = []
+        attempt = 0
+        while True:
+            response = client.batch_get_item(RequestItems=request_items)
+            items.extend(response["Responses"].get(self.table_name, []))
+            request_items = response.get("UnprocessedKeys")
+            if not request_items:
+                break
+            if attempt >= self.max_retries:
+                raise PersistyError(f"unprocessed_keys:{self.table_name}")
+            sleep(random.uniform(0, self.retry_base_delay * (2**attempt)))
+            attempt += 1
+        return items
+
     @catch_client_error
     def update(
         self, updates: T, precondition: SearchFilterABC = INCLUDE_ALL
@@ -170,6 +259,67 @@ class DynamodbTableStore(StoreABC[T]):
             search_order.validate_for_attrs(self.meta.attrs)
         if search_filter is EXCLUDE_ALL:
             return ResultSet([])
+        (
+            query_args,
+            index,
+            other_filter,
+            search_filter_handled_natively,
+        ) = self._get_search_args(search_filter, search_order)
+        search_order_handled_natively = _is_search_order_handled_natively(
+            index, search_order
+        )
+        if search_order_handled_natively:
+            return self._search_native_order(
+                query_args,
+                index,
+                other_filter,
+                search_filter_handled_natively,
+                page_key,
+                limit,
+            )
+        return self._search_local_order(
+            query_args,
+            index,
+            other_filter,
+            search_filter_handled_natively,
+            search_order,
+            page_key,
+            limit,
+        )
+
+    def search_all(
+        self,
+        search_filter: SearchFilterABC[T] = INCLUDE_ALL,
+        search_order: Optional[SearchOrder[T]] = None,
+    ) -> Iterator[T]:
+        """
+        If scan_segments is set, unordered searches which require a scan use a parallel scan, with each
+        segment scanned in a separate thread. Items are yielded as pages arrive from any segment.
+        """
+        if self._is_parallel_scan_possible(search_order):
+            search_filter = search_filter.lock_attrs(self.meta.attrs)
+            if search_filter is EXCLUDE_ALL:
+                return
+            (
+                query_args,
+                index,
+                other_filter,
+                search_filter_handled_natively,
+            ) = self._get_search_args(search_filter, None)
+            if not index:
+                yield from self._parallel_scan(
+                    query_args, other_filter, search_filter_handled_natively
+                )
+                return
+        yield from super().search_all(search_filter, search_order)
+
+    def _get_search_args(
+        self, search_filter: SearchFilterABC, search_order: Optional[SearchOrder]
+    ) -> Tuple[Dict, Optional[PartitionSortIndex], Optional[SearchFilterABC], bool]:
+        """
+        Get the arguments for a query / scan, along with the index used (if any), the part of the search
+        filter not handled by the index and whether it is handled natively
+        """
         index_name, index = self._get_index_for_search(search_filter, search_order)
         key_filter, other_filter = _separate_index_from_filter(index, search_filter)
         if other_filter:
@@ -192,27 +342,76 @@ class DynamodbTableStore(StoreABC[T]):
                 "ScanIndexForward": _get_scan_index_forward(index, search_order),
             }
         )
-        search_order_handled_natively = _is_search_order_handled_natively(
-            index, search_order
-        )
-        if search_order_handled_natively:
-            return self._search_native_order(
-                query_args,
-                index,
-                other_filter,
-                search_filter_handled_natively,
-                page_key,
-                limit,
-            )
-        return self._search_local_order(
-            query_args,
-            index,
-            other_filter,
-            search_filter_handled_natively,
-            search_order,
-            page_key,
-            limit,
-        )
+        return query_args, index, other_filter, search_filter_handled_natively
+
+    def _is_parallel_scan_possible(self, search_order: Optional[SearchOrder]) -> bool:
+        if not self.scan_segments or self.scan_segments < 2:
+            return False
+        return not (search_order and search_order.orders)
+
+    def _parallel_scan(
+        self,
+        scan_args: Dict,
+        search_filter: Optional[SearchFilterABC],
+        search_filter_handled_natively: bool,
+    ) -> Iterator[T]:
+        """
+        Scan all segments concurrently. Pages are passed back through a bounded queue, so segments do not get
+        too far ahead of the consumer. If the consumer stops early, the remaining scans are abandoned.
+        """
+        total_segments = self.scan_segments
+        client = self._dynamodb_client()
+        pages = Queue(maxsize=total_segments * 2)
+        stopped = Event()
+
+        def put(value):
+            while not stopped.is_set():
+                try:
+                    pages.put(value, timeout=0.1)
+                    return
+                except Full:
+                    pass
+
+        def scan_segment(segment: int):
+            kwargs = {
+                **scan_args,
+                "TableName": self.table_name,
+                "Segment": segment,
+                "TotalSegments": total_segments,
+            }
+            try:
+                while not stopped.is_set():
+                    response = client.scan(**kwargs)
+                    put(response)
+                    last_evaluated_key = response.get("LastEvaluatedKey")
+                    if not last_evaluated_key:
+                        break
+                    kwargs["ExclusiveStartKey"] = last_evaluated_key
+            # pylint: disable=W0703
+            except Exception as e:
+                put(e)  # Raised by the consumer
+            finally:
+                put(None)  # Segment complete
+
+        with ThreadPoolExecutor(total_segments) as executor:
+            for segment in range(total_segments):
+                executor.submit(scan_segment, segment)
+            try:
+                remaining = total_segments
+                while remaining:
+                    response = pages.get()
+                    if response is None:
+                        remaining -= 1
+                    elif isinstance(response, ClientError):
+                        raise PersistyError(response) from response
+                    elif isinstance(response, Exception):
+                        raise response
+                    else:
+                        yield from self._load_items(
+                            response, search_filter, search_filter_handled_natively
+                        )
+            finally:
+                stopped.set()
 
     # pylint: disable=R0913
     def _search_native_order(
@@ -309,6 +508,12 @@ class DynamodbTableStore(StoreABC[T]):
                 "FilterExpression": filter_expression,
             }
         )
+        if not index and self._is_parallel_scan_possible(None):
+            with ThreadPoolExecutor(self.scan_segments) as executor:
+                counts = executor.map(
+                    partial(self._count_segment, kwargs), range(self.scan_segments)
+                )
+                return sum(counts)
         table = self._dynamodb_table()
         count = 0
         while True:
@@ -322,6 +527,23 @@ class DynamodbTableStore(StoreABC[T]):
             if not last_evaluated_key:
                 return count
 
+    def _count_segment(self, scan_args: Dict, segment: int) -> int:
+        client = self._dynamodb_client()
+        kwargs = {
+            **scan_args,
+            "TableName": self.table_name,
+            "Segment": segment,
+            "TotalSegments": self.scan_segments,
+        }
+        count = 0
+        while True:
+            response = client.scan(**kwargs)
+            count += response["Count"]
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if not last_evaluated_key:
+                return count
+            kwargs["ExclusiveStartKey"] = last_evaluated_key
+
     def _to_key_condition_expression(self, key_filter: Optional[AttrFilter]):
         if not key_filter:
             return
@@ -330,10 +552,24 @@ class DynamodbTableStore(StoreABC[T]):
         value = marshy.dump(key_filter.value, attr.schema.python_type)
         return Key(key_filter.name).eq(value)
 
+    def is_edit_batch_atomic(self) -> bool:
+        # Batches larger than a single transaction are applied in multiple transactions, so are not atomic
+        return self.transactional and self.meta.batch_size <= _MAX_TRANSACT_ITEMS
+
     def _edit_batch(
         self, edits: List[BatchEdit], items_by_key: Dict[str, T]
     ) -> List[BatchEditResult]:
+        """
+        By default, edits are applied using a batch writer, with updates written as full items. If
+        transactional is set, they are applied using TransactWriteItems instead (See _transact_edit_batch)
+        """
         assert len(edits) <= self.meta.batch_size
+        if self.transactional:
+            results = []
+            for index in range(0, len(edits), _MAX_TRANSACT_ITEMS):
+                chunk = edits[index : index + _MAX_TRANSACT_ITEMS]
+                results.extend(self._transact_edit_batch(chunk, items_by_key))
+            return results
         results = []
         key_config = self.meta.key_config
         table = self._dynamodb_table()
@@ -344,32 +580,17 @@ class DynamodbTableStore(StoreABC[T]):
                     batch.put_item(Item=item)
                     results.append(BatchEditResult(edit, True))
                 elif edit.update_item:
-                    updates = edit.update_item
-                    key = key_config.to_key_str(updates)
-                    item = items_by_key[key]
-                    to_put = {}
-                    for attr in self.meta.attrs:
-                        value = UNDEFINED
-                        if attr.update_generator:
-                            if attr.updatable:
-                                value = attr.update_generator.transform(
-                                    getattr(updates, attr.name), updates
-                                )
-                            else:
-                                value = attr.update_generator.transform(
-                                    UNDEFINED, updates
-                                )
-                        elif attr.updatable:
-                            value = getattr(updates, attr.name)
-                        if value is UNDEFINED:
-                            value = getattr(item, attr.name)
-                        else:
-                            setattr(item, attr.name, value)
-                        value = marshy.dump(value, attr.schema.python_type)
-                        to_put[attr.name] = self._convert_to_decimals(value)
-                    to_put = self._convert_to_decimals(to_put)
+                    key = key_config.to_key_str(edit.update_item)
+                    to_put = {
+                        **self._dump_item(items_by_key[key]),
+                        **self._dump_update(edit.update_item),
+                    }
                     batch.put_item(Item=to_put)
-                    edit.update_item = deepcopy(item)  # In case of multi put
+                    edit.update_item = self._load(to_put)
+                    results.append(BatchEditResult(edit, True))
+                elif edit.upsert_item:
+                    item = self._dump_create(edit.upsert_item)
+                    batch.put_item(Item=item)
                     results.append(BatchEditResult(edit, True))
                 else:
                     key = key_config.to_key_dict(edit.delete_key)
@@ -377,18 +598,98 @@ class DynamodbTableStore(StoreABC[T]):
                     results.append(BatchEditResult(edit, True))
         return results
 
+    def _transact_edit_batch(
+        self, edits: List[BatchEdit], items_by_key: Dict[str, T]
+    ) -> List[BatchEditResult]:
+        """
+        Apply the edits given in a single transaction, so either all succeed or none do. Updates only write
+        the attributes being changed. Each edit is conditional on the existence (or for creates, the absence)
+        of the item at the time of writing, so a concurrent change cancels the transaction rather than being
+        overwritten. DynamoDB rejects transactions containing more than one edit for an item, so these are
+        detected up front.
+        """
+        dumped = [self._dump_edit(edit) for edit in edits]
+        key_attrs = sorted(self.meta.key_config.get_key_attrs())
+        keys = [tuple(str(d.get(a)) for a in key_attrs) for d in dumped]
+        key_counts = Counter(keys)
+        if any(count > 1 for count in key_counts.values()):
+            return [
+                BatchEditResult(
+                    edit,
+                    False,
+                    "transaction_cancelled",
+                    "DuplicateKey" if key_counts[key] > 1 else None,
+                )
+                for edit, key in zip(edits, keys)
+            ]
+        transact_items = [self._to_transact_item(e, d) for e, d in zip(edits, dumped)]
+        try:
+            self._dynamodb_client().transact_write_items(TransactItems=transact_items)
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons")
+            if not reasons:
+                raise PersistyError(e) from e
+            return [
+                BatchEditResult(
+                    edit,
+                    False,
+                    "transaction_cancelled",
+                    None if reason.get("Code") == "None" else reason.get("Code"),
+                )
+                for edit, reason in zip(edits, reasons)
+            ]
+        key_config = self.meta.key_config
+        for edit, updates in zip(edits, dumped):
+            if edit.update_item:
+                item = items_by_key.get(key_config.to_key_str(edit.update_item))
+                if item:
+                    edit.update_item = self._load({**self._dump_item(item), **updates})
+        return [BatchEditResult(edit, True) for edit in edits]
+
+    def _dump_edit(self, edit: BatchEdit) -> ExternalItemType:
+        """Dump the item for the edit given, or just its key for deletes"""
+        if edit.create_item:
+            return self._dump_create(edit.create_item)
+        if edit.upsert_item:
+            return self._dump_create(edit.upsert_item)
+        if edit.update_item:
+            key = self.meta.key_config.to_key_str(edit.update_item)
+            return {
+                **self._dump_update(edit.update_item),
+                **self.meta.key_config.to_key_dict(key),
+            }
+        return self.meta.key_config.to_key_dict(edit.delete_key)
+
+    def _to_transact_item(self, edit: BatchEdit, item: ExternalItemType) -> Dict:
+        if edit.create_item:
+            condition = DynNot(self.index.to_condition_expression(item))
+            action = {"TableName": self.table_name, "Item": item}
+            return {"Put": _with_condition(action, condition)}
+        if edit.upsert_item:
+            return {"Put": {"TableName": self.table_name, "Item": item}}
+        key_dict = self.meta.key_config.to_key_dict(
+            self.meta.key_config.to_key_str(edit.update_item)
+            if edit.update_item
+            else edit.delete_key
+        )
+        condition = self.index.to_condition_expression(key_dict)
+        action = {"TableName": self.table_name, "Key": key_dict}
+        if edit.update_item:
+            updates = {k: v for k, v in item.items() if k not in key_dict}
+            if not updates:
+                return {"ConditionCheck": _with_condition(action, condition)}
+            update = _build_update(updates)
+            action["UpdateExpression"] = update["str"]
+            action["ExpressionAttributeNames"] = update["names"]
+            action["ExpressionAttributeValues"] = update["values"]
+            return {"Update": _with_condition(action, condition)}
+        return {"Delete": _with_condition(action, condition)}
+
     def _load(self, item) -> T:
         if item is None:
             return None
-        item = self._convert_from_decimals(item)
-        kwargs = {}
-        for attr in self.meta.attrs:
-            value = item.get(attr.name, UNDEFINED)
-            if attr.readable and value is not UNDEFINED:
-                # noinspection PyTypeChecker
-                kwargs[attr.name] = marshy.load(attr.schema.python_type, value)
-        result = self.meta.get_read_dataclass()(**kwargs)
-        return result
+        load = self._get_compiled("_load_item", self._generate_load)
+        return load(item)
 
     def _convert_from_decimals(self, item):
         if isinstance(item, dict):
@@ -403,37 +704,85 @@ class DynamodbTableStore(StoreABC[T]):
         return item
 
     def _dump_create(self, to_create: T):
-        result = {}
-        for attr in self.meta.attrs:
-            self._dump_attr(
-                to_create, attr, attr.creatable, attr.create_generator, result
-            )
-        return result
+        dump = self._get_compiled("_dump_create_item", self._generate_dump_create)
+        return dump(to_create)
 
     def _dump_update(self, to_update: T):
-        result = {}
-        for attr in self.meta.attrs:
-            self._dump_attr(
-                to_update, attr, attr.updatable, attr.update_generator, result
-            )
+        dump = self._get_compiled("_dump_update_item", self._generate_dump_update)
+        return dump(to_update)
+
+    def _dump_item(self, item: T):
+        """Dump a stored item as is, without applying any generators"""
+        dump = self._get_compiled("_dump_stored_item", self._generate_dump_item)
+        return dump(item)
+
+    def _get_compiled(self, name: str, generate: Callable[[], Callable]) -> Callable:
+        """Get a generated conversion function, generating it if it does not already exist"""
+        result = self.__dict__.get(name)
+        if result is None:
+            result = generate()
+            object.__setattr__(self, name, result)
         return result
 
-    def _dump_attr(
-        self,
-        item: T,
-        attr: Attr,
-        accepts_input: bool,
-        generator: Optional[AttrValueGeneratorABC],
-        target: ExternalItemType,
-    ):
-        value = UNDEFINED
-        if accepts_input:
-            value = getattr(item, attr.name, UNDEFINED)
-        if generator:
-            value = generator.transform(value, item)
-        if value is not UNDEFINED:
-            value = marshy.dump(value, attr.schema.python_type)
-            target[attr.name] = self._convert_to_decimals(value)
+    def _generate_load(self) -> Callable[[ExternalItemType], T]:
+        """Generate a function loading a dynamodb item into a read dataclass"""
+        context = marshy.get_default_context()
+        namespace = {
+            "UNDEFINED": UNDEFINED,
+            "convert": self._convert_from_decimals,
+            "read_dataclass": self.meta.get_read_dataclass(),
+        }
+        lines = ["def load(item):", "    kwargs = {}"]
+        for index, attr in enumerate(self.meta.attrs):
+            if not attr.readable:
+                continue
+            namespace[f"load_{index}"] = context.get_marshaller(
+                attr.schema.python_type
+            ).load
+            value = "value"
+            if attr.attr_type in _NUMERIC_TYPES:
+                value = "convert(value)"  # Only numbers (Or json) contain decimals
+            lines.append(f"    value = item.get({attr.name!r}, UNDEFINED)")
+            lines.append("    if value is not UNDEFINED:")
+            lines.append(f"        kwargs[{attr.name!r}] = load_{index}({value})")
+        lines.append("    return read_dataclass(**kwargs)")
+        return compile_function("load", lines, namespace)
+
+    def _generate_dump_create(self) -> Callable[[T], ExternalItemType]:
+        return self._generate_dump(
+            [(a, a.creatable, a.create_generator) for a in self.meta.attrs]
+        )
+
+    def _generate_dump_update(self) -> Callable[[T], ExternalItemType]:
+        return self._generate_dump(
+            [(a, a.updatable, a.update_generator) for a in self.meta.attrs]
+        )
+
+    def _generate_dump_item(self) -> Callable[[T], ExternalItemType]:
+        return self._generate_dump([(a, True, None) for a in self.meta.attrs])
+
+    def _generate_dump(self, plan) -> Callable[[T], ExternalItemType]:
+        """Generate a function dumping an item to a dynamodb item, applying any generators"""
+        context = marshy.get_default_context()
+        namespace = {"UNDEFINED": UNDEFINED, "convert": self._convert_to_decimals}
+        lines = ["def dump(item):", "    result = {}"]
+        for index, (attr, accepts_input, generator) in enumerate(plan):
+            if accepts_input:
+                lines.append(f"    value = getattr(item, {attr.name!r}, UNDEFINED)")
+            else:
+                lines.append("    value = UNDEFINED")
+            if generator:
+                namespace[f"generator_{index}"] = generator
+                lines.append(f"    value = generator_{index}.transform(value, item)")
+            namespace[f"dump_{index}"] = context.get_marshaller(
+                attr.schema.python_type
+            ).dump
+            lines.append("    if value is not UNDEFINED:")
+            lines.append(
+                f"        result[{attr.name!r}] = convert(dump_{index}(value))"
+            )
+        lines.append("    return result")
+        return compile_function("dump", lines, namespace)
 
     def _convert_to_decimals(self, item):
         if isinstance(item, dict):
@@ -477,6 +826,10 @@ class DynamodbTableStore(StoreABC[T]):
         object.__setattr__(self, "_table", table)
         return table
 
+    def _dynamodb_client(self):
+        # The client for the resource converts values to and from dynamodb types, in the same way as the resource
+        return self._dynamodb_resource().meta.client
+
     def _dynamodb_resource(self):
         if hasattr(self, "_resource"):
             return self._resource
@@ -491,12 +844,14 @@ class DynamodbTableStore(StoreABC[T]):
     def _load_items(self, response, search_filter, search_filter_handled_natively):
         items = [self._load(item) for item in response["Items"]]
         if not search_filter_handled_natively:
-            items = [
-                item for item in items if search_filter.match(item, self.meta.attrs)
-            ]
+            match = search_filter.compile(self.meta.attrs)
+            items = [item for item in items if match(item)]
         return items
 
 
+_NUMERIC_TYPES = (AttrType.FLOAT, AttrType.INT, AttrType.JSON)
+
+
 def _build_update(updates: dict):
     update_str = "set "
     update_list = []
@@ -510,6 +865,28 @@ def _build_update(updates: dict):
     return {"str": update_str, "names": names, "values": values}
 
 
+def _with_condition(action: Dict, condition: ConditionBase) -> Dict:
+    """
+    Add a condition to a transaction action. Boto3 only builds condition expressions at the top level of a
+    request, so this is done explicitly. Generated placeholders (#n0, :v0) do not clash with those used
+    for updates.
+    """
+    expression = ConditionExpressionBuilder().build_expression(condition)
+    action["ConditionExpression"] = expression.condition_expression
+    names = expression.attribute_name_placeholders
+    values = expression.attribute_value_placeholders
+    action["ExpressionAttributeNames"] = {
+        **action.get("ExpressionAttributeNames", {}),
+        **names,
+    }
+    if values:
+        action["ExpressionAttributeValues"] = {
+            **action.get("ExpressionAttributeValues", {}),
+            **values,
+        }
+    return action
+
+
 def _get_top_level_eq_attrs(search_filter: SearchFilterABC) -> List[str]:
     if isinstance(search_filter, AttrFilter) and search_filter.op == AttrFilterOp.eq:
         return [search_filter.name]
@@ -0,0 +1,376 @@
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from typing import (
+    Tuple,
+    Dict,
+    Optional,
+    Collection,
+    Any,
+    Iterable,
+    List,
+    Iterator,
+)
+
+from persisty.attr.attr_filter import AttrFilter
+from persisty.attr.attr_filter_op import AttrFilterOp
+from persisty.errors import PersistyError
+from persisty.search_filter.search_filter_abc import SearchFilterABC
+from persisty.store_meta import T
+from persisty.util.undefined import UNDEFINED
+
+
+@dataclass
+class HashIndex:
+    """
+    In memory hash index mapping the values of one or more attributes to the keys of the items which contain them.
+    Used by the MemStore to answer eq / oneof filters without a full scan.
+    """
+
+    attr_names: Tuple[str, ...]
+    keys_by_value: Dict[Tuple, Dict[str, None]] = field(default_factory=dict)
+    # Values which are not hashable (e.g.: json) can not be looked up, so are always considered candidates
+    unhashable_keys: Dict[str, None] = field(default_factory=dict)
+
+    def add(self, key: str, item: T):
+        value = self.get_value(item)
+        try:
+            keys = self.keys_by_value.get(value)
+            if keys is None:
+                keys = self.keys_by_value[value] = {}
+            keys[key] = None
+        except TypeError:
+            self.unhashable_keys[key] = None
+
+    def remove(self, key: str, item: T):
+        value = self.get_value(item)
+        try:
+            keys = self.keys_by_value.get(value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self.keys_by_value[value]
+        except TypeError:
+            self.unhashable_keys.pop(key, None)
+
+    def get_value(self, item: T) -> Tuple:
+        return tuple(getattr(item, a, UNDEFINED) for a in self.attr_names)
+
+    def get_candidate_keys(
+        self, search_filters: Tuple[SearchFilterABC, ...]
+    ) -> Optional[Collection[str]]:
+        """
+        Get the keys of all items which may match the conjunction of the filters given, or None if this index
+        can not be used to narrow the search
+        """
+        values_by_name = {}
+        for search_filter in search_filters:
+            values = _get_lookup_values(search_filter)
+            if values is not None and search_filter.name in self.attr_names:
+                values_by_name[search_filter.name] = values
+        if len(values_by_name) != len(self.attr_names):
+            return None
+        lookups = [()]
+        for attr_name in self.attr_names:
+            lookups = [
+                v + (value,) for v in lookups for value in values_by_name[attr_name]
+            ]
+        results = dict(self.unhashable_keys)
+        for lookup in lookups:
+            try:
+                keys = self.keys_by_value.get(lookup)
+            except TypeError:
+                continue
+            if keys:
+                results.update(keys)
+        return results
+
+
+@dataclass
+class SortedIndex:
+    """
+    In memory sorted index for a single sortable attribute. Values and keys are kept in parallel lists ordered
+    by value then key, so range filters can be answered by bisecting, and items can be streamed in order without
+    sorting the whole store. Items with no value are kept separately (They are sorted last).
+    """
+
+    attr_name: str
+    values: List[Any] = field(default_factory=list)
+    keys: List[str] = field(default_factory=list)
+    null_keys: List[str] = field(default_factory=list)
+
+    def add(self, key: str, item: T):
+        value = getattr(item, self.attr_name, UNDEFINED)
+        if value in (None, UNDEFINED):
+            insort(self.null_keys, key)
+            return
+        index = self._index_of(value, key)
+        self.values.insert(index, value)
+        self.keys.insert(index, key)
+
+    def remove(self, key: str, item: T):
+        value = getattr(item, self.attr_name, UNDEFINED)
+        if value in (None, UNDEFINED):
+            index = bisect_left(self.null_keys, key)
+            if index < len(self.null_keys) and self.null_keys[index] == key:
+                del self.null_keys[index]
+            return
+        index = self._index_of(value, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            del self.values[index]
+            del self.keys[index]
+
+    def _index_of(self, value: Any, key: str) -> int:
+        lo = bisect_left(self.values, value)
+        hi = bisect_right(self.values, value, lo)
+        return bisect_left(self.keys, key, lo, hi)
+
+    def get_range(
+        self, search_filters: Tuple[SearchFilterABC, ...]
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Get the range of positions in this index which may match the conjunction of the filters given, or None
+        if this index can not be used to narrow the search
+        """
+        lo = 0
+        hi = len(self.values)
+        used = False
+        try:
+            for search_filter in search_filters:
+                if (
+                    not isinstance(search_filter, AttrFilter)
+                    or search_filter.name != self.attr_name
+                ):
+                    continue
+                op = search_filter.op
+                value = search_filter.value
+                if value in (None, UNDEFINED):
+                    continue
+                if op in (AttrFilterOp.gt, AttrFilterOp.gte, AttrFilterOp.eq):
+                    bisect = bisect_right if op == AttrFilterOp.gt else bisect_left
+                    lo = max(lo, bisect(self.values, value))
+                    used = True
+                if op in (AttrFilterOp.lt, AttrFilterOp.lte, AttrFilterOp.eq):
+                    bisect = bisect_left if op == AttrFilterOp.lt else bisect_right
+                    hi = min(hi, bisect(self.values, value))
+                    used = True
+                if op == AttrFilterOp.startswith and isinstance(value, str) and value:
+                    # startswith is case insensitive, so the range is only narrowed by the first character
+                    prefix_range = self._get_prefix_range(value[0])
+                    if prefix_range:
+                        lo = max(lo, prefix_range[0])
+                        hi = min(hi, prefix_range[1])
+                        used = True
+        except TypeError:
+            return None  # Values were not comparable - the index can't be used.
+        if not used:
+            return None
+        return lo, max(lo, hi)
+
+    def _get_prefix_range(self, char: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the range of values which may start with the character given, ignoring case, or None if the range
+        can not be narrowed. Matching is done on str(value).lower(), so nulls may match (e.g.: "None"), as may
+        values starting with a non ascii character (e.g.: "İ".lower() starts with "i")
+        """
+        if not char.isascii() or self.null_keys:
+            return None
+        if self.values and not (
+            isinstance(self.values[-1], str) and self.values[-1][:1].isascii()
+        ):
+            return None
+        lower = char.lower()
+        upper = char.upper()
+        first, last = min(lower, upper), max(lower, upper)
+        lo = bisect_left(self.values, first)
+        hi = bisect_left(self.values, last[:-1] + chr(ord(last[-1]) + 1))
+        return lo, hi
+
+    def get_candidate_keys(
+        self, search_filters: Tuple[SearchFilterABC, ...]
+    ) -> Optional[Collection[str]]:
+        index_range = self.get_range(search_filters)
+        if index_range is None:
+            return None
+        return _KeyRange(self.keys, *index_range)
+
+    def iter_key_groups(
+        self,
+        desc: bool,
+        search_filters: Tuple[SearchFilterABC, ...] = tuple(),
+        start: Optional[Tuple[Any]] = None,
+    ) -> Iterator[List[str]]:
+        """
+        Iterate over groups of keys having the same value in this index, ordered by value. Keys within each
+        group are ordered ascending. Items without a value are returned last, unless the filters given exclude
+        them. If a start value is given, iteration begins from the group with that value. The position of each
+        group is found by bisecting from the last value, so the index may be modified during iteration.
+        """
+        include_nulls = self.get_range(search_filters) is None
+        values = self.values
+        last_value = UNDEFINED
+        start_value = start[0] if start else UNDEFINED
+        if start and start_value in (None, UNDEFINED):
+            values = []  # Starting from the null group
+        while True:
+            lo, hi = self.get_range(search_filters) or (0, len(values))
+            if start_value is not UNDEFINED:
+                if desc:
+                    hi = bisect_right(values, start_value, lo, max(lo, hi))
+                else:
+                    lo = bisect_left(values, start_value, lo, max(lo, hi))
+                start_value = UNDEFINED
+            elif last_value is not UNDEFINED:
+                if desc:
+                    hi = bisect_left(values, last_value, lo, max(lo, hi))
+                else:
+                    lo = bisect_right(values, last_value, lo, max(lo, hi))
+            if lo >= hi:
+                break
+            if desc:
+                group_end = hi
+                group_start = bisect_left(values, values[group_end - 1], lo, group_end)
+            else:
+                group_start = lo
+                group_end = bisect_right(values, values[group_start], group_start, hi)
+            last_value = values[group_start]
+            yield self.keys[group_start:group_end]
+        if include_nulls and self.null_keys:
+            yield list(self.null_keys)
+
+
+@dataclass
+class KeyIndex:
+    """
+    In memory index of keys in insertion order (The order in which a store iterates its items), used to page
+    through items when no search order is specified. Each key is given an increasing sequence number when
+    added, so iteration may resume after any key by bisecting. Removed keys leave a gap (and keep their
+    sequence number, so a page key for a removed item stays valid) until gaps make up half the index.
+    """
+
+    seqs: List[int] = field(default_factory=list)
+    keys: List[Optional[str]] = field(default_factory=list)
+    seqs_by_key: Dict[str, int] = field(default_factory=dict)
+    next_seq: int = 0
+    num_removed: int = 0
+
+    def add(self, key: str):
+        seq = self.next_seq
+        self.next_seq += 1
+        self.seqs.append(seq)
+        self.keys.append(key)
+        self.seqs_by_key[key] = seq
+
+    def remove(self, key: str):
+        seq = self.seqs_by_key.get(key)
+        if seq is None:
+            return
+        index = bisect_left(self.seqs, seq)
+        if index < len(self.seqs) and self.keys[index] == key:
+            self.keys[index] = None
+            self.num_removed += 1
+            if self.num_removed * 2 > len(self.keys):
+                self._compact()
+
+    def get_seq(self, key: Optional[str]) -> int:
+        """Get the sequence number for a key, or -1 if the key is None"""
+        if key is None:
+            return -1
+        seq = self.seqs_by_key.get(key)
+        if seq is None:
+            raise PersistyError(
+                "invalid_page_key"
+            )  # The item was removed and compacted
+        return seq
+
+    def iter_keys(self, after: Optional[str] = None) -> Iterator[str]:
+        """
+        Iterate over keys in insertion order, starting after the key given. The position of each key is found
+        by bisecting from the last key, so items may be added or removed during iteration.
+        """
+        seq = self.get_seq(after)
+        while True:
+            index = bisect_right(self.seqs, seq)
+            keys = self.keys
+            while index < len(keys) and keys[index] is None:
+                index += 1
+            if index >= len(keys):
+                return
+            seq = self.seqs[index]
+            yield keys[index]
+
+    def sort_keys(self, keys: Iterable[str], after: Optional[str] = None) -> List[str]:
+        """Sort the keys given into insertion order, excluding any not after the key given"""
+        seq = self.get_seq(after)
+        seqs_by_key = self.seqs_by_key
+        keys = [k for k in keys if seqs_by_key.get(k, -1) > seq]
+        keys.sort(key=seqs_by_key.get)
+        return keys
+
+    def _compact(self):
+        live = [(s, k) for s, k in zip(self.seqs, self.keys) if k is not None]
+        self.seqs = [s for s, _ in live]
+        self.keys = [k for _, k in live]
+        self.seqs_by_key = {k: s for s, k in live}
+        self.num_removed = 0
+
+
+class _KeyRange(Collection[str]):
+    """View of a range of keys in a sorted index, which avoids copying the keys"""
+
+    def __init__(self, keys: List[str], lo: int, hi: int):
+        self.keys = keys
+        self.lo = lo
+        self.hi = hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def __iter__(self):
+        keys = self.keys
+        for index in range(self.lo, self.hi):
+            yield keys[index]
+
+    def __contains__(self, key):
+        return next((True for k in self if k == key), False)
+
+
+def _get_lookup_values(search_filter: SearchFilterABC) -> Optional[List[Any]]:
+    if not isinstance(search_filter, AttrFilter):
+        return None
+    if search_filter.op == AttrFilterOp.eq:
+        return [search_filter.value]
+    if search_filter.op == AttrFilterOp.oneof and isinstance(
+        search_filter.value, (list, tuple, set, frozenset)
+    ):
+        return list(search_filter.value)
+    return None
+
+
+def get_conjunction(search_filter: SearchFilterABC) -> Tuple[SearchFilterABC, ...]:
+    """Get the top level filters which must all match for the filter given to match"""
+    from persisty.search_filter.and_filter import And
+
+    if isinstance(search_filter, And):
+        return search_filter.search_filters
+    return (search_filter,)
+
+
+def get_key_lookups(
+    key_attr_names: Iterable[str], search_filters: Tuple[SearchFilterABC, ...]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    If the filters given specify a value for each key attribute, return the possible combinations
+    of key values. (Keys can be converted directly to strings to look up items in a dict)
+    """
+    values_by_name = {}
+    for search_filter in search_filters:
+        values = _get_lookup_values(search_filter)
+        if values is not None:
+            values_by_name[search_filter.name] = values
+    lookups = [{}]
+    for attr_name in key_attr_names:
+        values = values_by_name.get(attr_name)
+        if values is None:
+            return None
+        lookups = [{**v, attr_name: value} for v in lookups for value in values]
+    return lookups
@@ -1,14 +1,37 @@
-from typing import Optional, Dict, Iterator
+import heapq
+from itertools import islice, dropwhile
+from types import SimpleNamespace
+from typing import (
+    Optional,
+    Dict,
+    Iterator,
+    List,
+    Collection,
+    Union,
+    Callable,
+    Any,
+    Tuple,
+)
 
 from dataclasses import dataclass, field
 
 from persisty.errors import PersistyError
+from persisty.impl.mem.mem_index import (
+    HashIndex,
+    SortedIndex,
+    KeyIndex,
+    get_conjunction,
+    get_key_lookups,
+)
+from persisty.index.attr_index import AttrIndex
+from persisty.index.unique_index import UniqueIndex
+from persisty.result_set import ResultSet
 from persisty.search_filter.include_all import INCLUDE_ALL
 from persisty.search_filter.search_filter_abc import SearchFilterABC
-from persisty.search_order.search_order import SearchOrder
-from persisty.store.store_abc import StoreABC, T
+from persisty.search_order.search_order import SearchOrder, SortKey
+from persisty.store.store_abc import StoreABC, T, to_page_key, from_page_key
 from persisty.store_meta import StoreMeta
-
+from persisty.util.codegen import compile_function
 from persisty.util.undefined import UNDEFINED
 
 
@@ -21,32 +44,48 @@ class MemStore(StoreABC[T]):
 
     meta: StoreMeta = field()
     items: Dict[str, T] = field(default_factory=dict)
+    hash_indexes: List[HashIndex] = field(default_factory=list)
+    # Sorted indexes are opt in, and are used for range filters and for streaming results in order
+    sorted_indexes: List[SortedIndex] = field(default_factory=list)
+    # Keys in insertion order, so results can be paged when no search order is specified
+    key_index: KeyIndex = field(default_factory=KeyIndex)
+
+    def __post_init__(self):
+        if not self.hash_indexes:
+            self.hash_indexes = _hash_indexes_from_meta(self.meta)
+        for index in self.sorted_indexes:
+            attr = next((a for a in self.meta.attrs if a.name == index.attr_name), None)
+            if not attr or not attr.sortable:
+                raise PersistyError(f"sorted_index_invalid:{index.attr_name}")
+        self._load_item = _generate_load(self.meta)
+        self._create_item = _generate_create(self.meta)
+        self._update_item = _generate_update(self.meta)
+        for key, item in self.items.items():
+            self.key_index.add(key)
+            self._add_to_indexes(key, item)
 
     def get_meta(self) -> StoreMeta:
         return self.meta
 
     def create(self, item: T) -> T:
-        meta = self.meta
-
-        kwargs = {}
-        for attr in meta.attrs:
-            value = UNDEFINED
-            if attr.creatable:
-                value = getattr(item, attr.name, UNDEFINED)
-            if attr.create_generator:
-                value = attr.create_generator.transform(value, item)
-            if value is not UNDEFINED:
-                value = attr.sanitize_type(value)
-                kwargs[attr.name] = value
-        stored_item = meta.get_stored_dataclass()(**kwargs)
+        stored_item = self._create_item(item)
         key = self.meta.key_config.to_key_str(stored_item)
         if key in (None, UNDEFINED):
             raise PersistyError(f"missing_key:{item}")
         if key in self.items:
             raise PersistyError(f"existing_value:{item}")
         self.items[key] = stored_item
+        self.key_index.add(key)
+        self._add_to_indexes(key, stored_item)
         return self._load(stored_item)
 
+    def upsert(self, item: T) -> Optional[T]:
+        key = self.meta.key_config.to_key_str(item)
+        stored_item = self.items.get(key) if key else None
+        if stored_item:
+            return self._update(key, stored_item, item)
+        return self.create(item)
+
     def read(self, key: str) -> Optional[T]:
         key = str(key)
         item = self.items.get(key)
@@ -62,22 +101,60 @@ class MemStore(StoreABC[T]):
     ) -> Optional[T]:
         stored_item = self.items.get(key)
         if stored_item:
-            for attr in self.meta.attrs:
-                value = UNDEFINED
-                if attr.updatable:
-                    value = getattr(updates, attr.name, UNDEFINED)
-                if attr.update_generator:
-                    value = attr.update_generator.transform(value, item)
-                if value is not UNDEFINED:
-                    value = attr.sanitize_type(value)
-                    setattr(stored_item, attr.name, value)
+            self._remove_from_indexes(key, stored_item)
+            try:
+                self._update_item(stored_item, item, updates)
+            finally:
+                self._add_to_indexes(key, stored_item)
             return self._load(stored_item)
 
     def _delete(self, key: str, item: T) -> bool:
         if key not in self.items:
             return False
         result = self.items.pop(key, UNDEFINED)
-        return result is not UNDEFINED
+        if result is UNDEFINED:
+            return False
+        self.key_index.remove(key)
+        self._remove_from_indexes(key, result)
+        return True
+
+    def search(
+        self,
+        search_filter: SearchFilterABC[T] = INCLUDE_ALL,
+        search_order: Optional[SearchOrder[T]] = None,
+        page_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> ResultSet[T]:
+        if limit is None:
+            limit = self.meta.batch_size
+        assert limit <= self.meta.batch_size
+        search_filter = search_filter.lock_attrs(self.meta.attrs)
+        if search_order:
+            search_order.validate_for_attrs(self.meta.attrs)
+        values, key = None, None
+        if page_key:
+            values, key = from_page_key(self.meta, search_order, page_key)
+        if search_order and search_order.orders:
+            cursor = None
+            if page_key:
+                cursor = (SortKey(values, search_order), key)
+            items = self._search_sorted_index(search_filter, search_order, cursor)
+            if items is not None:
+                items = list(islice(items, limit))
+            else:
+                # Top k selection, so only the items returned are loaded
+                sort_key = self._sort_key(search_order)
+                items = self._filter_items(search_filter)
+                if cursor:
+                    items = (item for item in items if sort_key(item) > cursor)
+                items = heapq.nsmallest(limit, items, key=sort_key)
+                items = [self._load(item) for item in items]
+        else:
+            items = list(islice(self._search_by_key(search_filter, key), limit))
+        next_page_key = None
+        if len(items) == limit:
+            next_page_key = to_page_key(self.meta, search_order, items[-1])
+        return ResultSet(items, next_page_key)
 
     def search_all(
         self,
@@ -87,27 +164,216 @@ class MemStore(StoreABC[T]):
         search_filter = search_filter.lock_attrs(self.meta.attrs)
         if search_order:
             search_order.validate_for_attrs(self.meta.attrs)
-        items = self.items.values()
-        if search_filter is not INCLUDE_ALL:
-            items = (
-                item for item in items if search_filter.match(item, self.meta.attrs)
-            )
-        items = [self._load(item) for item in items]
-        if search_order and search_order.orders:
-            items = search_order.sort(items)
-        return iter(items)
+        if not search_order or not search_order.orders:
+            # Insertion order, consistent with paging through search
+            return self._search_by_key(search_filter, None)
+        items = self._search_sorted_index(search_filter, search_order)
+        if items is not None:
+            return items
+        # Sort the stored items, so only references are held for the whole result set
+        items = sorted(
+            self._filter_items(search_filter), key=self._sort_key(search_order)
+        )
+        return (self._load(item) for item in items)
+
+    def _search_by_key(
+        self, search_filter: SearchFilterABC[T], after: Optional[str]
+    ) -> Iterator[T]:
+        """Stream matching items in insertion order, starting after the key given"""
+        keys = self._get_candidate_keys(search_filter)
+        if keys is None:
+            keys = self.key_index.iter_keys(after)
+        else:
+            keys = self.key_index.sort_keys(keys, after)
+        match = search_filter.compile(self.meta.attrs)
+        items = (self.items.get(key) for key in keys)
+        return (self._load(item) for item in items if item is not None and match(item))
+
+    def _filter_items(self, search_filter: SearchFilterABC[T]) -> Iterator[T]:
+        items = self._get_candidate_items(search_filter)
+        if search_filter is INCLUDE_ALL:
+            return items
+        match = search_filter.compile(self.meta.attrs)
+        return (item for item in items if match(item))
+
+    def _sort_key(self, search_order: SearchOrder[T]) -> Callable[[T], Any]:
+        """Sort key for items, where ties are broken by key"""
+        to_key_str = self.meta.key_config.to_key_str
+
+        def sort_key(item: T):
+            return search_order.sort_key(item), to_key_str(item)
+
+        return sort_key
 
     def count(self, search_filter: SearchFilterABC[T] = INCLUDE_ALL) -> int:
         search_filter = search_filter.lock_attrs(self.meta.attrs)
         if search_filter is INCLUDE_ALL:
             return len(self.items)
-        count = sum(1 for _ in self.search_all(search_filter))
+        count = sum(1 for _ in self._filter_items(search_filter))
         return count
 
     def _load(self, item: T) -> T:
-        kwargs = {}
-        for attr in self.meta.attrs:
-            if attr.readable:
-                kwargs[attr.name] = getattr(item, attr.name)
-        result = self.meta.get_read_dataclass()(**kwargs)
+        return self._load_item(item)
+
+    def _get_candidate_items(self, search_filter: SearchFilterABC[T]) -> Iterator[T]:
+        """
+        Use the key and any hash indexes to narrow down the set of items which may match the filter given.
+        Items returned still need to be checked against the filter
+        """
+        keys = self._get_candidate_keys(search_filter)
+        if keys is None:
+            # Take a snapshot of the references, so the store may be edited while results are iterated
+            return iter(list(self.items.values()))
+        items = (self.items.get(key) for key in list(keys))
+        return (item for item in items if item is not None)
+
+    def _get_candidate_keys(
+        self, search_filter: SearchFilterABC[T]
+    ) -> Optional[Collection[str]]:
+        search_filters = get_conjunction(search_filter)
+        key_config = self.meta.key_config
+        key_lookups = get_key_lookups(key_config.get_key_attrs(), search_filters)
+        if key_lookups is not None:
+            keys = (key_config.to_key_str(SimpleNamespace(**k)) for k in key_lookups)
+            # Repeated values in a oneof would otherwise match the same item more than once
+            return list(dict.fromkeys(keys))
+        result = None
+        for index in self._get_indexes():
+            keys = index.get_candidate_keys(search_filters)
+            if keys is not None and (result is None or len(keys) < len(result)):
+                result = keys
         return result
+
+    def _search_sorted_index(
+        self,
+        search_filter: SearchFilterABC[T],
+        search_order: SearchOrder[T],
+        cursor: Optional[Tuple[SortKey, str]] = None,
+    ) -> Optional[Iterator[T]]:
+        """
+        If there is a sorted index for the first search order attribute, and no other index narrows the search
+        further, stream results in order from it rather than sorting all matching items. If a cursor is given,
+        results start after it.
+        """
+        order = search_order.orders[0]
+        index = next(
+            (i for i in self.sorted_indexes if i.attr_name == order.attr), None
+        )
+        if index is None:
+            return None
+        search_filters = get_conjunction(search_filter)
+        index_range = index.get_range(search_filters)
+        if index_range is None:
+            size = len(self.items)
+        else:
+            size = index_range[1] - index_range[0]
+        candidate_keys = self._get_candidate_keys(search_filter)
+        if candidate_keys is not None and len(candidate_keys) < size:
+            return None  # Cheaper to sort the candidates
+        items = self._iter_sorted_index(index, search_filter, search_order, cursor)
+        if cursor:
+            # Skip items in the first group which are not after the cursor
+            sort_key = self._sort_key(search_order)
+            items = dropwhile(lambda item: sort_key(item) <= cursor, items)
+        return (self._load(item) for item in items)
+
+    def _iter_sorted_index(
+        self,
+        index: SortedIndex,
+        search_filter: SearchFilterABC[T],
+        search_order: SearchOrder[T],
+        cursor: Optional[Tuple[SortKey, str]] = None,
+    ) -> Iterator[T]:
+        match = search_filter.compile(self.meta.attrs)
+        search_filters = get_conjunction(search_filter)
+        desc = search_order.orders[0].desc
+        start = (cursor[0].values[0],) if cursor else None
+        for keys in index.iter_key_groups(desc, search_filters, start):
+            items = (self.items.get(key) for key in keys)
+            items = [item for item in items if item is not None and match(item)]
+            if len(search_order.orders) > 1:
+                # Within a group, ties are broken by the remaining orders, then by key
+                items.sort(key=search_order.sort_key)
+            yield from items
+
+    def _get_indexes(self) -> Iterator[Union[HashIndex, SortedIndex]]:
+        yield from self.hash_indexes
+        yield from self.sorted_indexes
+
+    def _add_to_indexes(self, key: str, item: T):
+        for index in self._get_indexes():
+            index.add(key, item)
+
+    def _remove_from_indexes(self, key: str, item: T):
+        for index in self._get_indexes():
+            index.remove(key, item)
+
+
+def _generate_load(meta: StoreMeta) -> Callable[[T], T]:
+    """Generate a function copying the readable attrs of a stored item into a read dataclass"""
+    kwargs = ", ".join(f"{a.name}=item.{a.name}" for a in meta.attrs if a.readable)
+    lines = ["def load(item):", f"    return read_dataclass({kwargs})"]
+    namespace = {"read_dataclass": meta.get_read_dataclass()}
+    return compile_function("load", lines, namespace)
+
+
+def _generate_create(meta: StoreMeta) -> Callable[[T], T]:
+    """Generate a function building a stored item from an item, applying generators and sanitizing types"""
+    namespace = {
+        "UNDEFINED": UNDEFINED,
+        "stored_dataclass": meta.get_stored_dataclass(),
+    }
+    lines = ["def create(item):", "    kwargs = {}"]
+    for index, attr in enumerate(meta.attrs):
+        if attr.creatable:
+            lines.append(f"    value = getattr(item, {attr.name!r}, UNDEFINED)")
+        else:
+            lines.append("    value = UNDEFINED")
+        if attr.create_generator:
+            namespace[f"generator_{index}"] = attr.create_generator
+            lines.append(f"    value = generator_{index}.transform(value, item)")
+        namespace[f"attr_{index}"] = attr
+        lines.append("    if value is not UNDEFINED:")
+        lines.append(
+            f"        kwargs[{attr.name!r}] = attr_{index}.sanitize_type(value)"
+        )
+    lines.append("    return stored_dataclass(**kwargs)")
+    return compile_function("create", lines, namespace)
+
+
+def _generate_update(meta: StoreMeta) -> Callable[[T, T, T], None]:
+    """Generate a function applying updates to a stored item, applying generators and sanitizing types"""
+    namespace = {"UNDEFINED": UNDEFINED}
+    lines = ["def update(stored_item, item, updates):"]
+    for index, attr in enumerate(meta.attrs):
+        if not attr.updatable and not attr.update_generator:
+            continue
+        if attr.updatable:
+            lines.append(f"    value = getattr(updates, {attr.name!r}, UNDEFINED)")
+        else:
+            lines.append("    value = UNDEFINED")
+        if attr.update_generator:
+            namespace[f"generator_{index}"] = attr.update_generator
+            lines.append(f"    value = generator_{index}.transform(value, item)")
+        namespace[f"attr_{index}"] = attr
+        lines.append("    if value is not UNDEFINED:")
+        lines.append(
+            f"        stored_item.{attr.name} = attr_{index}.sanitize_type(value)"
+        )
+    lines.append("    return stored_item")
+    return compile_function("update", lines, namespace)
+
+
+def _hash_indexes_from_meta(meta: StoreMeta) -> List[HashIndex]:
+    attrs_by_name = {a.name: a for a in meta.attrs}
+    hash_indexes = []
+    for index in meta.indexes:
+        if isinstance(index, AttrIndex):
+            attr_names = (index.attr_name,)
+        elif isinstance(index, UniqueIndex):
+            attr_names = tuple(index.attr_names)
+        else:
+            continue
+        if all(a in attrs_by_name for a in attr_names):
+            hash_indexes.append(HashIndex(attr_names))
+    return hash_indexes
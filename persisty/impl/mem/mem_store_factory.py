@@ -1,9 +1,10 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Optional, Tuple
 
 from marshy.types import ExternalItemType
 
 from persisty.factory.store_factory_abc import StoreFactoryABC
+from persisty.impl.mem.mem_index import SortedIndex
 from persisty.impl.mem.mem_store import MemStore
 from persisty.store.referential_integrity_store import ReferentialIntegrityStore
 from persisty.store.schema_validating_store import SchemaValidatingStore
@@ -17,12 +18,17 @@ class MemStoreFactory(StoreFactoryABC):
     items: ExternalItemType = field(default_factory=dict)
     triggers: bool = True
     referential_integrity: bool = False
+    sorted_attr_names: Tuple[str, ...] = tuple()
     _cached_store: Optional[StoreABC] = None
 
     def create(self, store_meta: StoreMeta) -> Optional[StoreABC]:
         store = self._cached_store
         if not store:
-            store = MemStore(store_meta, self.items)
+            store = MemStore(
+                store_meta,
+                self.items,
+                sorted_indexes=[SortedIndex(a) for a in self.sorted_attr_names],
+            )
             store = SchemaValidatingStore(store)
             if self.triggers:
                 store = triggered_store(store)
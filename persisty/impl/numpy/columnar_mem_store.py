@@ -0,0 +1,409 @@
+import operator
+from dataclasses import dataclass, field, InitVar
+from typing import Optional, Dict, Iterator, Iterable, Tuple, Any
+
+import numpy as np
+
+from persisty.attr.attr_filter import AttrFilter
+from persisty.attr.attr_filter_op import AttrFilterOp
+from persisty.attr.attr_type import AttrType
+from persisty.errors import PersistyError
+from persisty.result_set import ResultSet
+from persisty.search_filter.and_filter import And
+from persisty.search_filter.exclude_all import EXCLUDE_ALL
+from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.search_filter.not_filter import Not
+from persisty.search_filter.or_filter import Or
+from persisty.search_filter.search_filter_abc import SearchFilterABC
+from persisty.search_order.search_order import SearchOrder, SortKey
+from persisty.store.store_abc import StoreABC, T, to_page_key, from_page_key
+from persisty.store_meta import StoreMeta
+from persisty.util.undefined import UNDEFINED
+
+# Values in each row are flagged as either present, None or UNDEFINED
+_VALUE = 0
+_NONE = 1
+_UNDEFINED = 2
+
+_DTYPES = {
+    AttrType.BOOL: np.bool_,
+    AttrType.FLOAT: np.float64,
+    AttrType.INT: np.int64,
+}
+_COMPARE_OPS = {
+    AttrFilterOp.eq: operator.eq,
+    AttrFilterOp.ne: operator.ne,
+    AttrFilterOp.gt: operator.gt,
+    AttrFilterOp.gte: operator.ge,
+    AttrFilterOp.lt: operator.lt,
+    AttrFilterOp.lte: operator.le,
+}
+_STR_OPS = {
+    AttrFilterOp.contains: lambda values, value: np.char.find(values, value) >= 0,
+    AttrFilterOp.startswith: np.char.startswith,
+    AttrFilterOp.endswith: np.char.endswith,
+}
+
+
+@dataclass
+class ColumnarMemStore(StoreABC[T]):
+    """
+    In memory store which holds each attribute in a numpy array rather than holding a dataclass per item.
+    (Numeric and bool attributes use typed arrays, others use object arrays.) Filters, counts and sorts are
+    evaluated as vectorized operations over whole columns, and dataclasses are only created for the items
+    actually returned, making this suitable for large, read mostly data sets. Filters which can not be
+    vectorized are evaluated row by row.
+    """
+
+    meta: StoreMeta
+    items: InitVar[Iterable[T]] = tuple()
+    size: int = 0
+    rows_by_key: Dict[str, int] = field(default_factory=dict)
+    key_column: np.ndarray = field(default_factory=lambda: np.empty(16, object))
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    null_kinds: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Lower case string versions of columns, for string filters. Cleared on edit.
+    lower_columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __post_init__(self, items: Iterable[T]):
+        capacity = len(self.key_column)
+        for attr in self.meta.attrs:
+            if attr.name not in self.columns:
+                dtype = _DTYPES.get(attr.attr_type, object)
+                self.columns[attr.name] = np.empty(capacity, dtype)
+                self.null_kinds[attr.name] = np.full(capacity, _UNDEFINED, np.uint8)
+        key_config = self.meta.key_config
+        for item in items:
+            self._append_row(key_config.to_key_str(item), item)
+
+    def get_meta(self) -> StoreMeta:
+        return self.meta
+
+    def create(self, item: T) -> T:
+        meta = self.meta
+        kwargs = {}
+        for attr in meta.attrs:
+            value = UNDEFINED
+            if attr.creatable:
+                value = getattr(item, attr.name, UNDEFINED)
+            if attr.create_generator:
+                value = attr.create_generator.transform(value, item)
+            if value is not UNDEFINED:
+                value = attr.sanitize_type(value)
+                kwargs[attr.name] = value
+        stored_item = meta.get_stored_dataclass()(**kwargs)
+        key = meta.key_config.to_key_str(stored_item)
+        if key in (None, UNDEFINED):
+            raise PersistyError(f"missing_key:{item}")
+        if key in self.rows_by_key:
+            raise PersistyError(f"existing_value:{item}")
+        row = self._append_row(key, stored_item)
+        return self._load(row)
+
+    def read(self, key: str) -> Optional[T]:
+        row = self.rows_by_key.get(str(key))
+        if row is not None:
+            return self._load(row)
+
+    def _update(self, key: str, item: T, updates: T) -> Optional[T]:
+        row = self.rows_by_key.get(key)
+        if row is None:
+            return None
+        self.lower_columns.clear()
+        for attr in self.meta.attrs:
+            value = UNDEFINED
+            if attr.updatable:
+                value = getattr(updates, attr.name, UNDEFINED)
+            if attr.update_generator:
+                value = attr.update_generator.transform(value, item)
+            if value is not UNDEFINED:
+                self._set_value(attr.name, row, attr.sanitize_type(value))
+        return self._load(row)
+
+    def _delete(self, key: str, item: T) -> bool:
+        row = self.rows_by_key.pop(key, None)
+        if row is None:
+            return False
+        self.lower_columns.clear()
+        # Move the last row into the gap, so columns stay dense
+        last = self.size - 1
+        if row != last:
+            for name, column in self.columns.items():
+                column[row] = column[last]
+                self.null_kinds[name][row] = self.null_kinds[name][last]
+            moved_key = self.key_column[last]
+            self.key_column[row] = moved_key
+            self.rows_by_key[moved_key] = row
+        for column in self.columns.values():
+            if column.dtype == object:
+                column[last] = None  # Release the reference
+        self.key_column[last] = None
+        self.size = last
+        return True
+
+    def search(
+        self,
+        search_filter: SearchFilterABC[T] = INCLUDE_ALL,
+        search_order: Optional[SearchOrder[T]] = None,
+        page_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> ResultSet[T]:
+        if limit is None:
+            limit = self.meta.batch_size
+        assert limit <= self.meta.batch_size
+        search_filter = search_filter.lock_attrs(self.meta.attrs)
+        if search_order:
+            search_order.validate_for_attrs(self.meta.attrs)
+        mask = self._mask(search_filter)
+        if page_key:
+            values, key = from_page_key(self.meta, search_order, page_key)
+            mask &= self._after_mask(search_order, values, key)
+        rows = self._sort_rows(np.flatnonzero(mask), search_order)
+        items = [self._load(row) for row in rows[:limit].tolist()]
+        next_page_key = None
+        if len(items) == limit:
+            next_page_key = to_page_key(self.meta, search_order, items[-1])
+        return ResultSet(items, next_page_key)
+
+    def search_all(
+        self,
+        search_filter: SearchFilterABC[T] = INCLUDE_ALL,
+        search_order: Optional[SearchOrder[T]] = None,
+    ) -> Iterator[T]:
+        search_filter = search_filter.lock_attrs(self.meta.attrs)
+        rows = np.flatnonzero(self._mask(search_filter))
+        if search_order and search_order.orders:
+            search_order.validate_for_attrs(self.meta.attrs)
+            rows = self._sort_rows(rows, search_order)
+        # Rows move when items are deleted, so results are tracked by key while they are iterated
+        keys = self.key_column[rows].tolist()
+        return self._load_keys(keys)
+
+    def _load_keys(self, keys: Iterable[str]) -> Iterator[T]:
+        for key in keys:
+            row = self.rows_by_key.get(key)
+            if row is not None:
+                yield self._load(row)
+
+    def count(self, search_filter: SearchFilterABC[T] = INCLUDE_ALL) -> int:
+        search_filter = search_filter.lock_attrs(self.meta.attrs)
+        if search_filter is INCLUDE_ALL:
+            return self.size
+        return int(np.count_nonzero(self._mask(search_filter)))
+
+    def _append_row(self, key: str, item: T) -> int:
+        row = self.size
+        if row == len(self.key_column):
+            self._grow()
+        for name in self.columns:
+            self._set_value(name, row, getattr(item, name, UNDEFINED))
+        self.key_column[row] = key
+        self.rows_by_key[key] = row
+        self.size += 1
+        self.lower_columns.clear()
+        return row
+
+    def _grow(self):
+        capacity = len(self.key_column) * 2
+        self.key_column = _resize(self.key_column, capacity, None)
+        for name, column in self.columns.items():
+            self.columns[name] = _resize(column, capacity, None)
+            self.null_kinds[name] = _resize(self.null_kinds[name], capacity, _UNDEFINED)
+
+    def _set_value(self, name: str, row: int, value: Any):
+        self.null_kinds[name][row] = (
+            _NONE if value is None else _UNDEFINED if value is UNDEFINED else _VALUE
+        )
+        column = self.columns[name]
+        if column.dtype == object:
+            column[row] = value
+        elif value not in (None, UNDEFINED):
+            try:
+                column[row] = value
+            except (OverflowError, TypeError, ValueError):
+                # The value does not fit the column type, so fall back to objects
+                column = self.columns[name] = column.astype(object)
+                column[row] = value
+
+    def _get_value(self, name: str, row: int) -> Any:
+        null_kind = self.null_kinds[name][row]
+        if null_kind == _NONE:
+            return None
+        if null_kind == _UNDEFINED:
+            return UNDEFINED
+        value = self.columns[name][row]
+        if isinstance(value, np.generic):
+            value = value.item()
+        return value
+
+    def _load(self, row: int) -> T:
+        kwargs = {
+            attr.name: self._get_value(attr.name, row)
+            for attr in self.meta.attrs
+            if attr.readable
+        }
+        return self.meta.get_read_dataclass()(**kwargs)
+
+    def _mask(self, search_filter: SearchFilterABC[T]) -> np.ndarray:
+        """Evaluate the filter given for all rows, returning an array of booleans"""
+        size = self.size
+        if search_filter is INCLUDE_ALL:
+            return np.ones(size, np.bool_)
+        if search_filter is EXCLUDE_ALL:
+            return np.zeros(size, np.bool_)
+        if isinstance(search_filter, And):
+            mask = np.ones(size, np.bool_)
+            for f in search_filter.search_filters:
+                mask &= self._mask(f)
+            return mask
+        if isinstance(search_filter, Or):
+            mask = np.zeros(size, np.bool_)
+            for f in search_filter.search_filters:
+                mask |= self._mask(f)
+            return mask
+        if isinstance(search_filter, Not):
+            return ~self._mask(search_filter.search_filter)
+        if isinstance(search_filter, AttrFilter):
+            mask = self._attr_filter_mask(search_filter)
+            if mask is not None:
+                return mask
+        match = search_filter.compile(self.meta.attrs)
+        return self._row_mask(match)
+
+    def _row_mask(self, match) -> np.ndarray:
+        size = self.size
+        rows = (_RowView(self, row) for row in range(size))
+        return np.fromiter((match(row) for row in rows), np.bool_, size)
+
+    def _attr_filter_mask(self, attr_filter: AttrFilter) -> Optional[np.ndarray]:
+        """Evaluate an attr filter as a vectorized operation if possible"""
+        name, op, value = attr_filter.name, attr_filter.op, attr_filter.value
+        if name not in self.columns:
+            return None
+        size = self.size
+        has_value = self.null_kinds[name][:size] == _VALUE
+        if op == AttrFilterOp.exists:
+            return has_value
+        if op == AttrFilterOp.not_exists:
+            return ~has_value
+        if op in _STR_OPS:
+            return _STR_OPS[op](self._get_lower_column(name), str(value).lower())
+        if value in (None, UNDEFINED):
+            return None
+        values = self.columns[name][:size][has_value]
+        try:
+            if op == AttrFilterOp.oneof:
+                if not isinstance(value, (list, tuple, set, frozenset)):
+                    return None
+                result = np.isin(values, list(value))
+            else:
+                result = _COMPARE_OPS[op](values, value)
+        except TypeError:
+            return None  # Comparison failed - evaluate row by row
+        if not isinstance(result, np.ndarray) or result.dtype != np.bool_:
+            return None
+        # Missing values are never equal to a value
+        mask = np.full(size, op == AttrFilterOp.ne, np.bool_)
+        mask[has_value] = result
+        return mask
+
+    def _get_lower_column(self, name: str) -> np.ndarray:
+        lower = self.lower_columns.get(name)
+        if lower is None:
+            size = self.size
+            null_kinds = self.null_kinds[name][:size]
+            values = self.columns[name][:size].astype(str).astype(object)
+            values[null_kinds == _NONE] = str(None)
+            values[null_kinds == _UNDEFINED] = str(UNDEFINED)
+            lower = np.char.lower(values.astype(str))
+            self.lower_columns[name] = lower
+        return lower
+
+    def _after_mask(
+        self,
+        search_order: Optional[SearchOrder[T]],
+        values: Tuple[Any, ...],
+        key: str,
+    ) -> np.ndarray:
+        """Mask for rows sorted after the cursor given. Ties are broken by key."""
+        size = self.size
+        after = self.key_column[:size] > key
+        if not search_order:
+            return after.astype(np.bool_)
+        try:
+            for order, value in reversed(tuple(zip(search_order.orders, values))):
+                has_value = self.null_kinds[order.attr][:size] == _VALUE
+                column = self.columns[order.attr][:size][has_value]
+                if value in (None, UNDEFINED):
+                    # Missing values are sorted last
+                    gt = np.zeros(size, np.bool_)
+                    eq = ~has_value
+                else:
+                    gt = ~has_value
+                    eq = np.zeros(size, np.bool_)
+                    gt[has_value] = column < value if order.desc else column > value
+                    eq[has_value] = column == value
+                after = gt | (eq & after)
+            return after.astype(np.bool_)
+        except TypeError:
+            cursor = (SortKey(values, search_order), key)
+            sort_key = self._row_sort_key(search_order)
+            return self._row_mask(lambda row: sort_key(row) > cursor)
+
+    def _sort_rows(
+        self, rows: np.ndarray, search_order: Optional[SearchOrder[T]]
+    ) -> np.ndarray:
+        """Sort the rows given by the search order, with ties broken by key"""
+        orders = search_order.orders if search_order else tuple()
+        try:
+            sort_keys = [_rank(self.key_column[rows])]
+            for order in reversed(orders):
+                has_value = self.null_kinds[order.attr][rows] == _VALUE
+                ranks = np.full(len(rows), np.iinfo(np.int64).max, np.int64)
+                values = self.columns[order.attr][rows][has_value]
+                ranks[has_value] = -_rank(values) if order.desc else _rank(values)
+                sort_keys.append(ranks)
+            return rows[np.lexsort(sort_keys)]
+        except TypeError:
+            # Values were not comparable with each other - sort in python
+            sort_key = self._row_sort_key(search_order)
+            rows = sorted(rows.tolist(), key=lambda row: sort_key(_RowView(self, row)))
+            return np.array(rows, np.int64)
+
+    def _row_sort_key(self, search_order: SearchOrder[T]):
+        key_config = self.meta.key_config
+
+        def sort_key(row: _RowView):
+            return search_order.sort_key(row), key_config.to_key_str(row)
+
+        return sort_key
+
+
+class _RowView:
+    """View of a single row, used where filters and sorts can not be vectorized"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: ColumnarMemStore, row: int):
+        self._store = store
+        self._row = row
+
+    def __getattr__(self, name: str):
+        if name not in self._store.columns:
+            raise AttributeError(name)
+        # pylint: disable=W0212
+        return self._store._get_value(name, self._row)
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    """Get the rank of each value in the array given"""
+    _, inverse = np.unique(values, return_inverse=True)
+    return inverse.reshape(-1).astype(np.int64)
+
+
+def _resize(values: np.ndarray, capacity: int, fill_value: Any) -> np.ndarray:
+    result = np.empty(capacity, values.dtype)
+    result[: len(values)] = values
+    if values.dtype == object or fill_value is not None:
+        result[len(values) :] = fill_value
+    return result
@@ -0,0 +1,130 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from persisty.batch_edit import BatchEdit
+from persisty.batch_edit_result import BatchEditResult
+from persisty.impl.sqlalchemy.sqlalchemy_table_store import use_session_connection
+from persisty.result_set import ResultSet
+from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.search_filter.search_filter_abc import SearchFilterABC
+from persisty.search_order.search_order import SearchOrder
+from persisty.store.async_store_abc import AsyncStoreABC
+from persisty.store.store_abc import StoreABC, T
+from persisty.store_meta import StoreMeta
+from persisty.trigger.asyncio_trigger_store import collect_trigger_tasks
+from persisty.util import get_logger
+
+logger = get_logger(__name__)
+
+# Connections for the async sessions active in the current context, by engine
+_ASYNC_SESSION_CONNECTIONS: ContextVar[
+    Optional[Dict[AsyncEngine, AsyncConnection]]
+] = ContextVar("_ASYNC_SESSION_CONNECTIONS", default=None)
+
+
+@dataclass(frozen=True)
+class AsyncSqlalchemyTableStore(AsyncStoreABC[T]):
+    """
+    Async store running the operations of a sql store on an AsyncEngine. The wrapped store (Typically a
+    SqlalchemyTableStore wrapped for validation, triggers, etc) executes its statements through an
+    async connection in the same way as a sqlalchemy AsyncSession, so no thread is blocked waiting for the
+    database. The wrapped store must use the sync_engine of the async engine given.
+    """
+
+    store: StoreABC[T]
+    engine: AsyncEngine
+
+    def get_meta(self) -> StoreMeta:
+        return self.store.get_meta()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Operations within the session on any async store sharing this engine use a single connection and
+        transaction, which is committed on exit (Or rolled back on error). Nested sessions join the outermost
+        session.
+        """
+        connections = _ASYNC_SESSION_CONNECTIONS.get() or {}
+        connection = connections.get(self.engine)
+        if connection is not None:
+            yield connection
+            return
+        async with self.engine.begin() as connection:
+            token = _ASYNC_SESSION_CONNECTIONS.set(
+                {**connections, self.engine: connection}
+            )
+            try:
+                yield connection
+            finally:
+                _ASYNC_SESSION_CONNECTIONS.reset(token)
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        async with self.session() as connection:
+            result, trigger_tasks = await connection.run_sync(
+                _run_in_session, fn, *args
+            )
+        if trigger_tasks:
+            # Await any triggers started by the operation, so none are left pending when the caller returns
+            errors = await asyncio.gather(*trigger_tasks, return_exceptions=True)
+            for error in errors:
+                if isinstance(error, Exception):
+                    logger.error("trigger_failed", exc_info=error)
+        return result
+
+    async def create(self, item: T) -> Optional[T]:
+        return await self._run(self.store.create, item)
+
+    async def upsert(self, item: T) -> Optional[T]:
+        return await self._run(self.store.upsert, item)
+
+    async def read(self, key: str) -> Optional[T]:
+        return await self._run(self.store.read, key)
+
+    async def read_batch(self, keys: List[str]) -> List[Optional[T]]:
+        return await self._run(self.store.read_batch, keys)
+
+    async def update(
+        self, updates: T, precondition: SearchFilterABC = INCLUDE_ALL
+    ) -> Optional[T]:
+        return await self._run(self.store.update, updates, precondition)
+
+    async def delete(self, key: str) -> bool:
+        return await self._run(self.store.delete, key)
+
+    async def search(
+        self,
+        search_filter: SearchFilterABC[T] = INCLUDE_ALL,
+        search_order: Optional[SearchOrder[T]] = None,
+        page_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> ResultSet[T]:
+        return await self._run(
+            self.store.search, search_filter, search_order, page_key, limit
+        )
+
+    async def count(self, search_filter: SearchFilterABC[T] = INCLUDE_ALL) -> int:
+        return await self._run(self.store.count, search_filter)
+
+    async def edit_batch(
+        self, edits: List[BatchEdit[T, T]]
+    ) -> List[BatchEditResult[T, T]]:
+        return await self._run(self.store.edit_batch, edits)
+
+    async def update_all(self, search_filter: SearchFilterABC[T], updates: T):
+        await self._run(self.store.update_all, search_filter, updates)
+
+    async def delete_all(self, search_filter: SearchFilterABC[T]):
+        await self._run(self.store.delete_all, search_filter)
+
+
+def _run_in_session(
+    connection: Connection, fn: Callable, *args
+) -> Tuple[Any, List[asyncio.Task]]:
+    with use_session_connection(connection), collect_trigger_tasks() as trigger_tasks:
+        return fn(*args), trigger_tasks
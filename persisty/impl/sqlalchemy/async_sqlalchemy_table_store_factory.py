@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from persisty.impl.sqlalchemy.async_sqlalchemy_table_store import (
+    AsyncSqlalchemyTableStore,
+)
+from persisty.impl.sqlalchemy.sqlalchemy_context import SqlalchemyContext
+from persisty.impl.sqlalchemy.sqlalchemy_table_store import SqlalchemyTableStore
+from persisty.store.async_store_abc import AsyncStoreABC
+from persisty.store.referential_integrity_store import ReferentialIntegrityStore
+from persisty.store.schema_validating_store import SchemaValidatingStore
+from persisty.store_meta import StoreMeta
+from persisty.trigger.wrapper import triggered_store
+
+
+@dataclass
+class AsyncSqlalchemyTableStoreFactory:
+    """
+    Factory for async sql stores, matching SqlalchemyTableStoreFactory. Tables are not created on the fly
+    even in developer mode, as this requires an event loop - use create_tables instead.
+    """
+
+    engine: AsyncEngine
+    triggers: bool = True
+    # Lack of referential integrity may be acceptable, or this may be handled by the db engine
+    referential_integrity: bool = False
+    meta_data: MetaData = field(default_factory=MetaData)
+    _context: Optional[SqlalchemyContext] = field(default=None, init=False, repr=False)
+
+    @property
+    def context(self) -> SqlalchemyContext:
+        if not self._context:
+            self._context = SqlalchemyContext(
+                self.engine.sync_engine, False, self.meta_data
+            )
+        return self._context
+
+    def create(self, store_meta: StoreMeta) -> AsyncStoreABC:
+        table = self.context.get_table(store_meta)
+        store = SqlalchemyTableStore(store_meta, table, self.engine.sync_engine)
+        store = SchemaValidatingStore(store)
+        if self.triggers:
+            store = triggered_store(store)
+        if self.referential_integrity:
+            store = ReferentialIntegrityStore(store)
+        return AsyncSqlalchemyTableStore(store, self.engine)
+
+    async def create_tables(self):
+        """Create any tables (and indexes) for stores created by this factory which do not already exist"""
+        async with self.engine.begin() as connection:
+            await connection.run_sync(self.meta_data.create_all)
@@ -1,7 +1,8 @@
+from datetime import datetime, timezone
 from typing import Optional, Tuple, Any
 from uuid import UUID
 
-from sqlalchemy import Table, Column
+from sqlalchemy import Table, Column, false
 
 from persisty.attr.attr_filter import AttrFilter, AttrFilterOp
 from persisty.impl.sqlalchemy.search_filter.and_filter_converter import (
@@ -34,12 +35,17 @@ class AttrFilterConverter(AndFilterConverter):
         does not do a direct comparison, but rather produces a where clause for comparing the contents of a column
         to the value given.
         """
-        if isinstance(value, UUID):
-            value = str(value)
+        if op == AttrFilterOp.oneof:
+            values = [_to_sql_value(v) for v in value]
+            if not values:
+                return false()
+            return col.in_(values)
+        value = _to_sql_value(value)
+        # Wildcard characters in the value are escaped, as they are matched literally in python
         if op == AttrFilterOp.contains:
-            return col.contains(value)
+            return col.contains(value, autoescape=True)
         if op == AttrFilterOp.endswith:
-            return col.endswith(value)
+            return col.endswith(value, autoescape=True)
         if op == AttrFilterOp.eq:
             return col == value
         if op == AttrFilterOp.exists:
@@ -56,7 +62,14 @@ class AttrFilterConverter(AndFilterConverter):
             return col != value
         if op == AttrFilterOp.not_exists:
             return col == _NULL  # yields col IS NULL
-        if op == AttrFilterOp.oneof:
-            return col.in_(*value)
         if op == AttrFilterOp.startswith:
-            return col.startswith(value)
+            return col.startswith(value, autoescape=True)
+
+
+def _to_sql_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Datetimes are stored as naive UTC values
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
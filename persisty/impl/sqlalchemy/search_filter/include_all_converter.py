@@ -5,6 +5,7 @@ from sqlalchemy import Table
 from persisty.impl.sqlalchemy.search_filter.search_filter_converter_abc import (
     SearchFilterConverterABC,
 )
+from persisty.search_filter.include_all import INCLUDE_ALL
 from persisty.search_filter.search_filter_abc import SearchFilterABC
 from persisty.store_meta import StoreMeta
 
@@ -17,5 +18,5 @@ class IncludeAllConverter(SearchFilterConverterABC):
         store_meta: StoreMeta,
         context,
     ) -> Optional[Tuple[Any, bool]]:
-        if search_filter is IncludeAllConverter:
+        if search_filter is INCLUDE_ALL:
             return None, True
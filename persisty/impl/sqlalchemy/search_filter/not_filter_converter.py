@@ -22,6 +22,7 @@ class NotFilterConverter(AndFilterConverter):
             clause, handled = context.convert(
                 search_filter.search_filter, table, store_meta
             )
-            if clause:
-                clause = not_(clause)
-            return clause, handled
+            if not handled:
+                # A partial clause matches a superset of the results, so its negation would exclude matches
+                return None, False
+            return not_(clause), True
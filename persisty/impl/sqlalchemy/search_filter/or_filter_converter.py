@@ -19,8 +19,13 @@ class OrFilterConverter(AndFilterConverter):
         context,
     ) -> Optional[Tuple[Any, bool]]:
         if isinstance(search_filter, Or):
-            sub_clauses, handled = self.get_sub_clauses(
-                search_filter.search_filters, table, store_meta, context
-            )
-            clause = or_(*sub_clauses) if sub_clauses else None
-            return clause, handled
+            sub_clauses = []
+            handled = True
+            for sub_filter in search_filter.search_filters:
+                sub_clause, sub_handled = context.convert(sub_filter, table, store_meta)
+                if sub_clause is None:
+                    # The sub filter may match any row, so the rows can not be restricted
+                    return None, False
+                sub_clauses.append(sub_clause)
+                handled = handled and sub_handled
+            return or_(*sub_clauses), handled
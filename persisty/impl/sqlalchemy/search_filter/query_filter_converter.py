@@ -1,7 +1,6 @@
-from operator import or_
 from typing import Optional, Tuple, Any
 
-from sqlalchemy import Table
+from sqlalchemy import Table, false, or_
 
 from persisty.attr.attr_type import AttrType
 from persisty.impl.sqlalchemy.search_filter.and_filter_converter import (
@@ -11,11 +10,8 @@ from persisty.search_filter.query_filter import QueryFilter
 from persisty.search_filter.search_filter_abc import SearchFilterABC
 from persisty.store_meta import StoreMeta
 
-_NULL = None
-
 
 class QueryFilterConverter(AndFilterConverter):
-    # pylint: disable=E1120
     def convert(
         self,
         search_filter: SearchFilterABC,
@@ -28,5 +24,9 @@ class QueryFilterConverter(AndFilterConverter):
             for attr in store_meta.attrs:
                 if attr.attr_type is AttrType.STR and attr.readable:
                     col = table.columns.get(attr.name)
-                    sub_clauses.append(col.contains(search_filter.query))
+                    sub_clauses.append(
+                        col.contains(search_filter.query, autoescape=True)
+                    )
+            if not sub_clauses:
+                return false(), True
             return or_(*sub_clauses), True
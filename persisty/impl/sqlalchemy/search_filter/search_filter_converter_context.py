@@ -3,11 +3,13 @@ from typing import List, Tuple, Any
 
 from marshy import get_default_context
 from marshy.factory.impl_marshaller_factory import ImplMarshallerFactory
-from sqlalchemy import Table
+from sqlalchemy import Table, and_
 
 from persisty.impl.sqlalchemy.search_filter.search_filter_converter_abc import (
     SearchFilterConverterABC,
 )
+from persisty.search_filter.and_filter import And
+from persisty.search_filter.include_all import INCLUDE_ALL
 from persisty.search_filter.search_filter_abc import SearchFilterABC
 from persisty.store_meta import StoreMeta
 
@@ -35,3 +37,25 @@ class SearchFilterConverterContext:
             if result:
                 return result
         return None, False
+
+    def convert_with_residue(
+        self, search_filter: SearchFilterABC, table: Table, store_meta: StoreMeta
+    ) -> Tuple[Any, SearchFilterABC]:
+        """
+        Convert to a sqlalchemy where clause, returning the clause along with the residual filter which must
+        still be applied to results in python (INCLUDE_ALL if the clause fully handles the filter). Each
+        conjunct of an And is converted separately, so only those which could not be handled remain.
+        """
+        if not isinstance(search_filter, And):
+            clause, handled = self.convert(search_filter, table, store_meta)
+            return clause, INCLUDE_ALL if handled else search_filter
+        clauses = []
+        residue = []
+        for sub_filter in search_filter.search_filters:
+            clause, handled = self.convert(sub_filter, table, store_meta)
+            if clause is not None:
+                clauses.append(clause)
+            if not handled:
+                residue.append(sub_filter)
+        clause = and_(*clauses) if clauses else None
+        return clause, And(tuple(residue))
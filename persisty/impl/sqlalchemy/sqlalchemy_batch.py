@@ -0,0 +1,166 @@
+from copy import copy
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Table
+
+from persisty.batch_edit import BatchEdit
+from persisty.batch_edit_result import BatchEditResult
+from persisty.impl.sqlalchemy.sqlalchemy_values import transform_type
+from persisty.store.store_abc import T
+from persisty.store_meta import StoreMeta
+from persisty.util import UNDEFINED
+
+
+class SqlalchemyBatchMixin:
+    """
+    Batch edits for a SqlalchemyTableStore, applied using one statement (or executemany) per type of edit
+    rather than one per item.
+    """
+
+    meta: StoreMeta
+    table: Table
+
+    def _batch_insert(
+        self,
+        connection,
+        edits: List[BatchEdit],
+        results_by_id: Dict[UUID, BatchEditResult],
+    ):
+        """
+        Where the dialect supports it, rows are inserted using a multi row VALUES statement returning the
+        stored rows, so the items being created are fully populated (Including values generated by the
+        database) in a single round trip. Otherwise they are inserted using executemany.
+        """
+        items_to_create = [self._dump(e.create_item, False) for e in edits]
+        if not self._is_returning_supported():
+            connection.execute(self.table.insert(), items_to_create)
+            for insert in edits:
+                results_by_id[insert.id] = BatchEditResult(insert, True)
+            return
+        # A VALUES statement requires the same columns for every row
+        inserts_by_columns = {}
+        for insert, dumped in zip(edits, items_to_create):
+            inserts_by_columns.setdefault(tuple(dumped), []).append((insert, dumped))
+        key_config = self.meta.key_config
+        key_attrs = self._get_sorted_key_attrs()
+        for columns, inserts in inserts_by_columns.items():
+            if not all(k in columns for k in key_attrs):
+                # The order of returned rows is not guaranteed, so rows with keys generated by the database
+                # can not be matched to their edits, and are inserted individually
+                stmt = self._get_compiled(
+                    "_insert_returning_stmt", self._generate_insert_returning_stmt
+                )
+                for insert, dumped in inserts:
+                    row = connection.execute(stmt, dumped).first()
+                    self._copy_loaded(self._load_row(row), insert.create_item)
+                    results_by_id[insert.id] = BatchEditResult(insert, True)
+                continue
+            stmt = self.table.insert().values([dumped for _, dumped in inserts])
+            rows = connection.execute(stmt.returning(*self.table.columns)).all()
+            loaded_by_key = {}
+            for row in rows:
+                loaded = self._load_row(row)
+                loaded_by_key[key_config.to_key_str(loaded)] = loaded
+            for insert, _ in inserts:
+                key = key_config.to_key_str(insert.create_item)
+                self._copy_loaded(loaded_by_key[key], insert.create_item)
+                results_by_id[insert.id] = BatchEditResult(insert, True)
+
+    def _copy_loaded(self, loaded: T, item: T):
+        """Copy the values loaded from a stored row onto the item given"""
+        for attr in self.meta.attrs:
+            value = getattr(loaded, attr.name, UNDEFINED)
+            if value is not UNDEFINED:
+                setattr(item, attr.name, value)
+
+    def _batch_upsert(
+        self,
+        connection,
+        edits: List[BatchEdit],
+        results_by_id: Dict[UUID, BatchEditResult],
+    ):
+        """Upserts are applied using executemany, with one statement for each distinct set of columns"""
+        if not self._is_upsert_supported():
+            for edit in edits:
+                item = self.upsert(edit.upsert_item)
+                results_by_id[edit.id] = BatchEditResult(edit, bool(item))
+            return
+        dumped_by_columns = {}
+        for edit in edits:
+            dumped = self._dump(edit.upsert_item, False)
+            dumped_by_columns.setdefault(tuple(dumped), []).append(dumped)
+            results_by_id[edit.id] = BatchEditResult(edit, True)
+        for columns, dumped in dumped_by_columns.items():
+            connection.execute(self._upsert_stmt(columns), dumped)
+
+    def _batch_update(
+        self,
+        connection,
+        edits: List[BatchEdit],
+        results_by_id: Dict[UUID, BatchEditResult],
+        items_by_key: Optional[Dict[str, T]] = None,
+    ):
+        """
+        Updates are applied using a single parameterized statement for each distinct set of updated columns
+        (Typically just one), executed with executemany. At most the existing keys are read beforehand, so
+        the number of round trips does not depend on the number of edits.
+        """
+        key_config = self.meta.key_config
+        for edit in edits:
+            results_by_id[edit.id] = BatchEditResult(edit)
+        if items_by_key is None:
+            key_attrs = list(key_config.get_key_attrs())
+            key_dicts = [
+                {k: transform_type(getattr(e.update_item, k)) for k in key_attrs}
+                for e in edits
+            ]
+            existing_keys = {
+                key_config.to_key_str(k)
+                for k in self._get_existing_keys(connection, key_dicts)
+            }
+        else:
+            existing_keys = items_by_key
+        dumped_by_columns = {}
+        for edit in edits:
+            if key_config.to_key_str(edit.update_item) not in existing_keys:
+                continue
+            dumped = self._dump(self._get_updatable(edit.update_item), True)
+            dumped_by_columns.setdefault(tuple(dumped), []).append(dumped)
+            results_by_id[edit.id].success = True
+        if not dumped_by_columns:
+            return
+        stmt = self._get_compiled("_batch_update_stmt", self._generate_update_stmt)
+        for dumped in dumped_by_columns.values():
+            connection.execute(stmt, dumped)
+
+    def _get_updatable(self, updates: T) -> T:
+        """Get a copy of the updates given, with any attributes which may not be updated removed"""
+        key_attrs = set(self.meta.key_config.get_key_attrs())
+        updates = copy(updates)
+        for attr in self.meta.attrs:
+            if not attr.updatable and attr.name not in key_attrs:
+                setattr(updates, attr.name, UNDEFINED)
+        return updates
+
+    def _batch_delete(
+        self,
+        connection,
+        edits: List[BatchEdit],
+        results_by_id: Dict[UUID, BatchEditResult],
+    ):
+        key_config = self.meta.key_config
+        delete_keys = [key_config.to_key_dict(d.delete_key) for d in edits]
+        existing_keys = self._get_existing_keys(connection, delete_keys)
+        stmt, params = self._key_batch_stmt(
+            "_batch_delete_stmt", self.table.delete, delete_keys
+        )
+        connection.execute(stmt, params)
+        deleted_keys = {key_config.to_key_str(k) for k in existing_keys}
+        for delete in edits:
+            deleted = delete.delete_key in deleted_keys
+            results_by_id[delete.id] = BatchEditResult(delete, deleted)
+
+    def _get_existing_keys(self, connection, keys: List[Dict]) -> List[Dict]:
+        existing_keys = self._read_batch(connection, keys, True)
+        return existing_keys
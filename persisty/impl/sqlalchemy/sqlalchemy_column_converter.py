@@ -15,6 +15,7 @@ from sqlalchemy import (
     Boolean,
     Enum as SqlalchemyEnum,
     LargeBinary,
+    text,
 )
 
 # noinspection PyPep8Naming
@@ -28,17 +29,17 @@ from sqlalchemy.dialects.mssql import JSON as MssqlJson
 
 from persisty.attr.attr import Attr
 from persisty.attr.generator.default_value_generator import DefaultValueGenerator
+from persisty.impl.sqlalchemy.sqlalchemy_dialect import MSSQL, MYSQL, POSTGRESQL
 from persisty.key_config.key_config_abc import KeyConfigABC
 
-POSTGRES = "postgres"
-MYSQL = "mysql"
-MSSQL = "mssql"
-
 
 @dataclass
 class SqlalchemyColumnConverter:
     key_config: KeyConfigABC
     dialect: str
+    # Postgresql tables historically stored JSON as Text and UUIDs as String(36). Native types are opt in, as
+    # existing tables need to be migrated to use them
+    native_postgres_types: bool = False
 
     def create_column(self, attr: Attr) -> Column:
         fn_name = f"_create_{attr.attr_type.value}"
@@ -46,12 +47,15 @@ class SqlalchemyColumnConverter:
         kwargs = {
             "nullable": bool(get_optional_type(attr.schema.python_type)),
         }
-        if attr.name in self.key_config.get_key_attrs():
+        is_key = attr.name in self.key_config.get_key_attrs()
+        if is_key:
             kwargs["primary_key"] = True
         if isinstance(attr.create_generator, DefaultValueGenerator):
             default_value = attr.create_generator.default_value
             if default_value is None:
-                kwargs["server_default"] = "NULL"
+                # Null keys are left for the database to generate (e.g.: autoincrement)
+                if not is_key:
+                    kwargs["server_default"] = text("NULL")
             elif isinstance(default_value, (str, int, float, bool)):
                 kwargs["server_default"] = str(default_value)
 
@@ -91,8 +95,8 @@ class SqlalchemyColumnConverter:
     # pylint: disable=W0613
     # noinspection PyUnusedLocal
     def _create_json(self, attr: Attr):
-        if self.dialect == POSTGRES:
-            return PostgresJson
+        if self.dialect == POSTGRESQL:
+            return PostgresJson if self.native_postgres_types else Text
         if self.dialect == MYSQL:
             return MysqlJson
         if self.dialect == MSSQL:
@@ -114,7 +118,7 @@ class SqlalchemyColumnConverter:
     def _create_uuid(self, attr: Attr):
         # AFAIK at the moment, the only dialect with a native UUID type is postgres.
         # So the others will define UUIDs as strings (for readability)
-        if self.dialect == POSTGRES:
+        if self.dialect == POSTGRESQL and self.native_postgres_types:
             return PostgresUuid(as_uuid=True)
         return String(length=36)
 
@@ -1,7 +1,14 @@
 from dataclasses import dataclass, field
-from sqlalchemy import MetaData, Table
+from typing import Optional
+
+from sqlalchemy import MetaData, Table, create_engine
 from sqlalchemy.engine import Engine
 
+from persisty.impl.sqlalchemy.sqlalchemy_pool import (
+    SqlalchemyPoolConfig,
+    SqlalchemyPoolMetrics,
+    get_pool_metrics,
+)
 from persisty.impl.sqlalchemy.sqlalchemy_table_converter import SqlalchemyTableConverter
 from persisty.store_meta import StoreMeta
 
@@ -12,6 +19,25 @@ class SqlalchemyContext:
     developer_mode: bool = False
     meta_data: MetaData = field(default_factory=MetaData)
 
+    @staticmethod
+    def from_urn(
+        sql_urn: str,
+        developer_mode: bool = False,
+        pool_config: Optional[SqlalchemyPoolConfig] = None,
+        echo: bool = False,
+    ) -> "SqlalchemyContext":
+        """Create a context with a new engine for the urn given, using the pool settings given"""
+        pool_config = pool_config or SqlalchemyPoolConfig()
+        engine = create_engine(
+            sql_urn, echo=echo, future=True, **pool_config.get_engine_kwargs(sql_urn)
+        )
+        pool_config.configure_engine(engine)
+        return SqlalchemyContext(engine, developer_mode)
+
+    def get_pool_metrics(self) -> Optional[SqlalchemyPoolMetrics]:
+        """Get metrics for the connection pool of the engine, if it is instrumented"""
+        return get_pool_metrics(self.engine.pool)
+
     @property
     def converter(self) -> SqlalchemyTableConverter:
         converter = getattr(self, "_converter", None)
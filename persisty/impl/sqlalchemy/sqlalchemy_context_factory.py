@@ -2,12 +2,11 @@ import logging
 import os
 from typing import Optional
 
-from sqlalchemy import create_engine
-
 from persisty.impl.sqlalchemy.sqlalchemy_context import SqlalchemyContext
 from persisty.impl.sqlalchemy.sqlalchemy_context_factory_abc import (
     SqlalchemyContextFactoryABC,
 )
+from persisty.impl.sqlalchemy.sqlalchemy_pool import SqlalchemyPoolConfig
 
 LOGGER = logging.getLogger(__name__)
 
@@ -20,8 +19,10 @@ class SqlalchemyContextFactory(SqlalchemyContextFactoryABC):
         developer_mode = not sql_urn or os.environ.get("PERSISTY_DEVELOPER_MODE") == "1"
         if not sql_urn:
             sql_urn = "sqlite+pysqlite:///:memory:"
-        sql_echo = (os.environ.get("SQL_ECHO") or "").lower() not in ("false", "0")
+        # Statements are only logged if explicitly requested
+        sql_echo = (os.environ.get("SQL_ECHO") or "").lower() in ("true", "1")
         if not os.environ.get("PERSISTY_SQL_URN"):
             LOGGER.warning(f"PERSISTY_SQL_URN NOT SET: USING {sql_urn}")
-        engine = create_engine(sql_urn, echo=sql_echo, future=True)
-        return SqlalchemyContext(engine, developer_mode)
+        return SqlalchemyContext.from_urn(
+            sql_urn, developer_mode, SqlalchemyPoolConfig.from_env(), sql_echo
+        )
@@ -0,0 +1,5 @@
+# Sqlalchemy dialect names, as given by engine.dialect.name
+POSTGRESQL = "postgresql"
+MYSQL = "mysql"
+SQLITE = "sqlite"
+MSSQL = "mssql"
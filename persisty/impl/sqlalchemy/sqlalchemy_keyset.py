@@ -0,0 +1,87 @@
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Column, Table, and_, false, literal, tuple_
+from sqlalchemy.sql.elements import or_
+
+from persisty.impl.sqlalchemy.sqlalchemy_values import transform_type
+from persisty.search_order.search_order import SearchOrder
+from persisty.store_meta import StoreMeta
+
+
+class SqlalchemyKeysetMixin:
+    """
+    Ordering and keyset pagination for a SqlalchemyTableStore. Pages resume from the sort values and key of
+    the last item in the previous page rather than using an offset.
+    """
+
+    meta: StoreMeta
+    table: Table
+
+    def _search_order_to_order_by(self, search_order: SearchOrder):
+        if not search_order:
+            return
+        search_order.validate_for_attrs(self.meta.attrs)
+        orders = []
+        for order_attr in search_order.orders:
+            # pylint: disable=E1101
+            column = self.table.columns.get(order_attr.attr)
+            if column.nullable:
+                # Nulls are sorted last regardless of direction, consistent with other stores
+                orders.append(column.is_(None))
+            orders.append(column.desc() if order_attr.desc else column)
+        return orders
+
+    def _default_order_by(self) -> List[Column]:
+        # pylint: disable=E1101
+        orders = [self.table.columns.get(n) for n in self._get_sorted_key_attrs()]
+        return orders
+
+    def _keyset_where_clause(
+        self, search_order: Optional[SearchOrder], values: Tuple[Any, ...], key: str
+    ):
+        """
+        Get a where clause matching rows which sort after the cursor given (The sort values and key of the
+        last item in the previous page). Where all columns are sorted in the same direction and are not
+        nullable, this is a row value comparison - (sort_cols..., key_cols...) > (values..., key_values...)
+        which databases can answer using an index. Otherwise the equivalent expansion is used:
+        c1 > v1 OR (c1 = v1 AND (c2 > v2 OR (c2 = v2 AND ...)))
+        """
+        # pylint: disable=E1101
+        columns = []
+        if search_order:
+            attrs_by_name = {a.name: a for a in self.meta.attrs}
+            for order, value in zip(search_order.orders, values):
+                attr = attrs_by_name[order.attr]
+                column = self.table.columns.get(order.attr)
+                columns.append((column, order.desc, self._dump_value(attr, value)))
+        key_dict = self.meta.key_config.to_key_dict(key)
+        for attr_name in self._get_sorted_key_attrs():
+            column = self.table.columns.get(attr_name)
+            value = transform_type(key_dict[attr_name])
+            columns.append((column, is_key_desc(search_order), value))
+
+        desc = columns[0][1]
+        if all(c[1] == desc and not c[0].nullable for c in columns):
+            row = tuple_(*(c[0] for c in columns))
+            row_values = tuple_(*(literal(c[2], c[0].type) for c in columns))
+            return row < row_values if desc else row > row_values
+
+        clause = None
+        for column, desc, value in reversed(columns):
+            if value is None:
+                # Nulls are sorted last, so only other nulls may come after a null
+                clause = (
+                    and_(column.is_(None), clause) if clause is not None else false()
+                )
+                continue
+            after = column < value if desc else column > value
+            if column.nullable:
+                after = or_(after, column.is_(None))
+            if clause is not None:
+                after = or_(after, and_(column == value, clause))
+            clause = after
+        return clause
+
+
+def is_key_desc(search_order: Optional[SearchOrder]) -> bool:
+    return bool(search_order and search_order.orders and search_order.orders[-1].desc)
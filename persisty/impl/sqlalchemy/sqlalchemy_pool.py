@@ -0,0 +1,188 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from persisty.impl.sqlalchemy.sqlalchemy_dialect import MYSQL, POSTGRESQL
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class SqlalchemyPoolConfig:
+    """
+    Connection pool settings for an engine. Unset values use the sqlalchemy defaults. Size, overflow and
+    timeout only apply to queue based pools (e.g.: Not to in memory sqlite).
+    """
+
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    # Seconds after which connections are replaced
+    pool_recycle: Optional[int] = None
+    # Test connections for liveness on checkout
+    pool_pre_ping: bool = False
+    # Seconds to wait for a connection before giving up
+    pool_timeout: Optional[float] = None
+    # Milliseconds after which the database should cancel a statement (postgresql and mysql)
+    statement_timeout: Optional[int] = None
+
+    @staticmethod
+    def from_env() -> "SqlalchemyPoolConfig":
+        return SqlalchemyPoolConfig(
+            pool_size=_int_from_env("PERSISTY_SQL_POOL_SIZE"),
+            max_overflow=_int_from_env("PERSISTY_SQL_MAX_OVERFLOW"),
+            pool_recycle=_int_from_env("PERSISTY_SQL_POOL_RECYCLE"),
+            pool_pre_ping=_bool_from_env("PERSISTY_SQL_POOL_PRE_PING"),
+            pool_timeout=_float_from_env("PERSISTY_SQL_POOL_TIMEOUT"),
+            statement_timeout=_int_from_env("PERSISTY_SQL_STATEMENT_TIMEOUT"),
+        )
+
+    def get_engine_kwargs(self, sql_urn: str) -> Dict[str, Any]:
+        """Get the keyword arguments for create_engine / create_async_engine"""
+        kwargs = {"pool_pre_ping": self.pool_pre_ping}
+        if self.pool_recycle is not None:
+            kwargs["pool_recycle"] = self.pool_recycle
+        url = make_url(sql_urn)
+        pool_class = url.get_dialect().get_pool_class(url)
+        instrumented_pool_class = _INSTRUMENTED_POOL_CLASSES.get(pool_class)
+        if not instrumented_pool_class:
+            return kwargs
+        kwargs["poolclass"] = instrumented_pool_class
+        if self.pool_size is not None:
+            kwargs["pool_size"] = self.pool_size
+        if self.max_overflow is not None:
+            kwargs["max_overflow"] = self.max_overflow
+        if self.pool_timeout is not None:
+            kwargs["pool_timeout"] = self.pool_timeout
+        return kwargs
+
+    def configure_engine(self, engine: Engine):
+        """Apply any settings which can not be passed when creating the engine"""
+        if self.statement_timeout is None:
+            return
+        sql = _STATEMENT_TIMEOUT_SQL.get(engine.dialect.name)
+        if not sql:
+            # pylint: disable=W1203
+            LOGGER.warning(f"statement_timeout_not_supported:{engine.dialect.name}")
+            return
+        sql = sql.format(int(self.statement_timeout))
+
+        # pylint: disable=W0613
+        def set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(sql)
+            cursor.close()
+
+        event.listen(engine, "connect", set_statement_timeout)
+
+
+@dataclass
+class SqlalchemyPoolMetrics:
+    """Metrics for connections checked out from a pool, since it was created"""
+
+    checked_out: int = 0
+    checkouts: int = 0
+    # Number of times a connection beyond the pool size was opened
+    overflow_events: int = 0
+    # Number of times no connection became available within the pool timeout
+    timeouts: int = 0
+    total_wait_seconds: float = 0
+    max_wait_seconds: float = 0
+    _lock: Lock = field(default_factory=Lock, repr=False, compare=False)
+
+    def record_checkout(self, wait_seconds: float, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> "SqlalchemyPoolMetrics":
+        with self._lock:
+            return SqlalchemyPoolMetrics(
+                checked_out=pool.checkedout(),
+                checkouts=self.checkouts,
+                overflow_events=self.overflow_events,
+                timeouts=self.timeouts,
+                total_wait_seconds=self.total_wait_seconds,
+                max_wait_seconds=self.max_wait_seconds,
+            )
+
+
+class _InstrumentedPoolMixin:
+    """Records the time spent waiting for connections, along with overflow and timeout events"""
+
+    metrics: SqlalchemyPoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = SqlalchemyPoolMetrics()
+
+    def _do_get(self):
+        start = perf_counter()
+        overflow = self.overflow()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        overflowed = self.overflow() > max(overflow, 0)
+        self.metrics.record_checkout(perf_counter() - start, overflowed)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool recording metrics"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording metrics"""
+
+
+def get_pool_metrics(pool: Pool) -> Optional[SqlalchemyPoolMetrics]:
+    """Get metrics for the pool given, if it is instrumented"""
+    metrics = getattr(pool, "metrics", None)
+    if isinstance(metrics, SqlalchemyPoolMetrics):
+        return metrics.snapshot(pool)
+
+
+_INSTRUMENTED_POOL_CLASSES = {
+    QueuePool: InstrumentedQueuePool,
+    AsyncAdaptedQueuePool: InstrumentedAsyncAdaptedQueuePool,
+}
+
+_STATEMENT_TIMEOUT_SQL = {
+    POSTGRESQL: "SET statement_timeout = {}",
+    MYSQL: "SET SESSION max_execution_time = {}",
+}
+
+
+def _int_from_env(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def _float_from_env(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def _bool_from_env(name: str) -> bool:
+    return (os.environ.get(name) or "").lower() in ("true", "1")
@@ -0,0 +1,177 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+from marshy.types import ExternalItemType
+from sqlalchemy import Table, and_, bindparam, select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import BindParameter, or_
+
+from persisty.impl.sqlalchemy.sqlalchemy_dialect import MSSQL, MYSQL, POSTGRESQL, SQLITE
+from persisty.store_meta import StoreMeta
+
+# Dialects which do not support row value (tuple) IN clauses, so composite keys are matched with OR / AND
+_NO_ROW_VALUE_IN_DIALECTS = frozenset((MSSQL,))
+
+# Dialects with a native upsert (INSERT ... ON CONFLICT DO UPDATE / ON DUPLICATE KEY UPDATE)
+_UPSERT_DIALECTS = frozenset((POSTGRESQL, SQLITE, MYSQL))
+
+
+class SqlalchemyStatementCacheMixin:
+    """
+    Statements for a SqlalchemyTableStore. Statements are generated once for each store and cached, so
+    sqlalchemy does not need to rebuild (or recompile) them for every operation.
+    """
+
+    meta: StoreMeta
+    table: Table
+    engine: Engine
+
+    def _get_compiled(self, name: str, generate: Callable, *args) -> Any:
+        """
+        Get a generated conversion function or parameterized statement, generating it if it does not
+        already exist
+        """
+        result = self.__dict__.get(name)
+        if result is None:
+            result = generate(*args)
+            object.__setattr__(self, name, result)
+        return result
+
+    def _get_sorted_key_attrs(self) -> Tuple[str, ...]:
+        """
+        Key attributes in a consistent order, (Key attrs are a set) so that page keys remain valid between
+        processes
+        """
+        return tuple(sorted(self.meta.key_config.get_key_attrs()))
+
+    def _is_returning_supported(self) -> bool:
+        return bool(self.engine.dialect.full_returning)
+
+    def _is_upsert_supported(self) -> bool:
+        return self.engine.dialect.name in _UPSERT_DIALECTS
+
+    def _upsert_stmt(self, columns: Tuple[str, ...]):
+        return self._get_compiled(
+            f"_upsert_stmt:{','.join(columns)}", self._generate_upsert_stmt, columns
+        )
+
+    def _generate_upsert_stmt(self, columns: Tuple[str, ...]):
+        """
+        Generate an upsert for the columns given. On conflict, only attributes which may be updated are
+        overwritten, so values such as a created timestamp are retained.
+        """
+        key_attrs = self._get_sorted_key_attrs()
+        attrs_by_name = {a.name: a for a in self.meta.attrs}
+        update_columns = [
+            c
+            for c in columns
+            if c not in key_attrs
+            and (attrs_by_name[c].updatable or attrs_by_name[c].update_generator)
+        ]
+        dialect_name = self.engine.dialect.name
+        if dialect_name == MYSQL:
+            stmt = mysql_insert(self.table)
+            # At least one column must be set, so a key sets itself if there are no others
+            update_columns = update_columns or key_attrs[:1]
+            return stmt.on_duplicate_key_update(
+                {c: stmt.inserted[c] for c in update_columns}
+            )
+        insert = postgresql_insert if dialect_name == POSTGRESQL else sqlite_insert
+        stmt = insert(self.table)
+        index_elements = [self.table.columns[k] for k in key_attrs]
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=index_elements)
+        return stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={c: stmt.excluded[c] for c in update_columns},
+        )
+
+    def _generate_update_stmt(self):
+        """
+        Update statement for executemany. The columns to set are taken from the parameters - key columns
+        are matched using the "{name}_1" parameters produced by _dump, since column names are reserved.
+        """
+        # pylint: disable=E1101
+        return self.table.update().where(
+            and_(
+                self.table.columns.get(attr_name) == bindparam(f"{attr_name}_1")
+                for attr_name in self.meta.key_config.get_key_attrs()
+            )
+        )
+
+    def _generate_insert_returning_stmt(self):
+        return self.table.insert().returning(*self.table.columns)
+
+    def _generate_update_returning_stmt(self):
+        return self._generate_update_stmt().returning(*self.table.columns)
+
+    def _generate_read_stmt(self):
+        return self.table.select().where(self._key_where_clause())
+
+    def _generate_delete_stmt(self):
+        return self.table.delete().where(self._key_where_clause())
+
+    def _generate_select_keys_stmt(self):
+        return select(*(self.table.columns[a] for a in self._get_sorted_key_attrs()))
+
+    def _key_batch_stmt(
+        self, name: str, generate_base: Callable, keys: List[ExternalItemType]
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Get a statement restricted to the keys given, along with the parameters for executing it. The
+        statement uses an expanding IN parameter (Against a row value for composite keys) so it is built once
+        and reused for any number of keys.
+        """
+        key_attrs = self._get_sorted_key_attrs()
+        if len(key_attrs) == 1:
+            key_attr = key_attrs[0]
+            params = {"keys": [k.get(key_attr) for k in keys]}
+        elif self.engine.dialect.name in _NO_ROW_VALUE_IN_DIALECTS:
+            return generate_base().where(self._key_where_clause_from_dicts(keys)), {}
+        else:
+            params = {"keys": [tuple(k.get(a) for a in key_attrs) for k in keys]}
+        stmt = self._get_compiled(
+            name, lambda: generate_base().where(self._key_in_clause())
+        )
+        return stmt, params
+
+    def _key_in_clause(self):
+        key_attrs = self._get_sorted_key_attrs()
+        cols = [self.table.columns[a] for a in key_attrs]
+        keys = bindparam("keys", expanding=True)
+        if len(cols) == 1:
+            return cols[0].in_(keys)
+        return tuple_(*cols).in_(keys)
+
+    def _key_where_clause(self):
+        key_where_clause = None
+        for attr_name in self.meta.key_config.get_key_attrs():
+            # pylint: disable=E1101
+            exp = self.table.columns.get(attr_name) == BindParameter(attr_name)
+            if key_where_clause:
+                key_where_clause &= exp
+            else:
+                key_where_clause = exp
+        return key_where_clause
+
+    def _key_where_clause_from_dicts(self, dicts: List[ExternalItemType]):
+        key_attrs = list(self.meta.key_config.get_key_attrs())
+        if len(key_attrs) == 1:
+            keys_for_where = [d.get(key_attrs[0]) for d in dicts]
+            where_clause = self.table.columns[key_attrs[0]].in_(keys_for_where)
+        else:
+            where_clause = []
+            for d in dicts:
+                where_clause.append(self._key_where_clause_from_dict(d))
+            where_clause = or_(*where_clause)
+        return where_clause
+
+    def _key_where_clause_from_dict(self, item: ExternalItemType):
+        # pylint: disable=E1101
+        where_clause = and_(
+            self.table.columns.get(attr_name) == item.get(attr_name)
+            for attr_name in self.meta.key_config.get_key_attrs()
+        )
+        return where_clause
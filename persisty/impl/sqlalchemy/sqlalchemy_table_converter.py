@@ -23,6 +23,10 @@ def is_using_sql_native_constraints():
     return os.environ.get("PERSISTY_SQL_NATIVE_CONSTRAINTS") != "0"
 
 
+def is_using_native_postgres_types():
+    return os.environ.get("PERSISTY_SQL_NATIVE_POSTGRES_TYPES") == "1"
+
+
 @dataclass
 class SqlalchemyTableConverter:
     """Converter for store meta to / from sqlalchemy tables"""
@@ -31,6 +35,7 @@ class SqlalchemyTableConverter:
     metadata: MetaData
     schema: Dict[str, StoreMeta] = field(default_factory=dict)
     native_constraints: bool = field(default_factory=is_using_sql_native_constraints)
+    native_postgres_types: bool = field(default_factory=is_using_native_postgres_types)
 
     # pylint: disable=R0914
     def to_sqlalchemy_table_and_indexes(
@@ -41,7 +46,9 @@ class SqlalchemyTableConverter:
             self.metadata,
         ]
         dialect = self.engine.dialect.name
-        column_factory = SqlalchemyColumnConverter(store_meta.key_config, dialect)
+        column_factory = SqlalchemyColumnConverter(
+            store_meta.key_config, dialect, self.native_postgres_types
+        )
         columns_by_name = {}
         indexes = []
         for attr_ in store_meta.attrs:
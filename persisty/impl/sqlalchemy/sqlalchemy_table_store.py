@@ -1,24 +1,57 @@
+import inspect
 import json
-from datetime import timezone
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
 from enum import Enum
-from typing import Optional, List, Iterator, Tuple, Any, Dict
+from io import StringIO
+from itertools import groupby, islice
+from typing import (
+    Optional,
+    List,
+    Iterator,
+    Tuple,
+    Any,
+    Dict,
+    Callable,
+    Iterable,
+    Union,
+)
 
 from dataclasses import dataclass
-from uuid import UUID
 
 import marshy
+from marshy.factory.optional_marshaller_factory import get_optional_type
 from marshy.types import ExternalItemType
-from sqlalchemy import Table, and_, select, func, Column
-from sqlalchemy.engine import Engine
+from sqlalchemy import Table, and_, func
+from sqlalchemy.dialects.postgresql import JSON as PostgresJson
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import DatabaseError
-from sqlalchemy.sql.elements import BindParameter, or_
 
 from persisty.errors import PersistyError
+from persisty.attr.attr import Attr
 from persisty.attr.attr_type import AttrType
+from persisty.attr.generator.default_value_generator import DefaultValueGenerator
+from persisty.attr.generator.fixed_value_generator import FixedValueGenerator
+from persisty.attr.generator.timestamp_generator import TimestampGenerator
 from persisty.impl.sqlalchemy.search_filter.search_filter_converter_context import (
     SearchFilterConverterContext,
 )
-from persisty.impl.sqlalchemy.sqlalchemy_column_converter import POSTGRES
+from persisty.impl.sqlalchemy.sqlalchemy_batch import SqlalchemyBatchMixin
+from persisty.impl.sqlalchemy.sqlalchemy_dialect import POSTGRESQL
+from persisty.impl.sqlalchemy.sqlalchemy_keyset import (
+    SqlalchemyKeysetMixin,
+    is_key_desc,
+)
+from persisty.impl.sqlalchemy.sqlalchemy_statement_cache import (
+    SqlalchemyStatementCacheMixin,
+)
+from persisty.impl.sqlalchemy.sqlalchemy_values import (
+    from_utc,
+    to_utc,
+    to_uuid,
+    transform_type,
+)
 from persisty.search_filter.exclude_all import EXCLUDE_ALL
 from persisty.batch_edit import BatchEdit
 from persisty.batch_edit_result import BatchEditResult
@@ -26,9 +59,35 @@ from persisty.result_set import ResultSet
 from persisty.search_filter.include_all import INCLUDE_ALL
 from persisty.search_filter.search_filter_abc import SearchFilterABC
 from persisty.search_order.search_order import SearchOrder
-from persisty.store.store_abc import StoreABC, T
+from persisty.store.store_abc import StoreABC, T, from_page_key, to_page_key
 from persisty.store_meta import StoreMeta
-from persisty.util import UNDEFINED, from_base64, to_base64
+from persisty.util import UNDEFINED, get_logger
+from persisty.util.codegen import compile_function
+
+logger = get_logger(__name__)
+
+# Generators whose values do not depend on the item being updated, so may be applied to many items at once
+_ITEM_INDEPENDENT_GENERATORS = (
+    DefaultValueGenerator,
+    FixedValueGenerator,
+    TimestampGenerator,
+)
+
+# Connections for the sessions active in the current context, by engine
+_SESSION_CONNECTIONS: ContextVar[Optional[Dict[Engine, Connection]]] = ContextVar(
+    "_SESSION_CONNECTIONS", default=None
+)
+
+
+@contextmanager
+def use_session_connection(connection: Connection) -> Iterator[Connection]:
+    """Use the connection given for all operations on stores sharing its engine within this context"""
+    connections = _SESSION_CONNECTIONS.get() or {}
+    token = _SESSION_CONNECTIONS.set({**connections, connection.engine: connection})
+    try:
+        yield connection
+    finally:
+        _SESSION_CONNECTIONS.reset(token)
 
 
 def catch_db_error(fn):
@@ -42,7 +101,12 @@ def catch_db_error(fn):
 
 
 @dataclass(frozen=True)
-class SqlalchemyTableStore(StoreABC):
+class SqlalchemyTableStore(
+    SqlalchemyBatchMixin,
+    SqlalchemyKeysetMixin,
+    SqlalchemyStatementCacheMixin,
+    StoreABC,
+):
     """
     This class uses sql alchemy at a lower level than the standard orm usage
     """
@@ -50,39 +114,92 @@ class SqlalchemyTableStore(StoreABC):
     meta: StoreMeta
     table: Table
     engine: Engine
+    # If set, edit_all loads runs of at least this many creates using COPY where supported (See edit_all)
+    copy_batch_size: Optional[int] = None
 
     def get_meta(self) -> StoreMeta:
         return self.meta
 
+    @contextmanager
+    def session(self) -> Iterator[Connection]:
+        """
+        Operations within the session on any store sharing this engine use a single connection and transaction,
+        which is committed on exit (Or rolled back on error). Nested sessions join the outermost session.
+        """
+        connections = _SESSION_CONNECTIONS.get() or {}
+        connection = connections.get(self.engine)
+        if connection is not None:
+            yield connection
+            return
+        with self.engine.begin() as connection, use_session_connection(connection):
+            yield connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[Connection]:
+        """Get the connection for the current session, or begin a new transaction if there is none"""
+        connections = _SESSION_CONNECTIONS.get()
+        connection = connections.get(self.engine) if connections else None
+        if connection is not None:
+            yield connection
+            return
+        with self.engine.begin() as connection:
+            yield connection
+
     @catch_db_error
     def create(self, item: T) -> Optional[T]:
         dumped = self._dump(item, False)
-        with self.engine.begin() as connection:
+        with self._connection() as connection:
+            if self._is_returning_supported():
+                stmt = self._get_compiled(
+                    "_insert_returning_stmt", self._generate_insert_returning_stmt
+                )
+                row = connection.execute(stmt, dumped).first()
+                return self._load_row(row)
             result = connection.execute(self.table.insert(), parameters=dumped)
-            if result.inserted_primary_key:
-                row = self._load_row(result.inserted_primary_key)
-                for attr in self.meta.attrs:
-                    value = getattr(row, attr.name)
-                    if value is UNDEFINED:
-                        setattr(row, attr.name, value)
-            connection.commit()
+            # Reflect any key generated by the database (e.g.: autoincrement)
+            primary_key = result.inserted_primary_key or ()
+            for column, value in zip(self.table.primary_key.columns, primary_key):
+                if getattr(item, column.name, None) in (None, UNDEFINED):
+                    setattr(item, column.name, value)
             return item
 
+    @catch_db_error
+    def upsert(self, item: T) -> Optional[T]:
+        """
+        Where the dialect supports it, this is a single INSERT ... ON CONFLICT DO UPDATE (Or ON DUPLICATE KEY
+        UPDATE) statement, so there is no race between reading the existing item and writing it.
+        """
+        key = self.meta.key_config.to_key_str(item)
+        if not key or not self._is_upsert_supported():
+            return super().upsert(item)
+        dumped = self._dump(item, False)
+        key_dict = self.meta.key_config.to_key_dict(key)
+        with self._connection() as connection:
+            stmt = self._upsert_stmt(tuple(dumped))
+            if self._is_returning_supported():
+                stmt = stmt.returning(*self.table.columns)
+                row = connection.execute(stmt, dumped).first()
+                # A conflict does not return a row if there was nothing to update (DO NOTHING)
+                return self._load_row(row) if row else self._read(connection, key_dict)
+            connection.execute(stmt, dumped)
+            # Existing values which were not updated are unknown, so the item is read back
+            return self._read(connection, key_dict)
+
     @catch_db_error
     def read(self, key: str) -> Optional[T]:
-        with self.engine.begin() as connection:
+        with self._connection() as connection:
             key_dict = self.meta.key_config.to_key_dict(key)
             return self._read(connection, key_dict)
 
     def _read(self, connection, key_dict: ExternalItemType) -> Optional[Dict]:
-        stmt = self.table.select().where(self._key_where_clause())
+        stmt = self._get_compiled("_read_stmt", self._generate_read_stmt)
         row = connection.execute(stmt, key_dict).first()
         if row:
             item = self._load_row(row)
             return item
 
     def read_batch(self, keys: List[str]) -> List[Optional[T]]:
-        with self.engine.begin() as connection:
+        with self._connection() as connection:
             key_config = self.meta.key_config
             key_objs = [key_config.to_key_dict(key) for key in keys]
             items = self._read_batch(connection, key_objs)
@@ -91,17 +208,19 @@ class SqlalchemyTableStore(StoreABC):
             return items
 
     def _read_batch(
-        self, connection, keys: List[T], cols: Optional[List[Column]] = None
-    ) -> List[Dict]:
+        self, connection, keys: List[ExternalItemType], keys_only: bool = False
+    ) -> List[T]:
         # NB: Does not enforce ordering
         assert len(keys) <= self.meta.batch_size
-        where_clause = self._key_where_clause_from_dicts(keys)
-        if cols:
-            stmt = select(*cols)
+        if keys_only:
+            stmt, params = self._key_batch_stmt(
+                "_read_batch_keys_stmt", self._generate_select_keys_stmt, keys
+            )
         else:
-            stmt = self.table.select()
-        stmt = stmt.where(where_clause)
-        results = connection.execute(stmt)
+            stmt, params = self._key_batch_stmt(
+                "_read_batch_stmt", self.table.select, keys
+            )
+        results = connection.execute(stmt, params)
         items = [self._load_row(r) for r in results]
         return items
 
@@ -114,22 +233,27 @@ class SqlalchemyTableStore(StoreABC):
         updates: T,
         search_filter: SearchFilterABC = INCLUDE_ALL,
     ) -> Optional[T]:
-        with self.engine.begin() as connection:
-            stmt = self.table.update().where(self._key_where_clause_from_item(updates))
-            updates = self._dump(updates, True)
-            connection.execute(stmt, updates)
-            key_dict = self.meta.key_config.to_key_dict(key)
-            loaded = self._read(connection, key_dict)
-            connection.commit()
-            return loaded
+        with self._connection() as connection:
+            dumped = self._dump(updates, True)
+            if self._is_returning_supported():
+                stmt = self._get_compiled(
+                    "_update_returning_stmt", self._generate_update_returning_stmt
+                )
+                row = connection.execute(stmt, dumped).first()
+                return self._load_row(row) if row else None
+            stmt = self._get_compiled("_batch_update_stmt", self._generate_update_stmt)
+            result = connection.execute(stmt, dumped)
+            if not result.rowcount:
+                return None
+            # Read the row back, so values set by the database (e.g.: triggers, onupdate) are reflected
+            return self._read(connection, self.meta.key_config.to_key_dict(key))
 
     @catch_db_error
     def delete(self, key: str) -> bool:
-        with self.engine.begin() as connection:
+        with self._connection() as connection:
             key = self.meta.key_config.to_key_dict(key)
-            stmt = self.table.delete().where(self._key_where_clause())
+            stmt = self._get_compiled("_delete_stmt", self._generate_delete_stmt)
             result = connection.execute(stmt, key)
-            connection.commit()
             return bool(result.rowcount)
 
     @catch_db_error
@@ -140,15 +264,16 @@ class SqlalchemyTableStore(StoreABC):
     def count(self, search_filter: SearchFilterABC = INCLUDE_ALL) -> int:
         if search_filter is EXCLUDE_ALL:
             return 0
-        where_clause, handled = self._search_filter_to_where_clause(search_filter)
-        if not handled:
+        where_clause, residue = self._search_filter_to_where_clause(search_filter)
+        if residue is not INCLUDE_ALL:
+            # Only rows matching the converted part of the filter are loaded to be checked in python
             count = sum(1 for _ in self.search_all(search_filter))
             return count
         stmt = func.count().select()
         stmt = stmt.select_from(self.table)
         if where_clause is not None:
             stmt = stmt.where(where_clause)
-        with self.engine.begin() as connection:
+        with self._connection() as connection:
             row = connection.execute(stmt).first()
             return row[0]
 
@@ -161,57 +286,49 @@ class SqlalchemyTableStore(StoreABC):
         page_key: Optional[str] = None,
         limit: Optional[int] = None,
     ) -> ResultSet[T]:
+        if limit is None:
+            limit = self.meta.batch_size
         assert limit <= self.meta.batch_size
-        where_clause, handled = self._search_filter_to_where_clause(search_filter)
-        order_by = self._search_order_to_order_by(search_order)
-        if order_by is None:
-            order_by = self._default_order_by()
-        offset = 0
+        if search_filter is EXCLUDE_ALL:
+            return ResultSet([])
+        where_clause, residue = self._search_filter_to_where_clause(search_filter)
+        order_by = self._search_order_to_order_by(search_order) or []
+        # The key is always the last sort column, so the order is total and pages can resume from any item.
+        # It follows the direction of the last sort column, so a row value comparison may be used for paging
+        key_desc = is_key_desc(search_order)
+        order_by.extend(c.desc() if key_desc else c for c in self._default_order_by())
         if page_key:
-            page_key = from_base64(page_key)
-            if page_key[0] == "offset":
-                offset = page_key[1]
+            values, key = from_page_key(self.meta, search_order, page_key)
+            keyset_clause = self._keyset_where_clause(search_order, values, key)
+            if where_clause is None:
+                where_clause = keyset_clause
             else:
-                # noinspection PyTypeChecker
-                key_where_clause = and_(
-                    self.table.columns.get(a) > page_key[1][a]
-                    for a in self.meta.key_config.get_key_attrs()
-                )
-                where_clause = (
-                    and_(where_clause, key_where_clause)
-                    if where_clause is not None
-                    else key_where_clause
-                )
+                where_clause = and_(where_clause, keyset_clause)
 
         stmt = self.table.select()
         if where_clause is not None:
             stmt = stmt.where(where_clause)
         stmt = stmt.order_by(*order_by)
-        if offset:
-            stmt = stmt.offset(offset)
+        handled = residue is INCLUDE_ALL
         if handled:
             stmt = stmt.limit(limit)
+        else:
+            # Rows are checked in python until the page is full, so there is no need to load them all
+            stmt = stmt.execution_options(stream_results=True)
 
-        with self.engine.begin() as connection:
+        match = None if handled else residue.compile(self.meta.attrs)
+        with self._connection() as connection:
             rows = connection.execute(stmt)
+            if not handled:
+                rows = rows.yield_per(limit)
             results = []
             next_page_key = None
             for row in rows:
                 result = self._load_row(row)
-                if handled or search_filter.match(result, self.meta.attrs):
+                if handled or match(result):
                     results.append(result)
                     if len(results) == limit:
-                        if search_order and search_order.orders:
-                            next_page_key = ["offset", offset + len(results)]
-                        if not search_order or not search_order.orders:
-                            next_page_key = [
-                                "id",
-                                {
-                                    a: _transform_type(getattr(result, a))
-                                    for a in self.meta.key_config.get_key_attrs()
-                                },
-                            ]
-                        next_page_key = to_base64(next_page_key)
+                        next_page_key = to_page_key(self.meta, search_order, result)
                         break
             return ResultSet(results, next_page_key)
 
@@ -222,247 +339,321 @@ class SqlalchemyTableStore(StoreABC):
         search_order: Optional[SearchOrder] = None,
     ) -> Iterator[T]:
         if search_filter is EXCLUDE_ALL:
-            return ResultSet([])
-        where_clause, handled = self._search_filter_to_where_clause(search_filter)
+            return iter(())
+        where_clause, residue = self._search_filter_to_where_clause(search_filter)
         order_by = self._search_order_to_order_by(search_order)
         stmt = self.table.select()
         if where_clause is not None:
             stmt = stmt.where(where_clause)
         if order_by is not None:
             stmt = stmt.order_by(*order_by)
-        with self.engine.begin() as connection:
-            rows = connection.execute(stmt)
-            for row in rows:
-                item = self._load_row(row)
-                if not handled and not search_filter.match(item, self.meta.attrs):
-                    continue
-                yield item
+        # Rows are streamed from a server side cursor (where supported) in chunks of batch_size, so memory
+        # use does not depend on the number of results
+        stmt = stmt.execution_options(stream_results=True)
+        match = None if residue is INCLUDE_ALL else residue.compile(self.meta.attrs)
+        return self._stream(stmt, match)
+
+    def _stream(self, stmt, match: Optional[Callable[[T], bool]]) -> Iterator[T]:
+        """
+        Stream the items selected by the statement given, skipping any not matching the function given.
+        Outside a session, the stream has its own connection, which is closed explicitly (Rather than by
+        exiting a transaction) when the stream is exhausted or closed. A stream which is abandoned may only be
+        closed when garbage collected, by which time the database may have been closed - nothing was written,
+        so failing to release the connection at that point is logged rather than raised.
+        """
+        connections = _SESSION_CONNECTIONS.get()
+        session_connection = connections.get(self.engine) if connections else None
+        connection = session_connection or self.engine.connect()
+        result = None
+        abandoned = False
+        try:
+            result = connection.execute(stmt).yield_per(self.meta.batch_size)
+            load = self._get_row_loader(tuple(result.keys()))
+            for rows in result.partitions():
+                for row in rows:
+                    item = load(row)
+                    if match is None or match(item):
+                        yield item
+        except GeneratorExit:
+            abandoned = True
+            raise
+        except DatabaseError as e:
+            raise PersistyError(e) from e
+        finally:
+            try:
+                if result is not None:
+                    result.close()
+                if session_connection is None:
+                    connection.close()
+            except DatabaseError as e:
+                if not abandoned:
+                    raise PersistyError(e) from e
+                logger.warning("stream_close_failed", exc_info=e)
 
     @catch_db_error
     def edit_batch(self, edits: List[BatchEdit]) -> List[BatchEditResult]:
         assert len(edits) <= self.meta.batch_size
+        return self._edit_batch(edits)
+
+    @catch_db_error
+    def _edit_batch(
+        self, edits: List[BatchEdit], items_by_key: Optional[Dict[str, T]] = None
+    ) -> List[BatchEditResult]:
+        """
+        Apply edits using one statement per type of edit. Wrapper stores call this from StoreABC.edit_batch
+        with the existing items already read, in which case they are not read again.
+        """
         results_by_id = {}
         inserts = [e for e in edits if e.create_item]
+        upserts = [e for e in edits if e.upsert_item]
         updates = [e for e in edits if e.update_item]
         deletes = [e for e in edits if e.delete_key]
-        with self.engine.begin() as connection:
+        with self._connection() as connection:
             if inserts:
                 self._batch_insert(connection, inserts, results_by_id)
+            if upserts:
+                self._batch_upsert(connection, upserts, results_by_id)
             if updates:
-                self._batch_update(connection, updates, results_by_id)
+                self._batch_update(connection, updates, results_by_id, items_by_key)
             if deletes:
                 self._batch_delete(connection, deletes, results_by_id)
             results = [results_by_id[e.id] for e in edits]
-            connection.commit()
             return results
 
-    def _batch_insert(
-        self,
-        connection,
-        edits: List[BatchEdit],
-        results_by_id: Dict[UUID, BatchEditResult],
-    ):
-        stmt = self.table.insert()  # bind=connection)
-        items_to_create = [self._dump(e.create_item, False) for e in edits]
-        connection.execute(stmt, items_to_create)
-        for insert in edits:
-            results_by_id[insert.id] = BatchEditResult(insert, True)
-
-    # pylint: disable=E1101
-    def _batch_update(
-        self,
-        connection,
-        edits: List[BatchEdit],
-        results_by_id: Dict[UUID, BatchEditResult],
-    ):
-        edits_by_key = {}
-        key_dicts_to_load_row = []
-        key_attrs = self.meta.key_config.get_key_attrs()
-        to_key_str = self.meta.key_config.to_key_str
+    def edit_all(
+        self, edits: Union[Iterator[BatchEdit[T, T]], Iterable[BatchEdit[T, T]]]
+    ) -> Iterator[BatchEditResult[T, T]]:
+        """
+        If copy_batch_size is set and the driver supports it (postgresql with psycopg2), runs of at least
+        copy_batch_size consecutive creates are loaded using COPY, which is much faster than INSERT for very
+        large loads. Items loaded this way are not checked for existing keys (A duplicate fails the whole
+        run) and values generated by the database are not reflected in them.
+        """
+        if not self.copy_batch_size or not self._is_copy_supported():
+            yield from super().edit_all(edits)
+            return
+        for is_create, group in groupby(edits, key=lambda e: bool(e.create_item)):
+            if not is_create:
+                yield from super().edit_all(group)
+                continue
+            while True:
+                creates = list(islice(group, self.copy_batch_size))
+                if len(creates) == self.copy_batch_size:
+                    yield from self._copy_insert(creates)
+                    continue
+                yield from super().edit_all(creates)
+                break
+
+    @catch_db_error
+    def update_all(self, search_filter: SearchFilterABC, updates: T):
+        """
+        If the filter can be fully converted to sql and the updated values do not depend on the items
+        being updated, this is a single UPDATE statement. Otherwise items are loaded and updated in batches.
+        """
+        if search_filter is EXCLUDE_ALL:
+            return
+        where_clause, residue = self._search_filter_to_where_clause(search_filter)
+        handled = residue is INCLUDE_ALL
+        values = self._get_update_all_values(updates) if handled else None
+        if values is None:
+            super().update_all(search_filter, updates)
+            return
+        if not values:
+            return
+        stmt = self.table.update().values(values)
+        if where_clause is not None:
+            stmt = stmt.where(where_clause)
+        with self._connection() as connection:
+            connection.execute(stmt)
+
+    @catch_db_error
+    def delete_all(self, search_filter: SearchFilterABC):
+        """If the filter can be fully converted to sql, this is a single DELETE statement"""
+        if search_filter is EXCLUDE_ALL:
+            return
+        where_clause, residue = self._search_filter_to_where_clause(search_filter)
+        if residue is not INCLUDE_ALL:
+            super().delete_all(search_filter)
+            return
+        stmt = self.table.delete()
+        if where_clause is not None:
+            stmt = stmt.where(where_clause)
+        with self._connection() as connection:
+            connection.execute(stmt)
+
+    def _get_update_all_values(self, updates: T) -> Optional[Dict[str, Any]]:
+        """
+        Get the column values with which to update all items, or None if any value must be generated
+        separately for each item
+        """
+        key_attrs = set(self.meta.key_config.get_key_attrs())
+        values = {}
+        for attr in self.meta.attrs:
+            value = UNDEFINED
+            if attr.updatable and attr.name not in key_attrs:
+                value = getattr(updates, attr.name, UNDEFINED)
+            generator = attr.update_generator
+            if generator:
+                if not isinstance(generator, _ITEM_INDEPENDENT_GENERATORS):
+                    return None
+                value = generator.transform(value, updates)
+            if value is not UNDEFINED:
+                values[attr.name] = self._dump_value(attr, value)
+        return values
+
+    def _is_copy_supported(self) -> bool:
+        dialect = self.engine.dialect
+        return dialect.name == POSTGRESQL and dialect.driver == "psycopg2"
+
+    @catch_db_error
+    def _copy_insert(self, edits: List[BatchEdit]) -> List[BatchEditResult]:
+        preparer = self.engine.dialect.identifier_preparer
+        column_names = [c.name for c in self.table.columns]
+        buffer = StringIO()
         for edit in edits:
-            edit_key = to_key_str(edit.update_item)
-            edits_by_key[edit_key] = edit
-            key_dicts_to_load_row.append(
-                {k: _transform_type(getattr(edit.update_item, k)) for k in key_attrs}
-            )
-            results_by_id[edit.id] = BatchEditResult(edit)
-        existing_items = self._read_batch(connection, key_dicts_to_load_row)
-        for item in existing_items:
-            key = to_key_str(item)
-            edit = edits_by_key[key]
-            for attr in self.meta.attrs:
-                value = UNDEFINED
-                if attr.update_generator:
-                    if attr.updatable:
-                        value = attr.update_generator.transform(
-                            getattr(edit.update_item, attr.name), edit.update_item
-                        )
-                    else:
-                        value = attr.update_generator.transform(
-                            UNDEFINED, edit.update_item
-                        )
-                elif attr.updatable:
-                    value = getattr(edit.update_item, attr.name)
-                    if value is UNDEFINED:
-                        value = getattr(item, attr.name)
-                if value is not UNDEFINED:
-                    setattr(item, attr.name, _transform_type(value))
-            item_updates = self._dump(item, True)
-            stmt = self.table.update().where(self._key_where_clause_from_item(item))
-            connection.execute(stmt, item_updates)
-            results_by_id[edit.id].success = True
-
-    def _batch_delete(
-        self,
-        connection,
-        edits: List[BatchEdit],
-        results_by_id: Dict[UUID, BatchEditResult],
-    ):
-        key_config = self.meta.key_config
-        delete_keys = [key_config.to_key_dict(d.delete_key) for d in edits]
-        existing_keys = self._get_existing_keys(connection, delete_keys)
-        where_clause = self._key_where_clause_from_dicts(delete_keys)
-        stmt = self.table.delete().where(where_clause)
-        connection.execute(stmt)
-        deleted_keys = {key_config.to_key_str(k) for k in existing_keys}
-        for delete in edits:
-            deleted = delete.delete_key in deleted_keys
-            results_by_id[delete.id] = BatchEditResult(delete, deleted)
-
-    def _get_existing_keys(self, connection, keys: List[Dict]) -> List[Dict]:
-        key_cols = [self.table.columns[a] for a in self.meta.key_config.get_key_attrs()]
-        existing_keys = self._read_batch(connection, keys, key_cols)
-        return existing_keys
+            dumped = self._dump(edit.create_item, False)
+            values = (_to_copy_value(dumped.get(c)) for c in column_names)
+            buffer.write("\t".join(values))
+            buffer.write("\n")
+        buffer.seek(0)
+        table_name = preparer.format_table(self.table)
+        columns = ", ".join(preparer.quote(c) for c in column_names)
+        with self._connection() as connection:
+            cursor = connection.connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN", buffer)
+            finally:
+                cursor.close()
+        return [BatchEditResult(edit, True) for edit in edits]
 
     def _load_row(self, row):
-        # Row is a KeyedTuple - as dict is to match the namedtuple API (it's not private!)
+        # Row is a KeyedTuple - fields is to match the namedtuple API (it's not private!)
         # noinspection PyProtectedMember
-        item = row._asdict()
-        return self._load(item)
-
-    def _load(self, item: Dict):
-        loaded = {}
-        for attr_ in self.meta.attrs:
-            if attr_.name not in item:
+        return self._get_row_loader(row._fields)(row)
+
+    def _get_row_loader(self, fields: Tuple[str, ...]) -> Callable[[Any], T]:
+        loaders = self._get_compiled("_row_loaders", dict)
+        load = loaders.get(fields)
+        if load is None:
+            load = loaders[fields] = self._generate_load(fields)
+        return load
+
+    def _generate_load(self, fields: Tuple[str, ...]) -> Callable[[Any], T]:
+        """
+        Generate a function building a read dataclass directly from a row with the fields given, by position.
+        Values are converted to their python types in place rather than by a round trip through marshy.
+        """
+        context = marshy.get_default_context()
+        namespace = {
+            "read_dataclass": self.meta.get_read_dataclass(),
+            "json_loads": json.loads,
+            "to_uuid": to_uuid,
+            "to_utc": to_utc,
+        }
+        attrs_by_name = {a.name: a for a in self.meta.attrs if a.readable}
+        lines = ["def load(row):"]
+        kwargs = []
+        for index, field_name in enumerate(fields):
+            attr = attrs_by_name.get(field_name)
+            if not attr:
                 continue
-            value = item.get(attr_.name)
-            if (
-                attr_.attr_type == AttrType.JSON
-                and not self.engine.dialect.name == POSTGRES
-            ):
-                value = json.loads(value)
-            elif attr_.attr_type == AttrType.DATETIME and value:
-                if not value.tzinfo:
-                    value.replace(tzinfo=timezone.utc)
-                value = value.strftime("%Y-%m-%dT%H:%M:%S+00:00")
-            if isinstance(value, Enum):
-                value = value.name
-            loaded[attr_.name] = value
-        # noinspection PyTypeChecker
-        result = marshy.load(self.meta.get_read_dataclass(), loaded)
-        return result
+            kwargs.append(f"{attr.name}=value_{index}")
+            python_type = attr.schema.python_type
+            convert = None
+            if attr.attr_type == AttrType.JSON:
+                namespace[f"load_{index}"] = context.get_marshaller(python_type).load
+                convert = (
+                    f"load_{index}(json_loads(value))"
+                    if self._is_json_encoded(attr)
+                    else f"load_{index}(value)"
+                )
+            elif attr.attr_type == AttrType.UUID:
+                convert = "to_uuid(value)"
+            elif attr.attr_type == AttrType.DATETIME:
+                convert = "to_utc(value)"
+            elif _is_enum(python_type):
+                namespace[f"to_enum_{index}"] = _enum_loader(python_type, context)
+                convert = f"to_enum_{index}(value)"
+            if convert:
+                lines.append(f"    value = row[{index}]")
+                lines.append(
+                    f"    value_{index} = None if value is None else {convert}"
+                )
+            else:
+                lines.append(f"    value_{index} = row[{index}]")
+        lines.append(f"    return read_dataclass({', '.join(kwargs)})")
+        return compile_function("load", lines, namespace)
 
     def _dump(self, item: T, is_update: bool):
-        dumped = {}
-        for attr_ in self.meta.attrs:
-            value = getattr(item, attr_.name, UNDEFINED)
-            if is_update:
-                generator = attr_.update_generator
-            else:
-                generator = attr_.create_generator
-            if generator:
-                value = generator.transform(value, item)
-            setattr(item, attr_.name, value)
-            if value is UNDEFINED:
-                continue
-            if (
-                attr_.attr_type == AttrType.JSON
-                and not self.engine.dialect.name == POSTGRES
-            ):
-                value = json.dumps(value)
-            dumped[attr_.name] = _transform_type(value)
         if is_update:
-            for attr_name in self.meta.key_config.get_key_attrs():
-                dumped[f"{attr_name}_1"] = dumped[attr_name]
-        return dumped
-
-    def _key_where_clause(self):
-        key_where_clause = None
-        for attr_name in self.meta.key_config.get_key_attrs():
-            # pylint: disable=E1101
-            exp = self.table.columns.get(attr_name) == BindParameter(attr_name)
-            if key_where_clause:
-                key_where_clause &= exp
-            else:
-                key_where_clause = exp
-        return key_where_clause
-
-    def _key_where_clause_from_dicts(self, dicts: List[ExternalItemType]):
-        key_attrs = list(self.meta.key_config.get_key_attrs())
-        if len(key_attrs) == 1:
-            keys_for_where = [d.get(key_attrs[0]) for d in dicts]
-            where_clause = self.table.columns[key_attrs[0]].in_(keys_for_where)
+            dump = self._get_compiled("_dump_update_item", self._generate_dump, True)
         else:
-            where_clause = []
-            for d in dicts:
-                where_clause.append(self._key_where_clause_from_dict(d))
-            where_clause = or_(*where_clause)
-        return where_clause
-
-    def _key_where_clause_from_dict(self, item: ExternalItemType):
-        # pylint: disable=E1101
-        where_clause = and_(
-            self.table.columns.get(attr_name) == item.get(attr_name)
-            for attr_name in self.meta.key_config.get_key_attrs()
-        )
-        return where_clause
+            dump = self._get_compiled("_dump_create_item", self._generate_dump, False)
+        return dump(item)
+
+    def _generate_dump(self, is_update: bool) -> Callable[[T], Dict]:
+        """
+        Generate a function dumping an item to parameters for an insert / update statement. Generated values
+        are also set on the item. Null keys are omitted from inserts so the database may generate them.
+        """
+        namespace = {
+            "UNDEFINED": UNDEFINED,
+            "json_dumps": json.dumps,
+            "transform_type": transform_type,
+            "from_utc": from_utc,
+        }
+        key_attrs = self.meta.key_config.get_key_attrs()
+        lines = ["def dump(item):", "    dumped = {}"]
+        for index, attr in enumerate(self.meta.attrs):
+            generator = attr.update_generator if is_update else attr.create_generator
+            lines.append(f"    value = getattr(item, {attr.name!r}, UNDEFINED)")
+            if generator:
+                namespace[f"generator_{index}"] = generator
+                lines.append(f"    value = generator_{index}.transform(value, item)")
+            lines.append(f"    setattr(item, {attr.name!r}, value)")
+            if attr.name in key_attrs and not is_update:
+                lines.append("    if value is not UNDEFINED and value is not None:")
+            else:
+                lines.append("    if value is not UNDEFINED:")
+            if self._is_json_encoded(attr):
+                lines.append("        value = json_dumps(value)")
+            elif attr.attr_type == AttrType.DATETIME:
+                lines.append("        value = from_utc(value)")
+            lines.append(f"        dumped[{attr.name!r}] = transform_type(value)")
+        if is_update:
+            for attr_name in key_attrs:
+                lines.append(f"    dumped['{attr_name}_1'] = dumped[{attr_name!r}]")
+        lines.append("    return dumped")
+        return compile_function("dump", lines, namespace)
 
-    def _key_where_clause_from_item(self, item: T):
-        where_clause = and_(
-            self.table.columns.get(attr_name) == getattr(item, attr_name)
-            for attr_name in self.meta.key_config.get_key_attrs()
-        )
-        return where_clause
-
-    def _key_where_clause_from_items(self, items: List[T]):
-        key_attrs = list(self.meta.key_config.get_key_attrs())
-        if len(key_attrs) == 1:
-            keys_for_where = [getattr(item, key_attrs[0]) for item in items]
-            where_clause = self.table.columns[key_attrs[0]].in_(keys_for_where)
-        else:
-            where_clause = []
-            for item in items:
-                where_clause.append(self._key_where_clause_from_item(item))
-            where_clause = or_(*where_clause)
-        return where_clause
+    def _is_json_encoded(self, attr: Attr) -> bool:
+        """JSON values are stored as encoded text, unless the column has a native (postgresql) JSON type"""
+        if attr.attr_type != AttrType.JSON:
+            return False
+        return not isinstance(self.table.columns[attr.name].type, PostgresJson)
 
     def _search_filter_to_where_clause(
         self, search_filter: SearchFilterABC
-    ) -> Tuple[Any, bool]:
+    ) -> Tuple[Any, SearchFilterABC]:
+        """
+        Get the where clause for the filter given, along with the residual filter which must be checked in
+        python (INCLUDE_ALL if the where clause handles the filter fully)
+        """
         search_filter = search_filter.lock_attrs(self.meta.attrs)
-        context = SearchFilterConverterContext()
-        return context.convert(search_filter, self.table, self.meta)
-
-    def _search_order_to_order_by(self, search_order: SearchOrder):
-        if not search_order:
-            return
-        search_order.validate_for_attrs(self.meta.attrs)
-        orders = []
-        for order_attr in search_order.orders:
-            # pylint: disable=E1101
-            order = self.table.columns.get(order_attr.attr)
-            if order_attr.desc:
-                order = order.desc()
-            orders.append(order)
-        return orders
-
-    def _default_order_by(self) -> List[Column]:
-        # pylint: disable=E1101
-        orders = [
-            self.table.columns.get(attr_name)
-            for attr_name in self.meta.key_config.get_key_attrs()
-        ]
-        return orders
+        context = self._get_compiled(
+            "_filter_converter_context", SearchFilterConverterContext
+        )
+        return context.convert_with_residue(search_filter, self.table, self.meta)
+
+    def _dump_value(self, attr: Attr, value: Any) -> Any:
+        """Convert a python value to the value stored in the database for the attribute given"""
+        if value is None:
+            return None
+        if self._is_json_encoded(attr):
+            value = json.dumps(value)
+        elif attr.attr_type == AttrType.DATETIME:
+            value = from_utc(value)
+        return transform_type(value)
 
     def _key_as_dict(self, item: T):
         result = self.meta.get_stored_dataclass()()
@@ -473,7 +664,40 @@ class SqlalchemyTableStore(StoreABC):
         return marshy.dump(result)
 
 
-def _transform_type(value):
-    if isinstance(value, UUID):
-        return str(value)
+def _is_enum(type_) -> bool:
+    type_ = get_optional_type(type_) or type_
+    return inspect.isclass(type_) and issubclass(type_, Enum)
+
+
+def _enum_loader(type_, context) -> Callable[[Any], Enum]:
+    enum_type = get_optional_type(type_) or type_
+    load = context.get_marshaller(type_).load
+
+    def to_enum(value):
+        if isinstance(value, enum_type):
+            return value
+        return load(value)
+
+    return to_enum
+
+
+def _to_copy_value(value: Any) -> str:
+    """Convert a dumped value to the postgresql COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, Enum):
+        value = value.name
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    else:
+        value = str(value)
+    for char, escaped in _COPY_ESCAPES:
+        value = value.replace(char, escaped)
     return value
+
+
+_COPY_ESCAPES = (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r"))
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+
+def to_uuid(value) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    return UUID(value)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Datetimes are stored in UTC. Naive values are assumed to already be in UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def from_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Datetimes are stored as naive UTC values"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def transform_type(value):
+    if isinstance(value, UUID):
+        return str(value)
+    return value
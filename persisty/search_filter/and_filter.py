@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Tuple, Optional, Any, List
+from typing import Tuple, Optional, Any, List, Callable
 
 from persisty.attr.attr import Attr
 from persisty.search_filter.exclude_all import EXCLUDE_ALL
@@ -57,6 +57,20 @@ class And(SearchFilterABC[T]):
         )
         return match
 
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        matchers = tuple(f.compile(attrs) for f in self.search_filters)
+        if len(matchers) == 2:
+            first, second = matchers
+            return lambda item: first(item) and second(item)
+
+        def match(item: T) -> bool:
+            for matcher in matchers:
+                if not matcher(item):
+                    return False
+            return True
+
+        return match
+
     def build_filter_expression(
         self, attrs: Tuple[Attr, ...]
     ) -> Tuple[Optional[Any], bool]:
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Tuple, Optional, Any, TYPE_CHECKING
+from typing import Tuple, Optional, Any, TYPE_CHECKING, Callable
 from uuid import uuid4
 
 from servey.util.singleton_abc import SingletonABC
@@ -19,6 +19,9 @@ class ExcludeAll(SearchFilterABC[T], SingletonABC):
     def match(self, item: T, attrs: Tuple[Attr, ...]) -> bool:
         return False
 
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        return _exclude
+
     def build_filter_expression(
         self, attrs: Tuple[Attr, ...]
     ) -> Tuple[Optional[Any], bool]:
@@ -28,4 +31,9 @@ class ExcludeAll(SearchFilterABC[T], SingletonABC):
         return Attr(str(uuid4())).eq(1), True
 
 
+# pylint: disable=W0613
+def _exclude(item: T) -> bool:
+    return False
+
+
 EXCLUDE_ALL = ExcludeAll()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Tuple, Optional, Any
+from typing import Tuple, Optional, Any, Callable
 
 from servey.util.singleton_abc import SingletonABC
 
@@ -15,10 +15,18 @@ class IncludeAll(SearchFilterABC[T], SingletonABC):
     def match(self, item: T, attrs: Tuple[Attr, ...]) -> bool:
         return True
 
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        return _include
+
     def build_filter_expression(
         self, attrs: Tuple[Attr, ...]
     ) -> Tuple[Optional[Any], bool]:
         return None, True
 
 
+# pylint: disable=W0613
+def _include(item: T) -> bool:
+    return True
+
+
 INCLUDE_ALL = IncludeAll()
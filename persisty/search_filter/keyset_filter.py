@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple, Any, TYPE_CHECKING, Callable
+
+from persisty.search_filter.search_filter_abc import SearchFilterABC, T
+from persisty.search_order.search_order import SearchOrder, SortKey
+
+if TYPE_CHECKING:
+    from persisty.attr.attr import Attr
+
+
+@dataclass(frozen=True)
+class KeysetFilter(SearchFilterABC[T]):
+    """
+    Filter matching items which sort at or after the values given in a search order. Used to resume a search
+    from a cursor (The sort values of the last item in the previous page) rather than by rescanning.
+    """
+
+    search_order: SearchOrder
+    values: Tuple[Any, ...]
+
+    def lock_attrs(self, attrs: Tuple[Attr, ...]) -> KeysetFilter:
+        self.search_order.validate_for_attrs(attrs)
+        return self
+
+    def match(self, item: T, attrs: Tuple[Attr, ...]) -> bool:
+        sort_key = self.search_order.sort_key(item)
+        return sort_key >= SortKey(self.values, self.search_order)
+
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        sort_key = self.search_order.sort_key
+        cursor = SortKey(self.values, self.search_order)
+        return lambda item: sort_key(item) >= cursor
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Tuple, Callable
 
 from persisty.attr.attr import Attr
 from persisty.search_filter.exclude_all import EXCLUDE_ALL
@@ -28,3 +28,7 @@ class Not(SearchFilterABC[T]):
 
     def match(self, item: T, attrs: Tuple[Attr, ...]) -> bool:
         return not self.search_filter.match(item, attrs)
+
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        matcher = self.search_filter.compile(attrs)
+        return lambda item: not matcher(item)
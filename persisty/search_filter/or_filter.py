@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Tuple, Optional, Any
+from typing import Tuple, Optional, Any, Callable
 
 from persisty.attr.attr import Attr
 from persisty.search_filter.and_filter import build_filter_conditions
@@ -56,6 +56,20 @@ class Or(SearchFilterABC[T]):
         match = next((True for f in self.search_filters if f.match(item, attrs)), False)
         return match
 
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        matchers = tuple(f.compile(attrs) for f in self.search_filters)
+        if len(matchers) == 2:
+            first, second = matchers
+            return lambda item: first(item) or second(item)
+
+        def match(item: T) -> bool:
+            for matcher in matchers:
+                if matcher(item):
+                    return True
+            return False
+
+        return match
+
     def build_filter_expression(
         self, attrs: Tuple[Attr, ...]
     ) -> Tuple[Optional[Any], bool]:
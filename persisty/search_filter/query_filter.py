@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Tuple, Optional, Any, TYPE_CHECKING
+from typing import Tuple, Optional, Any, TYPE_CHECKING, Callable
 
 from dataclasses import dataclass
+from operator import attrgetter
 
 from persisty.attr.attr_filter import AttrFilter, AttrFilterOp
 from persisty.attr.attr_type import AttrType
@@ -24,15 +25,24 @@ class QueryFilter(SearchFilterABC[T]):
         return Or(tuple(filters))
 
     def match(self, item: T, attrs: Tuple[Attr, ...]) -> bool:
-        for attr in attrs:
-            if not attr.readable or attr.attr_type is not AttrType.STR:
-                continue
-            query = self.query.lower()
-            attr_value = item.get(attr.name)
-            if isinstance(attr_value, str):
-                if query in attr_value.lower():
+        return self.compile(attrs)(item)
+
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        query = self.query.lower()
+        getters = tuple(
+            attrgetter(attr.name)
+            for attr in attrs
+            if attr.readable and attr.attr_type is AttrType.STR
+        )
+
+        def match(item: T) -> bool:
+            for getter in getters:
+                attr_value = getter(item)
+                if isinstance(attr_value, str) and query in attr_value.lower():
                     return True
-        return False
+            return False
+
+        return match
 
     def build_filter_expression(
         self, attrs: Tuple[Attr, ...]
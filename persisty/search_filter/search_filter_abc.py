@@ -1,6 +1,6 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Tuple, Optional, Any, TYPE_CHECKING, Generic, TypeVar
+from typing import Tuple, Optional, Any, TYPE_CHECKING, Generic, TypeVar, Callable
 
 if TYPE_CHECKING:
     from persisty.attr.attr import Attr
@@ -17,6 +17,18 @@ class SearchFilterABC(ABC, Generic[T]):
     def match(self, item: T, attrs: Tuple[Attr, ...]) -> bool:
         """Determine if the stored given matches this search_filter"""
 
+    def compile(self, attrs: Tuple[Attr, ...]) -> Callable[[T], bool]:
+        """
+        Compile this search_filter into a single callable which determines if an item matches. This is
+        typically done once after lock_attrs, so any per filter work is not repeated for each item.
+        """
+        match = self.match
+
+        def compiled(item: T) -> bool:
+            return match(item, attrs)
+
+        return compiled
+
     def __and__(self, obj_filter: SearchFilterABC) -> SearchFilterABC:
         if not isinstance(obj_filter, SearchFilterABC):
             raise TypeError(f"SearchFilterABC:{obj_filter}")
@@ -1,9 +1,10 @@
-from typing import Tuple, Generic, List
+from typing import Tuple, Generic, List, Any
 
 from dataclasses import dataclass
 
 from persisty.attr.attr import Attr
 from persisty.search_order.search_order_attr import SearchOrderAttr, T
+from persisty.util.undefined import UNDEFINED
 
 
 @dataclass(frozen=True)
@@ -19,6 +20,14 @@ class SearchOrder(Generic[T]):
             items = order.sort(items)
         return items
 
+    def sort_key(self, item: T) -> "SortKey":
+        """
+        Get a key for the item given which may be used by sorted / heapq / bisect, respecting the direction
+        of each order attribute.
+        """
+        values = tuple(getattr(item, order.attr, UNDEFINED) for order in self.orders)
+        return SortKey(values, self)
+
     def lt(self, a: T, b: T) -> bool:
         for order in self.orders:
             if order.lt(a, b):
@@ -30,3 +39,44 @@ class SearchOrder(Generic[T]):
         for order in self.orders:
             if not order.eq(a, b):
                 return False
+
+
+class SortKey:
+    """
+    Comparable key for a search order. Supports mixed ascending / descending orders. As with SearchOrderAttr,
+    None / UNDEFINED values are always placed last
+    """
+
+    __slots__ = ("values", "search_order")
+
+    def __init__(self, values: Tuple[Any, ...], search_order: SearchOrder):
+        self.values = values
+        self.search_order = search_order
+
+    def __eq__(self, other):
+        return not self.__lt__(other) and not other.__lt__(self)
+
+    def __lt__(self, other):
+        for order, a, b in zip(self.search_order.orders, self.values, other.values):
+            a_null = a is None or a is UNDEFINED
+            b_null = b is None or b is UNDEFINED
+            if a_null or b_null:
+                if a_null == b_null:
+                    continue
+                return b_null
+            if a == b:
+                continue
+            return a > b if order.desc else a < b
+        return False
+
+    def __gt__(self, other):
+        return other.__lt__(self)
+
+    def __le__(self, other):
+        return not other.__lt__(self)
+
+    def __ge__(self, other):
+        return not self.__lt__(other)
+
+    def __repr__(self):
+        return f"SortKey{self.values}"
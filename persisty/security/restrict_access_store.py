@@ -70,7 +70,14 @@ class RestrictAccessStore(FilteredStoreABC[T]):
     ) -> Iterator[Optional[T]]:
         if self.store_access.read_filter is EXCLUDE_ALL:
             return (None for _ in keys)
-        return StoreABC.read_all(self, keys)
+        return super().read_all(keys)
+
+    def is_upsert_filtered_as_create(self) -> bool:
+        # Restricted updates are checked against the existing item, so upserts must read it
+        return (
+            self.store_access.read_filter == INCLUDE_ALL
+            and self.store_access.update_filter == INCLUDE_ALL
+        )
 
     # noinspection PyUnusedLocal
     def allow_delete(self, item: T) -> bool:
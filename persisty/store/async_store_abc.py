@@ -0,0 +1,153 @@
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Generic, List, Optional
+
+from persisty.batch_edit import BatchEdit
+from persisty.batch_edit_result import BatchEditResult
+from persisty.result_set import ResultSet
+from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.search_filter.search_filter_abc import SearchFilterABC
+from persisty.search_order.search_order import SearchOrder
+from persisty.store_meta import StoreMeta, T
+from persisty.util import UNDEFINED
+
+
+class AsyncStoreABC(Generic[T], ABC):
+    """
+    Async version of the contract for storage objects defined by StoreABC, for use within an event loop
+    """
+
+    @abstractmethod
+    def get_meta(self) -> StoreMeta:
+        """Get the meta for this storage"""
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator:
+        """
+        Get an async context manager grouping all operations on this store within it into a single unit of
+        work, where the underlying implementation supports it. The default implementation does nothing.
+        """
+        yield
+
+    @abstractmethod
+    async def create(self, item: T) -> Optional[T]:
+        """Create an item in the data store"""
+
+    @abstractmethod
+    async def read(self, key: str) -> Optional[T]:
+        """Read an item from the data store"""
+
+    async def read_batch(self, keys: List[str]) -> List[Optional[T]]:
+        assert len(keys) <= self.get_meta().batch_size
+        items = [await self.read(key) for key in keys]
+        return items
+
+    @abstractmethod
+    async def update(
+        self, updates: T, precondition: SearchFilterABC = INCLUDE_ALL
+    ) -> Optional[T]:
+        """
+        Update (a partial set of values from) an item based upon its key and the constraint given. Return the
+        full new version of the item if an update occurred, or None if there was no matching item.
+        """
+
+    async def upsert(self, item: T) -> Optional[T]:
+        """
+        Create the item given if there is no existing item with the same key, or update the existing item with
+        its values otherwise. The default implementation reads the existing item within a session.
+        """
+        key = self.get_meta().key_config.to_key_str(item)
+        if not key:
+            return await self.create(item)
+        async with self.session():
+            if await self.read(key):
+                return await self.update(item)
+            return await self.create(item)
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete an item from the data store. Return true if an item was deleted, false otherwise"""
+
+    @abstractmethod
+    async def search(
+        self,
+        search_filter: SearchFilterABC[T] = INCLUDE_ALL,
+        search_order: Optional[SearchOrder[T]] = None,
+        page_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> ResultSet[T]:
+        """Search for a page of items in the data store"""
+
+    async def search_all(
+        self,
+        search_filter: SearchFilterABC[T] = INCLUDE_ALL,
+        search_order: Optional[SearchOrder[T]] = None,
+    ) -> AsyncIterator[T]:
+        page_key = None
+        while True:
+            result_set = await self.search(search_filter, search_order, page_key)
+            for item in result_set.results:
+                yield item
+            page_key = result_set.next_page_key
+            if not page_key:
+                return
+
+    @abstractmethod
+    async def count(self, search_filter: SearchFilterABC[T] = INCLUDE_ALL) -> int:
+        """Count the items in the data store matching the filter given"""
+
+    async def edit_batch(
+        self, edits: List[BatchEdit[T, T]]
+    ) -> List[BatchEditResult[T, T]]:
+        """
+        Do a batch edit and return a list of results. The results should contain all the same edits in the same
+        order. The default implementation applies each edit in turn.
+        """
+        assert len(edits) <= self.get_meta().batch_size
+        results = []
+        async with self.session():
+            for edit in edits:
+                if edit.create_item:
+                    item = await self.create(edit.create_item)
+                    results.append(BatchEditResult(edit, bool(item)))
+                elif edit.update_item:
+                    item = await self.update(edit.update_item)
+                    results.append(BatchEditResult(edit, bool(item)))
+                elif edit.upsert_item:
+                    item = await self.upsert(edit.upsert_item)
+                    results.append(BatchEditResult(edit, bool(item)))
+                else:
+                    deleted = await self.delete(edit.delete_key)
+                    results.append(BatchEditResult(edit, deleted))
+        return results
+
+    async def update_all(self, search_filter: SearchFilterABC[T], updates: T):
+        """
+        Update all items matching the filter given with the values given, Ignoring any attributes where
+        the value is UNDEFINED.
+        """
+        update_values = {}
+        for attr in self.get_meta().attrs:
+            value = getattr(updates, attr.name, UNDEFINED)
+            if value is not UNDEFINED:
+                update_values[attr.name] = value
+        edits = []
+        async for item in self.search_all(search_filter):
+            for name, value in update_values.items():
+                setattr(item, name, value)
+            edits.append(BatchEdit(update_item=item))
+        await self._edit_all(edits)
+
+    async def delete_all(self, search_filter: SearchFilterABC[T]):
+        """Delete all items matching the filter given."""
+        key_config = self.get_meta().key_config
+        edits = [
+            BatchEdit(delete_key=key_config.to_key_str(item))
+            async for item in self.search_all(search_filter)
+        ]
+        await self._edit_all(edits)
+
+    async def _edit_all(self, edits: List[BatchEdit[T, T]]):
+        batch_size = self.get_meta().batch_size
+        for index in range(0, len(edits), batch_size):
+            await self.edit_batch(edits[index : index + batch_size])
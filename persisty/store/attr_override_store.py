@@ -56,6 +56,9 @@ class AttrOverrideStore(FilteredStoreABC[T]):
         result = self.store.get_meta().get_stored_dataclass()(**kwargs)
         return result
 
+    def is_upsert_filtered_as_create(self) -> bool:
+        return self.updatable and not self.update_generator
+
     def filter_update(self, item: T, updates: T) -> T:
         kwargs = dataclasses.asdict(updates)
         if self.update_generator:
@@ -15,8 +15,15 @@ class FilteredStore(FilteredStoreABC[T]):
     def get_store(self) -> StoreABC:
         return self.store
 
+    def _match(self, item: T) -> bool:
+        match = getattr(self, "_compiled_filter", None)
+        if match is None:
+            match = self.search_filter.compile(self.get_meta().attrs)
+            object.__setattr__(self, "_compiled_filter", match)
+        return match(item)
+
     def filter_create(self, item: T) -> Optional[T]:
-        if not self.search_filter.match(item, self.get_meta().attrs):
+        if not self._match(item):
             raise PersistyError("create_forbidden")
         return item
 
@@ -24,17 +31,21 @@ class FilteredStore(FilteredStoreABC[T]):
     def filter_update(self, item: T, updates: T) -> T:
         # old_item has already been checked in read operation
         item = dataclasses.replace(item, **dataclasses.asdict(updates))
-        if not self.search_filter.match(item, self.get_meta().attrs):
+        if not self._match(item):
             raise PersistyError("update_forbidden")
         return updates
 
     def filter_read(self, item: T) -> Optional[T]:
-        if self.search_filter.match(item, self.get_meta().attrs):
+        if self._match(item):
             return item
 
     # noinspection PyUnusedLocal
     def allow_delete(self, item: T) -> bool:
-        return self.search_filter.match(item, self.get_meta().attrs)
+        return self._match(item)
+
+    def is_upsert_filtered_as_create(self) -> bool:
+        # An existing item outside the filter must not be overwritten
+        return False
 
     def filter_search_filter(
         self, search_filter: SearchFilterABC
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Iterator, List, Optional, Tuple, Dict
+from typing import Iterator, List, Optional, Tuple, Dict, Union, Iterable
 
 from persisty.errors import PersistyError
 from persisty.batch_edit import BatchEdit
@@ -8,7 +8,7 @@ from persisty.result_set import ResultSet
 from persisty.search_filter.include_all import INCLUDE_ALL
 from persisty.search_filter.search_filter_abc import SearchFilterABC
 from persisty.search_order.search_order import SearchOrder
-from persisty.store.store_abc import StoreABC
+from persisty.store.store_abc import StoreABC, classify_upserts
 from persisty.store_meta import StoreMeta
 from persisty.store.wrapper_store_abc import WrapperStoreABC, T
 from persisty.util import get_logger
@@ -48,6 +48,14 @@ class FilteredStoreABC(WrapperStoreABC[T], ABC):
         """Filter a delete of an item"""
         return True
 
+    def is_upsert_filtered_as_create(self) -> bool:
+        """
+        Determine whether an upsert may be filtered as a create and passed to the nested store, so that a
+        native upsert may be used. Stores where filtering an update depends on the existing item should return
+        False, in which case upserts are classified as creates or updates by reading the existing item.
+        """
+        return True
+
     def filter_search_filter(
         self, search_filter: SearchFilterABC
     ) -> Tuple[SearchFilterABC, bool]:
@@ -62,6 +70,13 @@ class FilteredStoreABC(WrapperStoreABC[T], ABC):
         if item:
             return self.get_store().create(item)
 
+    def upsert(self, item: T) -> Optional[T]:
+        if not self.is_upsert_filtered_as_create():
+            return StoreABC.upsert(self, item)
+        item = self.filter_create(item)
+        if item:
+            return self.get_store().upsert(item)
+
     def read(self, key: str) -> Optional[T]:
         item = self.get_store().read(key)
         if item:
@@ -74,6 +89,12 @@ class FilteredStoreABC(WrapperStoreABC[T], ABC):
         items = [self.filter_read(item) if item else None for item in items]
         return items
 
+    def read_all(
+        self, keys: Union[Iterator[str], Iterable[str]]
+    ) -> Iterator[Optional[T]]:
+        items = self.get_store().read_all(keys)
+        return (self.filter_read(item) if item else None for item in items)
+
     # pylint: disable=W0212
     def _update(self, key: str, item: T, updates: T) -> Optional[T]:
         updates = self.filter_update(item, updates)
@@ -172,6 +193,8 @@ class FilteredStoreABC(WrapperStoreABC[T], ABC):
     ) -> List[BatchEditResult[T, T]]:
         assert len(edits) <= self.get_meta().batch_size
         key_config = self.get_meta().key_config
+        if not self.is_upsert_filtered_as_create():
+            edits = classify_upserts(self, edits, items_by_key)
 
         results = [BatchEditResult[T, T](edit, code="unknown") for edit in edits]
         results_by_id = {result.edit.id: result for result in results}
@@ -185,6 +208,12 @@ class FilteredStoreABC(WrapperStoreABC[T], ABC):
                         result.code = "filtered_edit"
                         continue
                     filtered_edits.append(BatchEdit[T, T](create_item=item, id=edit.id))
+                elif edit.upsert_item:
+                    item = self.filter_create(edit.upsert_item)
+                    if not item:
+                        result.code = "filtered_edit"
+                        continue
+                    filtered_edits.append(BatchEdit[T, T](upsert_item=item, id=edit.id))
                 elif edit.update_item:
                     key = edit.get_key(key_config)
                     item = items_by_key.get(key)
@@ -209,6 +238,11 @@ class FilteredStoreABC(WrapperStoreABC[T], ABC):
                     filtered_edits.append(edit)
             except PersistyError as e:
                 result.msg = str(e)
+        if self.is_edit_batch_atomic() and len(filtered_edits) < len(edits):
+            # If any edit was rejected, none may be applied
+            for edit in filtered_edits:
+                results_by_id[edit.id].code = "transaction_cancelled"
+            return results
         if filtered_edits:
             filtered_results = self.get_store()._edit_batch(
                 filtered_edits, items_by_key
@@ -6,7 +6,7 @@ from servey.security.authorization import Authorization
 from persisty.batch_edit import BatchEdit
 from persisty.batch_edit_result import BatchEditResult
 from persisty.search_filter.search_filter_abc import SearchFilterABC
-from persisty.store.store_abc import StoreABC
+from persisty.store.store_abc import StoreABC, classify_upserts
 from persisty.store.wrapper_store_abc import WrapperStoreABC, T
 
 
@@ -50,10 +50,15 @@ class LinkedStore(WrapperStoreABC[T]):
                 link.after_create(item)
         return result
 
+    def upsert(self, item: T) -> Optional[T]:
+        # Links need to know whether an item was created or updated, so a native upsert cannot be used
+        return StoreABC.upsert(self, item)
+
     def _edit_batch(
         self, edits: List[BatchEdit[T, T]], items_by_key: Dict[str, T]
     ) -> List[BatchEditResult[T, T]]:
         meta = self.get_meta()
+        edits = classify_upserts(self, edits, items_by_key)
         self._before_edit_batch(edits, items_by_key)
         # pylint: disable=W0212
         results = self.get_store()._edit_batch(edits, items_by_key)
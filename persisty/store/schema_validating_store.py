@@ -87,4 +87,8 @@ class SchemaValidatingStore(FilteredStoreABC[T]):
             attr_value = getattr(updates, attr_name, UNDEFINED)
             if attr_value is not UNDEFINED:
                 raise PersistyError(error)
-        super().update_all(search_filter, updates)
+        # The defined values are valid, so the nested store may apply them without loading each item
+        self.get_store().update_all(search_filter, updates)
+
+    def delete_all(self, search_filter: SearchFilterABC[T]):
+        self.get_store().delete_all(search_filter)
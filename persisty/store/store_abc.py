@@ -1,16 +1,33 @@
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from itertools import islice
-from typing import Optional, List, Iterator, Dict, Generic, Type, Iterable, Union
+from typing import (
+    ContextManager,
+    Optional,
+    List,
+    Iterator,
+    Dict,
+    Generic,
+    Type,
+    Iterable,
+    Union,
+    Tuple,
+    Any,
+)
+
+import marshy
 
 from persisty.errors import PersistyError
 from persisty.batch_edit import BatchEdit
 from persisty.batch_edit_result import BatchEditResult
+from persisty.key_config.key_config_abc import KeyConfigABC
 from persisty.result_set import ResultSet
 from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.search_filter.keyset_filter import KeysetFilter
 from persisty.search_filter.search_filter_abc import SearchFilterABC
-from persisty.search_order.search_order import SearchOrder
+from persisty.search_order.search_order import SearchOrder, SortKey
 from persisty.store_meta import StoreMeta, T, get_meta
-from persisty.util import UNDEFINED
+from persisty.util import UNDEFINED, to_base64, from_base64
 
 
 class StoreABC(Generic[T], ABC):
@@ -26,6 +43,14 @@ class StoreABC(Generic[T], ABC):
     def create(self, item: T) -> Optional[T]:
         """Create an item in the data store"""
 
+    def session(self) -> ContextManager:
+        """
+        Get a context manager grouping all operations on this store within it into a single unit of work,
+        where the underlying implementation supports it (e.g.: a single sql connection and transaction).
+        The default implementation does nothing.
+        """
+        return nullcontext()
+
     @abstractmethod
     def read(self, key: str) -> Optional[T]:
         """Read an item from the data store"""
@@ -58,11 +83,28 @@ class StoreABC(Generic[T], ABC):
         key = self.get_meta().key_config.to_key_str(updates)
         if not key:
             raise PersistyError(f"missing_key:{updates}")
-        item = self.read(key)
-        attrs = self.get_meta().attrs
-        precondition = precondition.lock_attrs(attrs)
-        if item and precondition.match(item, attrs):
-            return self._update(key, item, updates)
+        with self.session():
+            item = self.read(key)
+            attrs = self.get_meta().attrs
+            precondition = precondition.lock_attrs(attrs)
+            if item and precondition.match(item, attrs):
+                return self._update(key, item, updates)
+
+    def upsert(self, item: T) -> Optional[T]:
+        """
+        Create the item given if there is no existing item with the same key, or update the existing item with
+        its values otherwise (Ignoring any UNDEFINED values). Return the stored version of the item. The default
+        implementation reads the existing item within a session - implementations with a native upsert should
+        use it instead.
+        """
+        key = self.get_meta().key_config.to_key_str(item)
+        if not key:
+            return self.create(item)
+        with self.session():
+            existing = self.read(key)
+            if existing:
+                return self._update(key, existing, item)
+            return self.create(item)
 
     @abstractmethod
     def _update(self, key: str, item: T, updates: T) -> Optional[T]:
@@ -76,10 +118,11 @@ class StoreABC(Generic[T], ABC):
     def delete(self, key: str) -> bool:
         """Delete an item from the data store. Return true if an item was deleted, false otherwise"""
         key = str(key)
-        item = self.read(key)
-        if not item:
-            return False
-        return self._delete(key, item)
+        with self.session():
+            item = self.read(key)
+            if not item:
+                return False
+            return self._delete(key, item)
 
     @abstractmethod
     def _delete(self, key: str, item: T) -> bool:
@@ -95,12 +138,23 @@ class StoreABC(Generic[T], ABC):
         if limit is None:
             limit = self.get_meta().batch_size
         assert limit <= self.get_meta().batch_size
-        items = self.search_all(search_filter, search_order)
-        skip_to_page(page_key, items, self.get_meta().key_config)
+        meta = self.get_meta()
+        if not page_key:
+            items = self.search_all(search_filter, search_order)
+        elif search_order and search_order.orders:
+            # Only search from the sort values of the last item in the previous page
+            values, key = from_page_key(meta, search_order, page_key)
+            search_filter &= KeysetFilter(search_order, values)
+            items = self.search_all(search_filter, search_order)
+            items = skip_to_cursor(items, meta.key_config, search_order, values, key)
+        else:
+            items = self.search_all(search_filter, search_order)
+            _, key = from_page_key(meta, search_order, page_key)
+            skip_to_page(key, items, meta.key_config)
         items = list(islice(items, limit))
         page_key = None
         if len(items) == limit:
-            page_key = self.get_meta().key_config.to_key_str(items[-1])
+            page_key = to_page_key(meta, search_order, items[-1])
         return ResultSet(items, page_key)
 
     def search_all(
@@ -120,10 +174,18 @@ class StoreABC(Generic[T], ABC):
     def count(self, search_filter: SearchFilterABC[T] = INCLUDE_ALL) -> int:
         """Create an item in the data store"""
 
+    def is_edit_batch_atomic(self) -> bool:
+        """
+        Determine whether batch edits are applied atomically, so that either all edits in a batch succeed or
+        none do. The default implementation is not atomic.
+        """
+        return False
+
     def edit_batch(self, edits: List[BatchEdit[T, T]]) -> List[BatchEditResult[T, T]]:
         """
         Do a batch edit and return a list of results. The results should contain all the same edits in the same
-        order
+        order. Edits which would fail are skipped, unless edits are atomic, in which case all edits are passed
+        on so that the batch fails as a whole.
         """
         assert len(edits) <= self.get_meta().batch_size
         to_key_str = self.get_meta().key_config.to_key_str
@@ -137,35 +199,34 @@ class StoreABC(Generic[T], ABC):
                 keys.append(to_key_str(edit.update_item))
             elif edit.delete_key:
                 keys.append(edit.delete_key)
-        items_by_key = {
-            to_key_str(item): item for item in self.read_batch(keys) if item
-        }
-        filtered_edits = []
-        for edit in edits:
-            if edit.create_item:
-                key = to_key_str(edit.create_item)
-                if key:
-                    item = items_by_key.get(key)
-                    if item:
-                        continue
-                filtered_edits.append(edit)
-                continue
-            if edit.update_item:
-                key = to_key_str(edit.update_item)
-                if key in items_by_key:
+        with self.session():
+            items = self.read_batch(keys) if keys else []
+            items_by_key = {to_key_str(item): item for item in items if item}
+            if self.is_edit_batch_atomic():
+                filtered_results = self._edit_batch(edits, items_by_key)
+                return _restore_edits(edits, filtered_results)
+            filtered_edits = []
+            for edit in edits:
+                if edit.create_item:
+                    key = to_key_str(edit.create_item)
+                    if key:
+                        item = items_by_key.get(key)
+                        if item:
+                            continue
                     filtered_edits.append(edit)
-            elif edit.delete_key and edit.delete_key in items_by_key:
-                filtered_edits.append(edit)
-        filtered_results = self._edit_batch(filtered_edits, items_by_key)
-        filtered_results_by_id = {r.edit.id: r for r in filtered_results}
-        results = [
-            filtered_results_by_id.get(e.id)
-            or BatchEditResult(
-                e, False, "duplicate_key" if e.create_item else "missing_key"
-            )
-            for e in edits
-        ]
-        return results
+                    continue
+                if edit.upsert_item:
+                    # Upserts are passed through, so a native upsert may be used without a read
+                    filtered_edits.append(edit)
+                    continue
+                if edit.update_item:
+                    key = to_key_str(edit.update_item)
+                    if key in items_by_key:
+                        filtered_edits.append(edit)
+                elif edit.delete_key and edit.delete_key in items_by_key:
+                    filtered_edits.append(edit)
+            filtered_results = self._edit_batch(filtered_edits, items_by_key)
+        return _restore_edits(edits, filtered_results)
 
     def _edit_batch(
         self, edits: List[BatchEdit[T, T]], items_by_key: Dict[str, T]
@@ -187,6 +248,9 @@ class StoreABC(Generic[T], ABC):
                     item = items_by_key[key]
                     item = self._update(key, item, edit.update_item)
                     results.append(BatchEditResult(edit, bool(item)))
+                elif edit.upsert_item:
+                    item = self.upsert(edit.upsert_item)
+                    results.append(BatchEditResult(edit, bool(item)))
                 else:
                     item = items_by_key.get(edit.delete_key)
                     deleted = self._delete(edit.delete_key, item)
@@ -211,10 +275,13 @@ class StoreABC(Generic[T], ABC):
         Update all items matching the filter given with the values given, Ignoring any attributes where
         the value is UNDEFINED.
         Some implementations (like SQL) can do this without loading the data, while others (like dynamodb)
-        require the data to be loaded to delete it, and use the base implementation
+        require the data to be loaded to update it, and use the base implementation. Items are read and
+        edited within a single session, so both use the same connection where there is one.
         """
-        edits = self._update_all_iterator(search_filter, updates)
-        self.edit_all(edits)
+        with self.session():
+            edits = self._update_all_iterator(search_filter, updates)
+            for _ in self.edit_all(edits):
+                pass
 
     def _update_all_iterator(
         self, search_filter: SearchFilterABC[T], updates: T
@@ -235,10 +302,13 @@ class StoreABC(Generic[T], ABC):
         """
         Delete all items matching the filter given.
         Some implementations (like SQL) can do this without loading the data, while others (like dynamodb)
-        require the data to be loaded to delete it, and use the base implementation
+        require the data to be loaded to delete it, and use the base implementation. Items are read and
+        deleted within a single session, so both use the same connection where there is one.
         """
-        edits = self._delete_all_iterator(search_filter)
-        self.edit_all(edits)
+        with self.session():
+            edits = self._delete_all_iterator(search_filter)
+            for _ in self.edit_all(edits):
+                pass
 
     def _delete_all_iterator(
         self, search_filter: SearchFilterABC[T]
@@ -250,6 +320,50 @@ class StoreABC(Generic[T], ABC):
             yield edit
 
 
+def _restore_edits(
+    edits: List[BatchEdit[T, T]], filtered_results: List[BatchEditResult[T, T]]
+) -> List[BatchEditResult[T, T]]:
+    """Get results in the same order as the edits given, with a failure for any edit which was skipped"""
+    filtered_results_by_id = {r.edit.id: r for r in filtered_results}
+    results = []
+    for edit in edits:
+        result = filtered_results_by_id.get(edit.id)
+        if result:
+            # Wrappers may classify upserts as creates or updates, so restore the original edit
+            result.edit = edit
+        else:
+            code = "duplicate_key" if edit.create_item else "missing_key"
+            result = BatchEditResult(edit, False, code)
+        results.append(result)
+    return results
+
+
+def classify_upserts(
+    store: StoreABC[T], edits: List[BatchEdit[T, T]], items_by_key: Dict[str, T]
+) -> List[BatchEdit[T, T]]:
+    """
+    Convert upserts to updates where an item with the same key exists, and to creates otherwise. Existing
+    items not already in items_by_key are read from the store given and added to it. Used by wrapper stores
+    which need the existing item to process an edit.
+    """
+    to_key_str = store.get_meta().key_config.to_key_str
+    keys = [to_key_str(e.upsert_item) for e in edits if e.upsert_item]
+    keys = [k for k in dict.fromkeys(keys) if k and k not in items_by_key]
+    if keys:
+        items_by_key.update(
+            (to_key_str(item), item) for item in store.read_batch(keys) if item
+        )
+    classified = []
+    for edit in edits:
+        if edit.upsert_item:
+            if to_key_str(edit.upsert_item) in items_by_key:
+                edit = BatchEdit(id=edit.id, update_item=edit.upsert_item)
+            else:
+                edit = BatchEdit(id=edit.id, create_item=edit.upsert_item)
+        classified.append(edit)
+    return classified
+
+
 def skip_to_page(page_key: str, items, key_config):
     if page_key:
         while True:
@@ -261,6 +375,71 @@ def skip_to_page(page_key: str, items, key_config):
                 return
 
 
+def skip_to_cursor(
+    items: Iterator[T],
+    key_config: KeyConfigABC,
+    search_order: SearchOrder,
+    values: Tuple[Any, ...],
+    key: str,
+) -> Iterator[T]:
+    """
+    Skip over items which have the same sort values as the cursor given, up to and including the item with
+    the key given. If the item was deleted, the order of items within the tie is unknown, so all of them are
+    returned again rather than risk skipping any.
+    """
+    cursor = SortKey(values, search_order)
+    tied = []
+    for item in items:
+        if key_config.to_key_str(item) == key:
+            tied = None
+            break
+        if search_order.sort_key(item) > cursor:
+            tied.append(item)
+            break
+        tied.append(item)
+    if tied:
+        yield from tied
+    yield from items
+
+
+def to_page_key(meta: StoreMeta, search_order: Optional[SearchOrder], item: T) -> str:
+    """
+    Get a page key for the item given, encoding the sort values for the item along with its key, so that
+    a search may be resumed from this point
+    """
+    values = []
+    if search_order:
+        attrs_by_name = {a.name: a for a in meta.attrs}
+        for order in search_order.orders:
+            value = getattr(item, order.attr, None)
+            if value not in (None, UNDEFINED):
+                value = marshy.dump(value, attrs_by_name[order.attr].schema.python_type)
+            else:
+                value = None
+            values.append(value)
+    return to_base64([values, meta.key_config.to_key_str(item)])
+
+
+def from_page_key(
+    meta: StoreMeta, search_order: Optional[SearchOrder], page_key: str
+) -> Tuple[Tuple[Any, ...], str]:
+    """Get the sort values and key encoded in a page key"""
+    orders = search_order.orders if search_order else tuple()
+    try:
+        values, key = from_base64(page_key)
+        assert len(values) == len(orders)
+        attrs_by_name = {a.name: a for a in meta.attrs}
+        values = tuple(
+            None
+            if value is None
+            else marshy.load(attrs_by_name[order.attr].schema.python_type, value)
+            for order, value in zip(orders, values)
+        )
+        return values, key
+    except (ValueError, TypeError, AssertionError, KeyError) as exc:
+        raise PersistyError("invalid_page_key") from exc
+
+
 def get_store(type_: Type):
     meta = get_meta(type_)
     store = meta.store_factory.create(meta)
@@ -67,6 +67,13 @@ class TtlCacheStore(StoreABC[T]):
         self.store_item_in_cache(key, item)
         return item
 
+    def upsert(self, item: T) -> Optional[T]:
+        item = self.store.upsert(item)
+        if item:
+            key = self.get_meta().key_config.to_key_str(item)
+            self.store_item_in_cache(key, item)
+        return item
+
     def read(self, key: str) -> Optional[T]:
         item = self.load_item_from_cache(key)
         if item is None:
@@ -151,8 +158,8 @@ class TtlCacheStore(StoreABC[T]):
             if not result.success:
                 continue
             edit = result.edit
-            if edit.update_item:
-                key = self.get_meta().key_config.to_key_str(edit.update_item)
+            if edit.update_item or edit.upsert_item:
+                key = edit.get_key(self.get_meta().key_config)
                 self.cache.pop(key, None)
             elif edit.delete_key:
                 self.cache.pop(edit.delete_key, None)
@@ -8,7 +8,7 @@ from persisty.batch_edit_result import BatchEditResult
 from persisty.errors import PersistyError
 from persisty.index.unique_index import UniqueIndex
 from persisty.search_filter.and_filter import And
-from persisty.store.store_abc import StoreABC, T
+from persisty.store.store_abc import StoreABC, T, classify_upserts
 from persisty.store.wrapper_store_abc import WrapperStoreABC
 from persisty.util import UNDEFINED
 
@@ -25,6 +25,10 @@ class UniqueIndexStore(WrapperStoreABC[T]):
         self._check_create(item)
         return self.get_store().create(item)
 
+    def upsert(self, item: T) -> Optional[T]:
+        # The existing item is needed to check unique indexes, so a native upsert cannot be used
+        return StoreABC.upsert(self, item)
+
     # pylint: disable=W0212
     def _update(self, key: str, item: T, updates: T) -> Optional[T]:
         self._check_update(key, item, updates)
@@ -36,15 +40,17 @@ class UniqueIndexStore(WrapperStoreABC[T]):
     ) -> List[BatchEditResult[T, T]]:
         filtered_edits = []
         key_config = self.store.get_meta().key_config
+        edits = classify_upserts(self, edits, items_by_key)
         for edit in edits:
             if edit.create_item:
                 self._check_create(edit.create_item)
                 filtered_edits.append(edit)
             elif edit.update_item:
                 key = key_config.to_key_str(edit.update_item)
-                item = items_by_key[key]
-                updates = edit.update_item
-                self._check_update(key, item, updates)
+                item = items_by_key.get(key)
+                # A missing item is rejected by the nested store
+                if item:
+                    self._check_update(key, item, edit.update_item)
                 filtered_edits.append(edit)
             else:
                 filtered_edits.append(edit)
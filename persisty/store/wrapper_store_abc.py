@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Iterator, List, Optional, Dict, Union, Iterable
+from typing import ContextManager, Iterator, List, Optional, Dict, Union, Iterable
 
 from persisty.search_filter.include_all import INCLUDE_ALL
 from persisty.search_filter.search_filter_abc import SearchFilterABC
@@ -22,6 +22,9 @@ class WrapperStoreABC(StoreABC[T], ABC):
     def get_meta(self) -> StoreMeta:
         return self.get_store().get_meta()
 
+    def session(self) -> ContextManager:
+        return self.get_store().session()
+
     def create(self, item: T) -> T:
         return self.get_store().create(item)
 
@@ -31,6 +34,14 @@ class WrapperStoreABC(StoreABC[T], ABC):
     def read_batch(self, keys: List[str]) -> List[Optional[T]]:
         return self.get_store().read_batch(keys)
 
+    def read_all(
+        self, keys: Union[Iterator[str], Iterable[str]]
+    ) -> Iterator[Optional[T]]:
+        return self.get_store().read_all(keys)
+
+    def upsert(self, item: T) -> Optional[T]:
+        return self.get_store().upsert(item)
+
     # pylint: disable=W0212
     def _update(self, key: str, item: T, updates: T) -> Optional[T]:
         return self.get_store()._update(key, item, updates)
@@ -59,6 +70,9 @@ class WrapperStoreABC(StoreABC[T], ABC):
     def count(self, search_filter: SearchFilterABC[T] = INCLUDE_ALL) -> int:
         return self.get_store().count(search_filter)
 
+    def is_edit_batch_atomic(self) -> bool:
+        return self.get_store().is_edit_batch_atomic()
+
     # pylint: disable=W0212
     def _edit_batch(
         self, edits: List[BatchEdit[T, T]], items_by_key: Dict[str, T]
@@ -31,6 +31,7 @@ from persisty.security.store_security_abc import StoreSecurityABC
 from persisty.servey.action_factory_abc import ActionFactoryABC
 
 from persisty.util import to_camel_case
+from persisty.util.codegen import compile_function
 from persisty.util.undefined import UNDEFINED
 
 T = TypeVar("T")
@@ -80,6 +81,8 @@ class StoreMeta:
     # pylint: disable=E3701
     action_factory: ActionFactoryABC = (field(default_factory=_default_action_factory),)
     class_functions: Tuple[Callable, ...] = tuple()
+    # Generate dataclasses with __slots__ (and a __hash__ based on the key), reducing memory use per item
+    slots: bool = False
 
     def get_stored_dataclass(self) -> Type:
         return self._get_dataclass(
@@ -194,9 +197,17 @@ class StoreMeta:
                 params["__persisty_store_meta__"] = self
                 params["__schema_factory__"] = _schema_factory
                 params["__marshaller_factory__"] = _marshaller_factory
-                params["__eq__"] = _eq
+                field_names = tuple(annotations)
+                params["__eq__"] = _generate_eq(self.attrs, field_names)
+                if self.slots:
+                    key_attr_names = self.key_config.get_key_attrs()
+                    params["__hash__"] = _generate_hash(key_attr_names, field_names)
                 # noinspection PyTypeChecker
-                result = dataclass(type(name, tuple(), params))
+                result = type(name, tuple(), params)
+                if self.slots:
+                    result = dataclass(result, slots=True)
+                else:
+                    result = dataclass(result)
             else:
                 result = None
             setattr(self, attr_name, result)
@@ -280,11 +291,32 @@ def _marshaller_factory(cls, marshaller_context: MarshallerContext):
     )
 
 
-def _eq(self, other):
-    meta: StoreMeta = get_meta(self)
-    for attr in meta.attrs:
-        a = getattr(self, attr.name, UNDEFINED)
-        b = getattr(other, attr.name, UNDEFINED)
-        if a != b:
-            return False
-    return True
+def _generate_eq(attrs: Iterable[Attr], field_names: Tuple[str, ...]) -> Callable:
+    """
+    Generate an __eq__ function comparing all attrs in the store. (Attrs which are not fields in the
+    dataclass are treated as UNDEFINED)
+    """
+    own_values = []
+    other_values = []
+    for attr in attrs:
+        own_values.append(
+            f"self.{attr.name}" if attr.name in field_names else "UNDEFINED"
+        )
+        other_values.append(f"getattr(other, {attr.name!r}, UNDEFINED)")
+    lines = [
+        "def __eq__(self, other):",
+        f"    return ({', '.join(own_values)},) == ({', '.join(other_values)},)",
+    ]
+    return compile_function("__eq__", lines, {"UNDEFINED": UNDEFINED})
+
+
+def _generate_hash(
+    key_attr_names: Iterable[str], field_names: Tuple[str, ...]
+) -> Optional[Callable]:
+    """Generate a __hash__ function based on the key, which is not updatable."""
+    key_attr_names = [n for n in key_attr_names if n in field_names]
+    if not key_attr_names:
+        return None
+    values = ", ".join(f"self.{n}" for n in key_attr_names)
+    lines = ["def __hash__(self):", f"    return hash(({values},))"]
+    return compile_function("__hash__", lines, {})
@@ -46,8 +46,12 @@ def stored(
     summary_attr_names: Optional[Tuple[str, ...]] = None,
     store_factory: Optional[StoreFactoryABC] = None,
     action_factory: Optional[ActionFactoryABC] = None,
+    slots: bool = False,
 ):
-    """Decorator inspired by dataclasses, containing stored meta."""
+    """
+    Decorator inspired by dataclasses, containing stored meta. If slots is True, generated dataclasses use
+    __slots__ rather than a __dict__, and are hashable by key.
+    """
     if schema_context is None:
         schema_context = get_default_schema_context()
 
@@ -128,6 +132,7 @@ def stored(
             store_factory=store_factory or StoreFactory(),
             action_factory=action_factory or ActionFactory(),
             class_functions=_get_class_functions(cls_dict),
+            slots=slots,
         )
         result = store_meta.get_stored_dataclass()
         return result
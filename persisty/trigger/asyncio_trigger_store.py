@@ -1,6 +1,8 @@
 import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Optional, Iterator
+from typing import Coroutine, Optional, Iterator, List, Set
 
 from marshy.types import ExternalItemType
 from servey.action.action import Action
@@ -12,11 +14,22 @@ from persisty.store.store_abc import StoreABC
 from persisty.store.wrapper_store_abc import WrapperStoreABC, T
 from persisty.trigger.store_triggers import StoreTriggers
 
+# Trigger tasks started in the current context, which are awaited by the async caller (if any)
+_TRIGGER_TASKS: ContextVar[Optional[List[asyncio.Task]]] = ContextVar(
+    "_TRIGGER_TASKS", default=None
+)
+
+# Trigger tasks which no caller is awaiting. The event loop only keeps weak references to tasks, so these are
+# kept here until they are done to stop them being garbage collected part way through
+_PENDING_TRIGGER_TASKS: Set[asyncio.Task] = set()
+
 
 @dataclass
 class AsyncioTriggerStore(WrapperStoreABC[T]):
     """
-    Store which runs triggers after edits using asyncio
+    Store which runs triggers after edits using asyncio. Where an event loop is running, each trigger is
+    started as a task (Awaited by the caller if it is collecting them - see collect_trigger_tasks). Otherwise
+    the store is being used synchronously, and the caller blocks on asyncio.run until each trigger completes.
     """
 
     store: StoreABC
@@ -28,10 +41,19 @@ class AsyncioTriggerStore(WrapperStoreABC[T]):
     def create(self, item: T) -> Optional[T]:
         result = self.store.create(item)
         if result:
-            coro = self.store_triggers.async_after_create(result)
-            asyncio.ensure_future(coro)
+            if self.store_triggers.has_after_create_actions():
+                _run_trigger(self.store_triggers.async_after_create(result))
             return result
 
+    def upsert(self, item: T) -> Optional[T]:
+        if (
+            not self.store_triggers.has_after_create_actions()
+            and not self.store_triggers.has_after_update_actions()
+        ):
+            return self.store.upsert(item)
+        # Triggers need to know whether the item was created or updated
+        return StoreABC.upsert(self, item)
+
     def update(
         self, updates: ExternalItemType, precondition: SearchFilterABC = INCLUDE_ALL
     ) -> Optional[ExternalItemType]:
@@ -43,8 +65,8 @@ class AsyncioTriggerStore(WrapperStoreABC[T]):
         # pylint: disable=W0212
         new_item = self.store._update(key, item, updates)
         if new_item:
-            coro = self.store_triggers.async_after_update(item, new_item)
-            asyncio.ensure_future(coro)
+            if self.store_triggers.has_after_update_actions():
+                _run_trigger(self.store_triggers.async_after_update(item, new_item))
             return new_item
 
     def delete(self, key: str) -> bool:
@@ -55,9 +77,8 @@ class AsyncioTriggerStore(WrapperStoreABC[T]):
     def _delete(self, key: str, item: T) -> bool:
         # pylint: disable=W0212
         result = self.store._delete(key, item)
-        if result:
-            coro = self.store_triggers.async_after_delete(item)
-            asyncio.ensure_future(coro)
+        if result and self.store_triggers.has_after_delete_actions():
+            _run_trigger(self.store_triggers.async_after_delete(item))
         return result
 
     def update_all(self, search_filter: SearchFilterABC[T], updates: T):
@@ -73,6 +94,36 @@ class AsyncioTriggerStore(WrapperStoreABC[T]):
             self.store.delete_all(search_filter)
 
 
+@contextmanager
+def collect_trigger_tasks() -> Iterator[List[asyncio.Task]]:
+    """
+    Collect the tasks for any triggers started within this context, so an async caller may await them rather
+    than leaving them pending
+    """
+    tasks = []
+    token = _TRIGGER_TASKS.set(tasks)
+    try:
+        yield tasks
+    finally:
+        _TRIGGER_TASKS.reset(token)
+
+
+def _run_trigger(coro: Coroutine):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No event loop is running (The store is being used synchronously), so run the trigger to completion
+        asyncio.run(coro)
+        return
+    task = loop.create_task(coro)
+    tasks = _TRIGGER_TASKS.get()
+    if tasks is not None:
+        tasks.append(task)
+    else:
+        _PENDING_TRIGGER_TASKS.add(task)
+        task.add_done_callback(_PENDING_TRIGGER_TASKS.discard)
+
+
 def _get_triggered_actions(store_name: str, trigger_type) -> Iterator[Action]:
     for action, trigger in find_actions_with_trigger_type(trigger_type):
         if trigger.store_name == store_name:
@@ -33,6 +33,15 @@ class CeleryTriggerStore(WrapperStoreABC[T]):
                 task.apply_async(item)
             return result
 
+    def upsert(self, item: T) -> Optional[T]:
+        if (
+            not self.store_triggers.has_after_create_actions()
+            and not self.store_triggers.has_after_update_actions()
+        ):
+            return self.store.upsert(item)
+        # Triggers need to know whether the item was created or updated
+        return StoreABC.upsert(self, item)
+
     def update(
         self, updates: ExternalItemType, precondition: SearchFilterABC = INCLUDE_ALL
     ) -> Optional[ExternalItemType]:
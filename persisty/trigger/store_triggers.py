@@ -34,18 +34,18 @@ class StoreTriggers:
         return self.after_create_actions
 
     def get_after_update_actions(self):
-        if self.after_create_actions is None:
-            self.after_create_actions = list(
+        if self.after_update_actions is None:
+            self.after_update_actions = list(
                 _get_triggered_actions(self.store_meta.name, AfterUpdateTrigger)
             )
-        return self.after_create_actions
+        return self.after_update_actions
 
     def get_after_delete_actions(self):
-        if self.after_create_actions is None:
-            self.after_create_actions = list(
+        if self.after_delete_actions is None:
+            self.after_delete_actions = list(
                 _get_triggered_actions(self.store_meta.name, AfterDeleteTrigger)
             )
-        return self.after_create_actions
+        return self.after_delete_actions
 
     def has_after_create_actions(self):
         return bool(self.get_after_create_actions())
@@ -70,13 +70,13 @@ class StoreTriggers:
                 await result
 
     async def async_after_update(self, old_item, new_item):
-        for action in self.get_after_create_actions():
+        for action in self.get_after_update_actions():
             result = action.fn(old_item, new_item)
             if isinstance(result, Awaitable):
                 await result
 
     async def async_after_delete(self, old_item):
-        for action in self.get_after_create_actions():
+        for action in self.get_after_delete_actions():
             result = action.fn(old_item)
             if isinstance(result, Awaitable):
                 await result
@@ -0,0 +1,15 @@
+from typing import Callable, Dict, Any, Iterable
+
+
+def compile_function(
+    name: str, lines: Iterable[str], namespace: Dict[str, Any]
+) -> Callable:
+    """
+    Compile a function from the source lines given, using the namespace given as globals. Used to generate
+    straight line conversion functions once, rather than looping over attrs for each item.
+    """
+    src = "\n".join(lines) + "\n"
+    local_namespace = {}
+    # pylint: disable=W0122
+    exec(compile(src, f"<persisty:{name}>", "exec"), namespace, local_namespace)
+    return local_namespace[name]
@@ -12,10 +12,14 @@ extras_require = {
         "pylint~=3.0",
         "boto3~=1.26",
         "moto~=3.1",
+        "numpy>=1.24",
+        "aiosqlite~=0.19",
     ],
     "server": ["servey[server]~=3.0"],
     "serverless": ["servey[serverless]~=3.0", "opensearch-py~=2.2"],
+    "numpy": ["numpy>=1.24"],
     "sql": ["SQLAlchemy~=1.4"],
+    "sqlasync": ["SQLAlchemy[asyncio]~=1.4"],
     "sqldev": ["alembic~=1.12"],
     "scheduler": ["servey[scheduler]~=3.0"],
 }
@@ -35,7 +39,7 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/tofarr/lambsync",
-    packages=setuptools.find_packages(exclude=("tests*",)),
+    packages=setuptools.find_packages(exclude=("tests*", "benchmarks*")),
     install_requires=[
         "pyaes~=1.6",
         "servey~=3.0",
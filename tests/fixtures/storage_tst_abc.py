@@ -17,6 +17,7 @@ from persisty.errors import PersistyError
 from persisty.result_set import ResultSet
 from persisty.search_filter.filter_factory import filter_factory
 from persisty.search_filter.exclude_all import EXCLUDE_ALL
+from persisty.search_filter.include_all import INCLUDE_ALL
 from persisty.search_filter.search_filter_abc import SearchFilterABC
 from persisty.search_order.search_order import SearchOrder
 from persisty.search_order.search_order_attr import SearchOrderAttr
@@ -488,6 +489,69 @@ class StoreTstABC(ABC):
             self.assertTrue(result.success)
         self.assertEqual(89, store.count())
 
+    def test_upsert(self):
+        store = self.new_super_bowl_results_store()
+        item = marshy.load(
+            SuperBowlResult,
+            {
+                "code": "li",
+                "result_year": 2017,
+                "result_date": "2017-02-05T00:00:00+00:00",
+                "winner_code": "tom_brady_fan_club",
+                "runner_up_code": "atlanta",
+                "winner_score": 34,
+                "runner_up_score": 28,
+            },
+        )
+        self.assertEqual(item, store.upsert(deepcopy(item)))
+        self.assertEqual(item, store.read("li"))
+        self.assertEqual(56, store.count())
+        item.code = "c"
+        self.assertEqual(item, store.upsert(deepcopy(item)))
+        self.assertEqual(item, store.read("c"))
+        self.assertEqual(57, store.count())
+
+    def test_edit_batch_upsert(self):
+        store = self.new_number_name_store()
+        edits = [
+            BatchEdit(
+                upsert_item=NumberName(
+                    id=NUMBER_NAMES[0].id, title="Nothing", num_value=0
+                )
+            ),
+            BatchEdit(
+                upsert_item=NumberName(
+                    id=UUID("00000000-0000-0000-0000-000000000100"),
+                    title="Hundred",
+                    num_value=100,
+                )
+            ),
+        ]
+        results = store.edit_batch(edits)
+        self.assertEqual(edits, [r.edit for r in results])
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual(100, store.count())
+        self.assertEqual("Nothing", store.read(str(NUMBER_NAMES[0].id)).title)
+        self.assertEqual("Hundred", store.read(str(edits[1].upsert_item.id)).title)
+
+    def test_update_all(self):
+        store = self.new_number_name_store()
+        filters = filter_factory(NumberName)
+        store.update_all(filters.num_value.lt(10), NumberName(title="Small"))
+        small = list(store.search_all(filters.title.eq("Small")))
+        self.assertEqual(list(range(1, 10)), sorted(n.num_value for n in small))
+        self.assertEqual("Ten", store.read(str(NUMBER_NAMES[9].id)).title)
+        self.assertEqual(99, store.count())
+
+    def test_delete_all(self):
+        store = self.new_number_name_store()
+        filters = filter_factory(NumberName)
+        store.delete_all(filters.num_value.gte(50))
+        self.assertEqual(49, store.count())
+        self.assertEqual(0, store.count(filters.num_value.gte(50)))
+        store.delete_all(INCLUDE_ALL)
+        self.assertEqual(0, store.count())
+
     def test_update_no_key(self):
         store = self.new_number_name_store()
         with self.assertRaises(PersistyError):
@@ -1,13 +1,17 @@
+import dataclasses
 from decimal import Decimal
 from typing import List, Type
 from unittest import TestCase
+from unittest.mock import patch
 
+from botocore.exceptions import EndpointConnectionError
 from marshy import dump
 from marshy.types import ExternalItemType
 
 from persisty.attr.attr import Attr
 from persisty.attr.attr_type import AttrType
 from persisty.attr.generator.default_value_generator import DefaultValueGenerator
+from persisty.batch_edit import BatchEdit
 from persisty.impl.dynamodb.partition_sort_index import PartitionSortIndex
 from persisty.impl.dynamodb.dynamodb_store_factory import DynamodbStoreFactory
 from persisty.key_config.attr_key_config import AttrKeyConfig
@@ -31,8 +35,8 @@ from tests.utils import mock_dynamodb_with_super
 
 @mock_dynamodb_with_super
 class TestDynamodbStore(TestCase, StoreTstABC):
-    def new_store(self, type_: Type, seed: List[ExternalItemType]):
-        store_factory = DynamodbStoreFactory()
+    def new_store(self, type_: Type, seed: List[ExternalItemType], **kwargs):
+        store_factory = DynamodbStoreFactory(**kwargs)
         store_meta = get_meta(type_)
         store_factory.derive_from_meta(store_meta)
         self.seed_table(store_meta, store_factory, seed)
@@ -131,6 +135,165 @@ class TestDynamodbStore(TestCase, StoreTstABC):
         self.assertEqual(1000, tag_store.count(filters.title.ne("foobar")))
         self.assertEqual(10, tag_store.count(filters.sk.eq(10)))
 
+    def test_read_all_concurrent_chunks(self):
+        tag_store = self.new_tag_store()
+        to_key_str = tag_store.get_meta().key_config.to_key_str
+        keys = [to_key_str(Tag(pk=i // 100, sk=i % 100)) for i in range(1, 1002)]
+        items = list(tag_store.read_all(keys))
+        self.assertEqual(
+            [str(i) for i in range(1, 1001)], [i.title for i in items[:-1]]
+        )
+        self.assertIsNone(items[-1])  # Does not exist
+
+    def test_read_batch_retries_unprocessed_keys(self):
+        # noinspection PyUnresolvedReferences
+        store = self.new_tag_store().store
+        store = dataclasses.replace(store, retry_base_delay=0)
+        client = store._dynamodb_client()
+        batch_get_item = client.batch_get_item
+        requests = []
+
+        # noinspection PyPep8Naming
+        def throttled_batch_get_item(RequestItems):
+            requests.append(RequestItems)
+            if len(requests) > 1:
+                return batch_get_item(RequestItems=RequestItems)
+            # Process only the first key, as dynamodb may when throttled
+            keys = RequestItems[store.table_name]["Keys"]
+            response = batch_get_item(
+                RequestItems={store.table_name: {"Keys": keys[:1]}}
+            )
+            response["UnprocessedKeys"] = {store.table_name: {"Keys": keys[1:]}}
+            return response
+
+        to_key_str = store.get_meta().key_config.to_key_str
+        keys = [to_key_str(Tag(pk=0, sk=i)) for i in range(1, 11)]
+        with patch.object(client, "batch_get_item", throttled_batch_get_item):
+            items = store.read_batch(keys)
+        self.assertEqual(2, len(requests))
+        self.assertEqual([str(i) for i in range(1, 11)], [i.title for i in items])
+
+    def test_parallel_scan(self):
+        # noinspection PyUnresolvedReferences
+        store = dataclasses.replace(self.new_tag_store().store, scan_segments=4)
+        client = store._dynamodb_client()
+        scan = client.scan
+        segments = []
+
+        # Moto ignores segments, so all items are placed in the first segment
+        # noinspection PyPep8Naming
+        def segmented_scan(Segment, TotalSegments, **kwargs):
+            segments.append((Segment, TotalSegments))
+            if Segment:
+                return {"Items": [], "Count": 0}
+            return scan(**kwargs)
+
+        filters = filter_factory(Tag)
+        search_filter = filters.title.ne("foobar")
+        with patch.object(client, "scan", segmented_scan):
+            items = list(store.search_all(search_filter))
+            self.assertEqual(
+                {str(i) for i in range(1, 1001)}, {item.title for item in items}
+            )
+            self.assertEqual(1000, len(items))
+            self.assertEqual(1000, store.count(search_filter))
+            # Stopping early abandons the remaining segments
+            items = store.search_all()
+            next(items)
+            items.close()
+        self.assertEqual({(i, 4) for i in range(4)}, set(segments))
+
+    def test_parallel_scan_segment_error(self):
+        # noinspection PyUnresolvedReferences
+        store = dataclasses.replace(self.new_tag_store().store, scan_segments=4)
+        client = store._dynamodb_client()
+        scan = client.scan
+
+        # noinspection PyPep8Naming
+        def failing_scan(Segment, TotalSegments, **kwargs):
+            if Segment == 2:
+                raise EndpointConnectionError(endpoint_url="http://localhost")
+            return scan(**kwargs) if not Segment else {"Items": [], "Count": 0}
+
+        with patch.object(client, "scan", failing_scan):
+            with self.assertRaises(EndpointConnectionError):
+                list(store.search_all())
+
+    def test_transactional_edit_batch(self):
+        store = self.new_store(
+            SuperBowlResult, SUPER_BOWL_RESULT_DICTS, transactional=True
+        )
+        self.assertTrue(store.is_edit_batch_atomic())
+        existing = store.read("i")
+        edits = [
+            BatchEdit(update_item=SuperBowlResult(code="ii", winner_code="robots")),
+            BatchEdit(delete_key="iii"),
+            BatchEdit(create_item=dataclasses.replace(existing, code="c")),
+        ]
+        results = store.edit_batch(edits)
+        self.assertTrue(all(r.success for r in results))
+        updated = store.read("ii")
+        self.assertEqual("robots", updated.winner_code)
+        self.assertEqual("oakland", updated.runner_up_code)
+
+        # The table store returns the full updated item, as in the non transactional case
+        table_store = store
+        while isinstance(table_store, WrapperStoreABC):
+            table_store = table_store.get_store()
+        edit = BatchEdit(update_item=SuperBowlResult(code="ii", winner_code="aliens"))
+        results = table_store.edit_batch([edit])
+        self.assertEqual(store.read("ii"), results[0].edit.update_item)
+        self.assertEqual("oakland", results[0].edit.update_item.runner_up_code)
+        self.assertIsNone(store.read("iii"))
+        self.assertEqual(56, store.count())
+
+        # A duplicate create cancels the whole batch
+        edits = [
+            BatchEdit(delete_key="iv"),
+            BatchEdit(create_item=existing),
+        ]
+        results = store.edit_batch(edits)
+        self.assertEqual(edits, [r.edit for r in results])
+        self.assertFalse(any(r.success for r in results))
+        self.assertEqual("transaction_cancelled", results[0].code)
+        self.assertEqual("ConditionalCheckFailed", results[1].details)
+        self.assertIsNotNone(store.read("iv"))
+
+        # As does an update or delete of a missing item
+        for missing in (
+            BatchEdit(update_item=SuperBowlResult(code="zz", winner_code="robots")),
+            BatchEdit(delete_key="zz"),
+        ):
+            results = store.edit_batch([BatchEdit(delete_key="iv"), missing])
+            self.assertFalse(any(r.success for r in results))
+            self.assertEqual("transaction_cancelled", results[0].code)
+            self.assertIsNotNone(store.read("iv"))
+
+    def test_transactional_edit_batch_duplicate_key(self):
+        store = self.new_store(
+            SuperBowlResult, SUPER_BOWL_RESULT_DICTS, transactional=True
+        )
+        edits = [
+            BatchEdit(delete_key="iv"),
+            BatchEdit(update_item=SuperBowlResult(code="ii", winner_code="robots")),
+            BatchEdit(delete_key="ii"),
+        ]
+        results = store.edit_batch(edits)
+        self.assertFalse(any(r.success for r in results))
+        self.assertEqual("transaction_cancelled", results[0].code)
+        self.assertEqual(
+            [None, "DuplicateKey", "DuplicateKey"], [r.details for r in results]
+        )
+        self.assertIsNotNone(store.read("iv"))
+        self.assertNotEqual("robots", store.read("ii").winner_code)
+
+    def test_transactional_edit_batch_too_large_for_transaction(self):
+        store_meta = dataclasses.replace(get_meta(SuperBowlResult), batch_size=101)
+        store_factory = DynamodbStoreFactory(transactional=True)
+        self.seed_table(store_meta, store_factory, SUPER_BOWL_RESULT_DICTS)
+        store = store_factory.create(store_meta)
+        self.assertFalse(store.is_edit_batch_atomic())
+
     def test_convert_to_decimals(self):
         item = {"some_int": 10, "some_float": 0.5}
         # noinspection PyUnresolvedReferences
@@ -1,13 +1,25 @@
+import asyncio
 import dataclasses
 from unittest import TestCase
 
+from servey.action.action import Action
+
+from persisty.attr.attr_filter import AttrFilter
+from persisty.attr.attr_filter_op import AttrFilterOp
 from persisty.errors import PersistyError
+from persisty.impl.mem.mem_index import SortedIndex
 from persisty.impl.mem.mem_store import MemStore
+from persisty.index.attr_index import AttrIndex
+from persisty.index.unique_index import unique_index
 from persisty.impl.mem.mem_store_factory import MemStoreFactory
 from persisty.search_filter.filter_factory import filter_factory
 from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.search_order.search_order import SearchOrder
+from persisty.search_order.search_order_attr import SearchOrderAttr
 from persisty.store.store_abc import StoreABC
 from persisty.store_meta import get_meta, StoreMeta
+from persisty.trigger.asyncio_trigger_store import _PENDING_TRIGGER_TASKS
+from persisty.trigger.store_triggers import StoreTriggers
 from tests.fixtures.author import Author, AUTHORS
 from tests.fixtures.book import Book, BOOKS
 from tests.fixtures.number_name import NumberName, NUMBER_NAMES
@@ -69,11 +81,52 @@ class TestMemStore(TestCase, StoreTstABC):
         )
 
     def test_mem_store_no_dict(self):
-        store = MemStoreFactory().create(get_meta(NumberName))
+        # Not accessing other actions for test
+        store = MemStoreFactory(triggers=False).create(get_meta(NumberName))
         created = store.create(NumberName(num_value=1, title="One"))
         loaded = store.read(str(created.id))
         self.assertEqual(loaded, created)
 
+    def test_sync_triggers(self):
+        store = MemStoreFactory().create(get_meta(NumberName))
+        triggered = []
+
+        async def after_create(item):
+            triggered.append(item.title)
+
+        # noinspection PyUnresolvedReferences
+        store.store_triggers = StoreTriggers(
+            get_meta(NumberName),
+            after_create_actions=[Action(after_create, "after_create")],
+        )
+        store.create(NumberName(num_value=1, title="One"))
+        # With no event loop running, triggers run to completion before create returns
+        self.assertEqual(["One"], triggered)
+
+    def test_triggers_in_running_loop(self):
+        store = MemStoreFactory().create(get_meta(NumberName))
+        triggered = []
+
+        async def after_create(item):
+            triggered.append(item.title)
+
+        # noinspection PyUnresolvedReferences
+        store.store_triggers = StoreTriggers(
+            get_meta(NumberName),
+            after_create_actions=[Action(after_create, "after_create")],
+        )
+
+        async def create():
+            store.create(NumberName(num_value=1, title="One"))
+            # With no caller collecting it, the trigger task is kept until it is done
+            tasks = list(_PENDING_TRIGGER_TASKS)
+            self.assertEqual(1, len(tasks))
+            await asyncio.gather(*tasks)
+            self.assertEqual(["One"], triggered)
+            self.assertFalse(_PENDING_TRIGGER_TASKS)
+
+        asyncio.run(create())
+
     def test_mem_store_delete_missing_key(self):
         store = MemStore(get_meta(NumberName))
         self.assertFalse(store.delete("missing_key"))
@@ -117,3 +170,256 @@ class TestMemStore(TestCase, StoreTstABC):
         with self.assertRaises(PersistyError):
             store.update(NumberName(title="foobar"))
         self.assertEqual(0, store.count())
+
+    def new_indexed_super_bowl_results_store(self) -> MemStore:
+        store_meta = dataclasses.replace(
+            get_meta(SuperBowlResult),
+            indexes=(
+                AttrIndex("winner_code"),
+                unique_index("winner_code", "result_year"),
+            ),
+        )
+        return MemStore(
+            store_meta, {r.code: dataclasses.replace(r) for r in SUPER_BOWL_RESULTS}
+        )
+
+    def test_hash_index_search(self):
+        store = self.new_indexed_super_bowl_results_store()
+        self.assertEqual(2, len(store.hash_indexes))
+        filters = filter_factory(SuperBowlResult)
+        expected = [r for r in SUPER_BOWL_RESULTS if r.winner_code == "new_england"]
+        search_filter = filters.winner_code.eq("new_england")
+        self.assertEqual(6, len(store._get_candidate_keys(search_filter)))
+        self.assertEqual(expected, list(store.search_all(search_filter)))
+        self.assertEqual(6, store.count(search_filter))
+        search_filter = filters.winner_code.eq("new_england") & filters.result_year.eq(
+            2017
+        )
+        self.assertEqual(["li"], list(store._get_candidate_keys(search_filter)))
+        self.assertEqual(1, store.count(search_filter))
+        search_filter = AttrFilter(
+            "winner_code", AttrFilterOp.oneof, ("green_bay", "miami")
+        )
+        expected = [
+            r for r in SUPER_BOWL_RESULTS if r.winner_code in ("green_bay", "miami")
+        ]
+        keys = store._get_candidate_keys(search_filter)
+        self.assertEqual(sorted(r.code for r in expected), sorted(keys))
+
+    def test_hash_index_key_lookup(self):
+        store = self.new_indexed_super_bowl_results_store()
+        filters = filter_factory(SuperBowlResult)
+        search_filter = filters.code.eq("xx") & filters.winner_code.eq("chicago")
+        self.assertEqual(["xx"], store._get_candidate_keys(search_filter))
+        self.assertEqual([store.read("xx")], list(store.search_all(search_filter)))
+        self.assertIsNone(store._get_candidate_keys(filters.result_year.gt(2000)))
+
+    def test_key_lookup_repeated_values(self):
+        meta = get_meta(SuperBowlResult)
+        attrs = tuple(
+            dataclasses.replace(a, permitted_filter_ops=tuple(AttrFilterOp))
+            for a in meta.attrs
+        )
+        store = MemStore(
+            dataclasses.replace(meta, attrs=attrs),
+            {r.code: dataclasses.replace(r) for r in SUPER_BOWL_RESULTS},
+        )
+        search_filter = AttrFilter("code", AttrFilterOp.oneof, ["xx", "i", "xx"])
+        self.assertEqual(["xx", "i"], store._get_candidate_keys(search_filter))
+        self.assertEqual(2, len(list(store.search_all(search_filter))))
+        self.assertEqual(2, store.count(search_filter))
+        self.assertEqual(2, len(store.search(search_filter).results))
+
+    def test_hash_index_maintained(self):
+        store = self.new_indexed_super_bowl_results_store()
+        filters = filter_factory(SuperBowlResult)
+        store.update(SuperBowlResult(code="li", winner_code="atlanta"))
+        self.assertEqual(5, store.count(filters.winner_code.eq("new_england")))
+        self.assertEqual(
+            ["li"], list(store._get_candidate_keys(filters.winner_code.eq("atlanta")))
+        )
+        store.delete("li")
+        self.assertEqual(0, store.count(filters.winner_code.eq("atlanta")))
+        created = store.create(
+            dataclasses.replace(SUPER_BOWL_RESULTS[0], code="c", result_year=2067)
+        )
+        self.assertEqual(
+            [created], list(store.search_all(filters.result_year.eq(2067)))
+        )
+        self.assertEqual(
+            [created],
+            list(
+                store.search_all(
+                    filters.winner_code.eq("green_bay") & filters.result_year.eq(2067)
+                )
+            ),
+        )
+
+    def new_sorted_super_bowl_results_store(self) -> MemStore:
+        return MemStore(
+            get_meta(SuperBowlResult),
+            {r.code: dataclasses.replace(r) for r in SUPER_BOWL_RESULTS},
+            sorted_indexes=[SortedIndex("result_year"), SortedIndex("winner_code")],
+        )
+
+    def test_sorted_index_range(self):
+        store = self.new_sorted_super_bowl_results_store()
+        filters = filter_factory(SuperBowlResult)
+        search_filter = filters.result_year.gte(1984) & filters.result_year.lt(2004)
+        self.assertEqual(20, len(store._get_candidate_keys(search_filter)))
+        self.assertEqual(20, store.count(search_filter))
+        self.assertEqual(
+            SUPER_BOWL_RESULTS[17:37], list(store.search_all(search_filter))
+        )
+        search_filter = filters.result_year.gt(2020) | filters.result_year.lt(1968)
+        self.assertIsNone(store._get_candidate_keys(search_filter))
+        search_filter = filters.winner_code.startswith("NEW_")
+        expected = [
+            r.code for r in SUPER_BOWL_RESULTS if r.winner_code.startswith("new_")
+        ]
+        results = [r.code for r in store.search_all(search_filter)]
+        self.assertEqual(sorted(expected), sorted(results))
+        self.assertGreater(
+            len(SUPER_BOWL_RESULTS), len(store._get_candidate_keys(search_filter))
+        )
+
+    def test_sorted_index_startswith_not_narrowed(self):
+        store = self.new_sorted_super_bowl_results_store()
+        filters = filter_factory(SuperBowlResult)
+        store.create(
+            dataclasses.replace(SUPER_BOWL_RESULTS[0], code="c", winner_code="İzmir")
+        )
+        # "İ".lower() starts with "i", but sorts after every ascii value
+        search_filter = filters.winner_code.startswith("i")
+        self.assertIsNone(store._get_candidate_keys(search_filter))
+        self.assertIn("c", [r.code for r in store.search_all(search_filter)])
+        store.update(SuperBowlResult(code="c", winner_code=None))
+        # str(None).lower() starts with "n"
+        search_filter = filters.winner_code.startswith("n")
+        self.assertIsNone(store._get_candidate_keys(search_filter))
+        results = [r.code for r in store.search_all(search_filter)]
+        self.assertIn("c", results)
+
+    def test_sorted_index_search_order(self):
+        store = self.new_sorted_super_bowl_results_store()
+        filters = filter_factory(SuperBowlResult)
+        self.assertEqual(
+            list(reversed(SUPER_BOWL_RESULTS[17:37])),
+            list(
+                store.search_all(
+                    filters.result_year.gte(1984) & filters.result_year.lt(2004),
+                    filters.result_year.desc(),
+                )
+            ),
+        )
+        search_order = SearchOrder(
+            (SearchOrderAttr("winner_code"), SearchOrderAttr("result_year", True))
+        )
+        expected = sorted(
+            SUPER_BOWL_RESULTS, key=lambda r: (r.winner_code, -r.result_year)
+        )
+        self.assertEqual(expected, list(store.search_all(INCLUDE_ALL, search_order)))
+        page = store.search(INCLUDE_ALL, search_order, limit=5)
+        self.assertEqual(expected[:5], page.results)
+
+    def test_sorted_index_maintained(self):
+        store = self.new_sorted_super_bowl_results_store()
+        filters = filter_factory(SuperBowlResult)
+        store.update(SuperBowlResult(code="i", result_year=2100))
+        store.delete("lvi")
+        store.create(
+            dataclasses.replace(SUPER_BOWL_RESULTS[1], code="c", result_year=1900)
+        )
+        results = list(store.search_all(INCLUDE_ALL, filters.result_year.asc()))
+        self.assertEqual(
+            ["c"] + [r.code for r in SUPER_BOWL_RESULTS[1:55]] + ["i"],
+            [r.code for r in results],
+        )
+        self.assertEqual(
+            ["i"], [r.code for r in store.search_all(filters.result_year.gt(2022))]
+        )
+
+    def test_sorted_index_invalid(self):
+        with self.assertRaises(PersistyError):
+            MemStore(get_meta(SuperBowlResult), sorted_indexes=[SortedIndex("foo")])
+
+    def test_search_loads_only_results(self):
+        store = self.new_number_name_store().get_store()
+        loaded = []
+        load = store._load
+        store._load = lambda item: loaded.append(item) or load(item)
+        filters = filter_factory(NumberName)
+        page = store.search(INCLUDE_ALL, filters.num_value.desc(), limit=5)
+        self.assertEqual([99, 98, 97, 96, 95], [r.num_value for r in page.results])
+        self.assertEqual(5, len(loaded))
+        page = store.search(
+            INCLUDE_ALL, filters.num_value.desc(), page.next_page_key, 5
+        )
+        self.assertEqual([94, 93, 92, 91, 90], [r.num_value for r in page.results])
+        loaded.clear()
+        items = store.search_all(filters.num_value.gt(10))
+        self.assertEqual(11, next(items).num_value)
+        self.assertEqual(1, len(loaded))
+        store.delete(str(NUMBER_NAMES[20].id))  # Editing during iteration is fine
+        self.assertEqual(12, next(items).num_value)
+
+    def test_keyset_pagination(self):
+        filters = filter_factory(SuperBowlResult)
+        for store, search_order in (
+            (self.new_sorted_super_bowl_results_store(), filters.result_year.desc()),
+            (self.new_indexed_super_bowl_results_store(), filters.winner_code.asc()),
+            (self.new_indexed_super_bowl_results_store(), None),
+        ):
+            expected = list(store.search_all(INCLUDE_ALL, search_order))
+            results = []
+            page_key = None
+            while True:
+                page = store.search(INCLUDE_ALL, search_order, page_key, 10)
+                results.extend(page.results)
+                page_key = page.next_page_key
+                if not page_key:
+                    break
+                # Deleting the last item in the page does not invalidate the page key
+                store.delete(page.results[-1].code)
+            self.assertEqual([r.code for r in expected], [r.code for r in results])
+
+    def test_unordered_search_matches_search_all(self):
+        store = self.new_super_bowl_results_store()
+        recreated = store.read("x")
+        store.delete("x")
+        store.create(recreated)
+        for code in ("ii", "iii", "iv"):
+            store.delete(code)
+        expected = [r.code for r in store.search_all()]
+        self.assertEqual("x", expected[-1])
+        results = []
+        page_key = None
+        while True:
+            page = store.search(page_key=page_key, limit=5)
+            results.extend(r.code for r in page.results)
+            page_key = page.next_page_key
+            if not page_key:
+                break
+        self.assertEqual(expected, results)
+
+    def test_keyset_pagination_default(self):
+        store = self.new_sorted_super_bowl_results_store()
+        search_order = filter_factory(SuperBowlResult).winner_code.asc()
+        expected = [r.code for r in store.search_all(INCLUDE_ALL, search_order)]
+        results = []
+        page = StoreABC.search(store, INCLUDE_ALL, search_order, None, 7)
+        while page.next_page_key:
+            results.extend(r.code for r in page.results)
+            store.delete(page.results[-1].code)
+            page = StoreABC.search(
+                store, INCLUDE_ALL, search_order, page.next_page_key, 7
+            )
+        results.extend(r.code for r in page.results)
+        # Where the last item in a page was deleted, the remainder of its tie group may be returned again
+        self.assertEqual(set(expected), set(results))
+        self.assertEqual(expected, sorted(set(results), key=results.index))
+
+    def test_invalid_page_key(self):
+        store = self.new_super_bowl_results_store()
+        with self.assertRaises(PersistyError):
+            store.search(page_key="not_a_page_key")
@@ -0,0 +1,106 @@
+import dataclasses
+from unittest import TestCase
+
+from persisty.impl.numpy.columnar_mem_store import ColumnarMemStore
+from persisty.impl.numpy.columnar_mem_store_factory import ColumnarMemStoreFactory
+from persisty.search_filter.filter_factory import filter_factory
+from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.search_filter.query_filter import QueryFilter
+from persisty.store.store_abc import StoreABC
+from persisty.store_meta import get_meta
+from tests.fixtures.author import Author, AUTHORS
+from tests.fixtures.book import Book, BOOKS
+from tests.fixtures.number_name import NumberName, NUMBER_NAMES
+from tests.fixtures.storage_tst_abc import StoreTstABC
+from tests.fixtures.super_bowl_results import (
+    SuperBowlResult,
+    SUPER_BOWL_RESULTS,
+)
+
+
+class TestColumnarMemStore(TestCase, StoreTstABC):
+    def new_super_bowl_results_store(self) -> StoreABC:
+        factory = ColumnarMemStoreFactory(
+            [dataclasses.replace(r) for r in SUPER_BOWL_RESULTS], triggers=False
+        )
+        return factory.create(get_meta(SuperBowlResult))
+
+    def new_number_name_store(self) -> StoreABC:
+        factory = ColumnarMemStoreFactory(
+            [dataclasses.replace(r) for r in NUMBER_NAMES], triggers=False
+        )
+        return factory.create(get_meta(NumberName))
+
+    def new_author_store(self) -> StoreABC:
+        factory = ColumnarMemStoreFactory(
+            [dataclasses.replace(r) for r in AUTHORS], triggers=False
+        )
+        return factory.create(get_meta(Author))
+
+    def new_book_store(self) -> StoreABC:
+        factory = ColumnarMemStoreFactory(
+            [dataclasses.replace(r) for r in BOOKS], triggers=False
+        )
+        return factory.create(get_meta(Book))
+
+    def test_search_all_sorted(self):
+        store = self.new_super_bowl_results_store()
+        filters = filter_factory(SuperBowlResult)
+        self.assertEqual(
+            list(reversed(SUPER_BOWL_RESULTS[17:37])),
+            list(
+                store.search_all(
+                    filters.result_year.gte(1984) & filters.result_year.lt(2004),
+                    filters.result_year.desc(),
+                )
+            ),
+        )
+
+    def test_vectorized_filters_match_row_filters(self):
+        store = self.new_super_bowl_results_store().get_store()
+        filters = filter_factory(SuperBowlResult)
+        search_filters = [
+            filters.winner_code.eq("dal"),
+            filters.winner_code.ne("dal") & filters.result_year.lte(2000),
+            ~filters.result_year.gt(1990) | filters.winner_code.startswith("N"),
+            filters.winner_code.contains("e") & ~filters.winner_code.endswith("e"),
+            QueryFilter("ea"),
+        ]
+        attrs = store.meta.attrs
+        for search_filter in search_filters:
+            search_filter = search_filter.lock_attrs(attrs)
+            expected = [r for r in SUPER_BOWL_RESULTS if search_filter.match(r, attrs)]
+            self.assertEqual(
+                sorted(r.code for r in expected),
+                sorted(r.code for r in store.search_all(search_filter)),
+            )
+            self.assertEqual(len(expected), store.count(search_filter))
+
+    def test_paged_search_order(self):
+        store = self.new_super_bowl_results_store().get_store()
+        filters = filter_factory(SuperBowlResult)
+        search_order = filters.winner_code.desc()
+        expected = sorted(SUPER_BOWL_RESULTS, key=lambda r: r.code)
+        expected = sorted(expected, key=lambda r: r.winner_code, reverse=True)
+        results = []
+        page = store.search(INCLUDE_ALL, search_order, limit=8)
+        while True:
+            results.extend(page.results)
+            if not page.next_page_key:
+                break
+            page = store.search(INCLUDE_ALL, search_order, page.next_page_key, 8)
+        self.assertEqual([r.code for r in expected], [r.code for r in results])
+
+    def test_columns_grow_and_shrink(self):
+        store = ColumnarMemStore(get_meta(NumberName))
+        for number_name in NUMBER_NAMES:
+            store.create(number_name)
+        self.assertEqual(len(NUMBER_NAMES), store.count())
+        for number_name in NUMBER_NAMES[:50]:
+            store.delete(str(number_name.id))
+        self.assertEqual(
+            [n.num_value for n in NUMBER_NAMES[50:]],
+            sorted(n.num_value for n in store.search_all()),
+        )
+        number_name = NUMBER_NAMES[75]
+        self.assertEqual(number_name.title, store.read(str(number_name.id)).title)
@@ -0,0 +1,134 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from servey.action.action import Action
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from persisty.batch_edit import BatchEdit
+from persisty.errors import PersistyError
+from persisty.impl.sqlalchemy.async_sqlalchemy_table_store_factory import (
+    AsyncSqlalchemyTableStoreFactory,
+)
+from persisty.search_filter.filter_factory import filter_factory
+from persisty.store_meta import get_meta
+from persisty.trigger.store_triggers import StoreTriggers
+from tests.fixtures.number_name import NumberName, NUMBER_NAMES
+
+
+class TestAsyncSqlalchemyTableStore(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+        factory = AsyncSqlalchemyTableStoreFactory(self.engine)
+        self.store = factory.create(get_meta(NumberName))
+        self.triggered = []
+
+        async def after_create(item):
+            await asyncio.sleep(0)  # Triggers may be coroutines which yield to the loop
+            self.triggered.append(("create", item.title))
+
+        def after_update(old_item, new_item):
+            self.triggered.append(("update", old_item.title, new_item.title))
+
+        async def after_delete(item):
+            self.triggered.append(("delete", item.title))
+
+        # noinspection PyUnresolvedReferences
+        self.store.store.store_triggers = StoreTriggers(
+            get_meta(NumberName),
+            after_create_actions=[Action(after_create, "after_create")],
+            after_update_actions=[Action(after_update, "after_update")],
+            after_delete_actions=[Action(after_delete, "after_delete")],
+        )
+        await factory.create_tables()
+        batch_size = self.store.get_meta().batch_size
+        for index in range(0, len(NUMBER_NAMES), batch_size):
+            await self.store.edit_batch(
+                [
+                    BatchEdit(create_item=n)
+                    for n in NUMBER_NAMES[index : index + batch_size]
+                ]
+            )
+
+    async def asyncTearDown(self) -> None:
+        await self.engine.dispose()
+
+    async def test_read(self):
+        number_name = NUMBER_NAMES[3]
+        self.assertEqual(number_name, await self.store.read(str(number_name.id)))
+        keys = [str(n.id) for n in NUMBER_NAMES[10:20]]
+        self.assertEqual(NUMBER_NAMES[10:20], await self.store.read_batch(keys))
+
+    async def test_create_update_delete(self):
+        created = await self.store.create(NumberName(title="Hundred", num_value=100))
+        key = str(created.id)
+        self.assertEqual(created, await self.store.read(key))
+        updated = await self.store.update(NumberName(id=created.id, title="Century"))
+        self.assertEqual("Century", updated.title)
+        self.assertEqual(updated, await self.store.read(key))
+        self.assertTrue(await self.store.delete(key))
+        self.assertIsNone(await self.store.read(key))
+        self.assertFalse(await self.store.delete(key))
+
+    async def test_triggers(self):
+        created = await self.store.create(NumberName(title="Hundred", num_value=100))
+        # Triggers have completed by the time the operation returns
+        self.assertEqual([("create", "Hundred")], self.triggered)
+        await self.store.update(NumberName(id=created.id, title="Century"))
+        await self.store.upsert(NumberName(id=created.id, title="Ton"))
+        await self.store.delete(str(created.id))
+        expected = [
+            ("create", "Hundred"),
+            ("update", "Hundred", "Century"),
+            ("update", "Century", "Ton"),
+            ("delete", "Ton"),
+        ]
+        self.assertEqual(expected, self.triggered)
+
+    async def test_search(self):
+        filters = filter_factory(NumberName)
+        search_filter = filters.num_value.lt(50)
+        search_order = filters.num_value.desc()
+        page = await self.store.search(search_filter, search_order, limit=10)
+        self.assertEqual(list(reversed(NUMBER_NAMES[39:49])), page.results)
+        page = await self.store.search(
+            search_filter, search_order, page.next_page_key, 10
+        )
+        self.assertEqual(list(reversed(NUMBER_NAMES[29:39])), page.results)
+        results = [n async for n in self.store.search_all(search_filter)]
+        self.assertEqual(NUMBER_NAMES[:49], results)
+        self.assertEqual(49, await self.store.count(search_filter))
+        self.assertEqual(99, await self.store.count())
+
+    async def test_upsert(self):
+        item = await self.store.upsert(
+            NumberName(id=NUMBER_NAMES[0].id, title="Nothing", num_value=0)
+        )
+        self.assertEqual("Nothing", item.title)
+        self.assertEqual(item, await self.store.read(str(NUMBER_NAMES[0].id)))
+        self.assertEqual(99, await self.store.count())
+
+    async def test_edit_batch(self):
+        edits = [
+            BatchEdit(update_item=NumberName(id=NUMBER_NAMES[0].id, title="Nothing")),
+            BatchEdit(delete_key=str(NUMBER_NAMES[1].id)),
+            BatchEdit(create_item=NUMBER_NAMES[2]),
+        ]
+        results = await self.store.edit_batch(edits)
+        self.assertEqual([True, True, False], [r.success for r in results])
+        self.assertEqual(98, await self.store.count())
+        item = await self.store.read(str(NUMBER_NAMES[0].id))
+        self.assertEqual("Nothing", item.title)
+
+    async def test_update_all_delete_all(self):
+        filters = filter_factory(NumberName)
+        await self.store.update_all(filters.num_value.lt(10), NumberName(title="Low"))
+        self.assertEqual(9, await self.store.count(filters.title.eq("Low")))
+        await self.store.delete_all(filters.title.eq("Low"))
+        self.assertEqual(90, await self.store.count())
+
+    async def test_session_rollback(self):
+        with self.assertRaises(PersistyError):
+            async with self.store.session():
+                await self.store.delete(str(NUMBER_NAMES[0].id))
+                raise PersistyError("rollback")
+        self.assertEqual(99, await self.store.count())
@@ -0,0 +1,84 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from persisty.impl.sqlalchemy.sqlalchemy_context import SqlalchemyContext
+from persisty.impl.sqlalchemy.sqlalchemy_context_factory import SqlalchemyContextFactory
+from persisty.impl.sqlalchemy.sqlalchemy_pool import (
+    SqlalchemyPoolConfig,
+    InstrumentedQueuePool,
+)
+
+
+class TestSqlalchemyPool(TestCase):
+    def test_config_from_env(self):
+        env = {
+            "PERSISTY_SQL_POOL_SIZE": "3",
+            "PERSISTY_SQL_MAX_OVERFLOW": "2",
+            "PERSISTY_SQL_POOL_RECYCLE": "300",
+            "PERSISTY_SQL_POOL_PRE_PING": "true",
+            "PERSISTY_SQL_POOL_TIMEOUT": "1.5",
+            "PERSISTY_SQL_STATEMENT_TIMEOUT": "5000",
+        }
+        with patch.dict(os.environ, env):
+            config = SqlalchemyPoolConfig.from_env()
+        expected = SqlalchemyPoolConfig(3, 2, 300, True, 1.5, 5000)
+        self.assertEqual(expected, config)
+        self.assertEqual(
+            {
+                "pool_pre_ping": True,
+                "pool_recycle": 300,
+                "poolclass": InstrumentedQueuePool,
+                "pool_size": 3,
+                "max_overflow": 2,
+                "pool_timeout": 1.5,
+            },
+            config.get_engine_kwargs("postgresql://user@localhost/db"),
+        )
+        # In memory sqlite does not use a queue pool
+        self.assertEqual(
+            {"pool_pre_ping": True, "pool_recycle": 300},
+            config.get_engine_kwargs("sqlite+pysqlite:///:memory:"),
+        )
+
+    def test_echo_off_by_default(self):
+        with patch.dict(os.environ, {"SQL_ECHO": ""}):
+            self.assertFalse(SqlalchemyContextFactory().create().engine.echo)
+        with patch.dict(os.environ, {"SQL_ECHO": "1"}):
+            self.assertTrue(SqlalchemyContextFactory().create().engine.echo)
+
+    def test_pool_metrics(self):
+        with TemporaryDirectory() as tmp_dir:
+            engine = create_engine(
+                f"sqlite:///{tmp_dir}/test.db",
+                future=True,
+                poolclass=InstrumentedQueuePool,
+                pool_size=1,
+                max_overflow=1,
+                pool_timeout=0.01,
+            )
+            context = SqlalchemyContext(engine)
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                metrics = context.get_pool_metrics()
+                self.assertEqual(1, metrics.checked_out)
+                with engine.connect():
+                    self.assertEqual(2, context.get_pool_metrics().checked_out)
+                    with self.assertRaises(PoolTimeoutError):
+                        engine.connect()
+            metrics = context.get_pool_metrics()
+            engine.dispose()
+        self.assertEqual(0, metrics.checked_out)
+        self.assertEqual(2, metrics.checkouts)
+        self.assertEqual(1, metrics.overflow_events)
+        self.assertEqual(1, metrics.timeouts)
+        self.assertGreaterEqual(metrics.max_wait_seconds, 0)
+        self.assertGreaterEqual(metrics.total_wait_seconds, metrics.max_wait_seconds)
+
+    def test_no_metrics_for_uninstrumented_pool(self):
+        context = SqlalchemyContext.from_urn("sqlite+pysqlite:///:memory:")
+        self.assertIsNone(context.get_pool_metrics())
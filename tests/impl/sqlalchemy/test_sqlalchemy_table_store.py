@@ -1,14 +1,45 @@
-from typing import Iterator
+import dataclasses
+from tempfile import TemporaryDirectory
+from datetime import datetime, timezone, timedelta
+from typing import Iterator, List, Tuple, Optional
 from unittest import TestCase
+from uuid import UUID
 
 from marshy.types import ExternalItemType
+from sqlalchemy import (
+    MetaData,
+    String,
+    Text,
+    create_engine,
+    create_mock_engine,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSON as PostgresJson, UUID as PostgresUuid
 
+from persisty.impl.sqlalchemy.sqlalchemy_context import SqlalchemyContext
 from persisty.impl.sqlalchemy.sqlalchemy_context_factory import SqlalchemyContextFactory
+from persisty.impl.sqlalchemy.sqlalchemy_table_converter import SqlalchemyTableConverter
+from persisty.impl.sqlalchemy.sqlalchemy_table_store import (
+    SqlalchemyTableStore,
+    _to_copy_value,
+)
 from persisty.impl.sqlalchemy.sqlalchemy_table_store_factory import (
     SqlalchemyTableStoreFactory,
 )
+from persisty.attr.attr import Attr
+from persisty.attr.attr_filter_op import AttrFilterOp
+from persisty.attr.attr_type import AttrType
+from persisty.batch_edit import BatchEdit
+from persisty.key_config.attr_key_config import AttrKeyConfig
+from persisty.key_config.composite_key_config import CompositeKeyConfig
+from persisty.search_filter.filter_factory import filter_factory
+from persisty.search_filter.include_all import INCLUDE_ALL
+from persisty.search_filter.query_filter import QueryFilter
+from persisty.search_filter.search_filter_abc import SearchFilterABC
 from persisty.store.store_abc import StoreABC
 from persisty.store_meta import StoreMeta, get_meta
+from persisty.stored import stored
 from tests.fixtures.author import AUTHOR_DICTS, Author
 from tests.fixtures.book import Book, BOOK_DICTS
 from tests.fixtures.number_name import NumberName, NUMBER_NAMES
@@ -66,6 +97,478 @@ class TestSqlalchemyTableStore(TestCase, StoreTstABC):
         self.seed_table(store_meta, BOOK_DICTS)
         return store
 
+    def test_datetime_timezones(self):
+        store = self.new_number_name_store()
+        # Aware values are stored as UTC, and microseconds are retained
+        created_at = datetime(2020, 1, 2, 3, 4, 5, 6789, timezone(timedelta(hours=2)))
+        number_name = NUMBER_NAMES[0]
+        store.get_store().update(
+            NumberName(id=number_name.id, created_at=created_at, num_value=1)
+        )
+        loaded = store.read(str(number_name.id))
+        self.assertEqual(created_at, loaded.created_at)
+        self.assertEqual(timezone.utc, loaded.created_at.tzinfo)
+        filters = filter_factory(NumberName)
+        self.assertEqual(
+            [number_name.id],
+            [n.id for n in store.search_all(filters.created_at.eq(created_at))],
+        )
+
+    def test_session_rollback(self):
+        store = self.new_super_bowl_results_store()
+        count = store.count()
+        with self.assertRaises(ValueError):
+            with store.session():
+                store.delete("i")
+                self.assertEqual(count - 1, store.count())
+                raise ValueError()
+        self.assertEqual(count, store.count())
+        self.assertIsNotNone(store.read("i"))
+
+    def test_single_transaction_per_operation(self):
+        store = self.new_number_name_store()
+        transactions = []
+
+        def listener(conn):
+            transactions.append(conn)
+
+        event.listen(self.context.engine, "begin", listener)
+        try:
+            number_name = NUMBER_NAMES[0]
+            updated = store.update(NumberName(id=number_name.id, title="Updated"))
+            self.assertEqual("Updated", updated.title)
+            self.assertEqual(number_name.num_value, updated.num_value)
+            self.assertEqual(1, len(transactions))
+            edits = [
+                BatchEdit(update_item=NumberName(id=n.id, title=f"{n.title} Updated"))
+                for n in NUMBER_NAMES[1:4]
+            ] + [BatchEdit(delete_key=str(NUMBER_NAMES[4].id))]
+            results = store.edit_batch(edits)
+            self.assertTrue(all(r.success for r in results))
+            self.assertEqual(2, len(transactions))
+        finally:
+            event.remove(self.context.engine, "begin", listener)
+        self.assertEqual("Updated", store.read(str(number_name.id)).title)
+        self.assertIsNone(store.read(str(NUMBER_NAMES[4].id)))
+
+    def test_edit_batch_statements(self):
+        store = self.new_number_name_store()
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.context.engine, "before_cursor_execute", listener)
+        try:
+            edits = [
+                BatchEdit(update_item=NumberName(id=n.id, title=f"{n.title} Updated"))
+                for n in NUMBER_NAMES[:10]
+            ]
+            results = store.edit_batch(edits)
+            self.assertTrue(all(r.success for r in results))
+        finally:
+            event.remove(self.context.engine, "before_cursor_execute", listener)
+        # One select for the existing items, and one update for all edits
+        self.assertEqual(2, len(statements))
+        for number_name in NUMBER_NAMES[:10]:
+            loaded = store.read(str(number_name.id))
+            self.assertEqual(f"{number_name.title} Updated", loaded.title)
+            self.assertEqual(number_name.num_value, loaded.num_value)
+        self.assertEqual("Eleven", store.read(str(NUMBER_NAMES[10].id)).title)
+
+    def test_update_all_single_statement(self):
+        store = self.new_number_name_store()
+        filters = filter_factory(NumberName)
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.context.engine, "before_cursor_execute", listener)
+        try:
+            store.update_all(filters.num_value.gte(10), NumberName(title="Big"))
+            store.delete_all(filters.num_value.gte(50))
+        finally:
+            event.remove(self.context.engine, "before_cursor_execute", listener)
+        self.assertEqual(2, len(statements))
+        self.assertEqual(40, store.count(filters.title.eq("Big")))
+        self.assertEqual(49, store.count())
+        loaded = store.read(str(NUMBER_NAMES[10].id))
+        self.assertEqual("Big", loaded.title)
+        self.assertEqual(NUMBER_NAMES[10].created_at, loaded.created_at)
+        self.assertLess(NUMBER_NAMES[10].updated_at, loaded.updated_at)
+
+    def test_update_all_unhandled_filter(self):
+        store = self.new_number_name_store()
+        search_filter = EvenFilter() & filter_factory(NumberName).num_value.lt(10)
+        store.update_all(search_filter, NumberName(title="Even"))
+        even = store.search_all(filter_factory(NumberName).title.eq("Even"))
+        self.assertEqual([2, 4, 6, 8], sorted(n.num_value for n in even))
+        store.delete_all(search_filter)
+        self.assertEqual(95, store.count())
+
+    def test_key_statements_reused(self):
+        store = self.new_number_name_store().get_store()
+        keys = [str(n.id) for n in NUMBER_NAMES]
+        self.assertEqual(NUMBER_NAMES[:2], store.read_batch(keys[:2]))
+        stmt = store.__dict__["_read_batch_stmt"]
+        self.assertEqual(NUMBER_NAMES[5:10], store.read_batch(keys[5:10]))
+        self.assertIs(stmt, store.__dict__["_read_batch_stmt"])
+        self.assertEqual(NUMBER_NAMES[3], store.read(keys[3]))
+        self.assertEqual(NUMBER_NAMES[4], store.read(keys[4]))
+        self.assertIn("_read_stmt", store.__dict__)
+        results = store.edit_batch([BatchEdit(delete_key=k) for k in keys[:3]])
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual([None, None, None], store.read_batch(keys[:3]))
+        self.assertIn("_batch_delete_stmt", store.__dict__)
+
+    def test_composite_key_batch(self):
+        store = SqlalchemyTableStoreFactory(self.context, triggers=False).create(
+            get_meta(Reading)
+        )
+        readings = [
+            Reading(pk=pk, sk=sk, level=pk) for pk in range(3) for sk in range(3)
+        ]
+        for reading in readings:
+            store.create(reading)
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.context.engine, "before_cursor_execute", listener)
+        try:
+            key_config = store.get_meta().key_config
+            keys = [
+                key_config.to_key_str(Reading(pk=pk, sk=sk))
+                for pk, sk in ((1, 2), (0, 1), (2, 0), (3, 3))
+            ]
+            loaded = store.read_batch(keys)
+            self.assertEqual([readings[5], readings[1], readings[6], None], loaded)
+            results = store.edit_batch([BatchEdit(delete_key=k) for k in keys])
+        finally:
+            event.remove(self.context.engine, "before_cursor_execute", listener)
+        self.assertEqual([True, True, True, False], [r.success for r in results])
+        self.assertEqual(6, store.count())
+        self.assertEqual([None, None, None, None], store.read_batch(keys))
+        self.assertTrue(all(" OR " not in s for s in statements))
+        self.assertTrue(all("(reading.pk, reading.sk) IN" in s for s in statements))
+
+    def test_edit_batch_upsert_single_statement(self):
+        store = self.new_number_name_store()
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.context.engine, "before_cursor_execute", listener)
+        try:
+            edits = [
+                BatchEdit(
+                    upsert_item=NumberName(
+                        id=UUID(f"00000000-0000-0000-0000-{n:012d}"),
+                        title=f"Upserted {n}",
+                        num_value=n,
+                    )
+                )
+                for n in range(95, 105)
+            ]
+            results = store.edit_batch(edits)
+            self.assertTrue(all(r.success for r in results))
+        finally:
+            event.remove(self.context.engine, "before_cursor_execute", listener)
+        self.assertEqual(1, len(statements))
+        self.assertIn("ON CONFLICT", statements[0])
+        self.assertEqual(104, store.count())
+        loaded = store.read(str(NUMBER_NAMES[98].id))
+        self.assertEqual("Upserted 99", loaded.title)
+        # Values which may not be updated are retained
+        self.assertEqual(NUMBER_NAMES[98].created_at, loaded.created_at)
+
+    def test_upsert_single_statement(self):
+        store = self.new_number_name_store()
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.context.engine, "before_cursor_execute", listener)
+        try:
+            item = NumberName(id=NUMBER_NAMES[0].id, title="Nothing", num_value=0)
+            upserted = store.upsert(item)
+        finally:
+            event.remove(self.context.engine, "before_cursor_execute", listener)
+        self.assertEqual("Nothing", upserted.title)
+        self.assertIn("ON CONFLICT", statements[0])
+        self.assertTrue(all("ON CONFLICT" in s or "SELECT" in s for s in statements))
+
+    def test_update_reflects_database_changes(self):
+        store = self.new_super_bowl_results_store()
+        with self.context.engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TRIGGER exclaim AFTER UPDATE ON super_bowl_result BEGIN "
+                    "UPDATE super_bowl_result SET winner_code = NEW.winner_code || '!' "
+                    "WHERE code = NEW.code; END"
+                )
+            )
+        updated = store.update(SuperBowlResult(code="li", winner_code="robots"))
+        self.assertEqual("robots!", updated.winner_code)
+        self.assertEqual("atlanta", updated.runner_up_code)
+
+    def test_postgres_dialect(self):
+        engine = create_mock_engine("postgresql://", lambda *args, **kwargs: None)
+        store_meta = get_meta(Note)
+        note = Note(id=UUID(int=1), tags=["a", "b"])
+        # By default, the legacy mapping of JSON to Text and UUIDs to strings is retained
+        table, _ = SqlalchemyTableConverter(
+            engine, MetaData()
+        ).to_sqlalchemy_table_and_indexes(store_meta)
+        self.assertIsInstance(table.columns["id"].type, String)
+        self.assertIsInstance(table.columns["tags"].type, Text)
+        store = SqlalchemyTableStore(store_meta, table, engine)
+        self.assertEqual('["a", "b"]', store._dump(note, False)["tags"])
+        # Native types are opt in
+        table, _ = SqlalchemyTableConverter(
+            engine, MetaData(), native_postgres_types=True
+        ).to_sqlalchemy_table_and_indexes(store_meta)
+        self.assertIsInstance(table.columns["id"].type, PostgresUuid)
+        self.assertIsInstance(table.columns["tags"].type, PostgresJson)
+        store = SqlalchemyTableStore(store_meta, table, engine)
+        # The native JSON type serializes values itself, so they are not encoded as strings first
+        self.assertEqual(["a", "b"], store._dump(note, False)["tags"])
+
+    def test_create_reflects_generated_key(self):
+        store = SqlalchemyTableStoreFactory(self.context, triggers=False).create(
+            get_meta(Tally)
+        )
+        created = [store.create(Tally(title=t)) for t in ("a", "b")]
+        self.assertEqual([1, 2], [t.id for t in created])
+        self.assertEqual(created[1], store.read("2"))
+
+    def test_edit_all_without_copy_support(self):
+        store = self.new_number_name_store().get_store()
+        store = dataclasses.replace(store, copy_batch_size=2)
+        edits = [
+            BatchEdit(create_item=NumberName(title=str(n), num_value=n))
+            for n in range(100, 105)
+        ]
+        results = list(store.edit_all(edits))
+        self.assertTrue(all(r.success for r in results))
+        self.assertEqual(104, store.count())
+
+    def test_to_copy_value(self):
+        self.assertEqual("\\N", _to_copy_value(None))
+        self.assertEqual("t", _to_copy_value(True))
+        self.assertEqual("12", _to_copy_value(12))
+        self.assertEqual("a\\tb\\nc\\\\d", _to_copy_value("a\tb\nc\\d"))
+        self.assertEqual('{"a": [1]}', _to_copy_value({"a": [1]}))
+        self.assertEqual(
+            "2020-01-02T03:04:05", _to_copy_value(datetime(2020, 1, 2, 3, 4, 5))
+        )
+
+    def test_search_all_abandoned(self):
+        store = self.new_number_name_store()
+        items = store.search_all()
+        self.assertEqual(1, next(items).num_value)
+        items.close()
+        self.assertEqual(99, store.count())
+        # A stream abandoned after the database is closed can not release its connection, which is logged
+        items = store.search_all()
+        next(items)
+        self.context.engine.dispose()
+        logger_name = "persisty.impl.sqlalchemy.sqlalchemy_table_store"
+        with self.assertLogs(logger_name, "WARNING") as logs:
+            items.close()
+        self.assertIn("stream_close_failed", logs.output[0])
+
+    def test_update_all_delete_all_fallback_file_database(self):
+        with TemporaryDirectory() as tmp_dir:
+            engine = create_engine(
+                f"sqlite:///{tmp_dir}/test.db",
+                future=True,
+                connect_args={"timeout": 0.5},
+            )
+            try:
+                self.context = SqlalchemyContext(engine, developer_mode=True)
+                store = self.new_number_name_store()
+                # Items are read and edited on one connection, so the file is not locked
+                store.update_all(EvenFilter(), NumberName(title="Even"))
+                title = filter_factory(NumberName).title
+                self.assertEqual(49, store.count(title.eq("Even")))
+                store.delete_all(EvenFilter())
+                self.assertEqual(50, store.count())
+                self.assertEqual(0, store.count(title.eq("Even")))
+            finally:
+                engine.dispose()
+
+    def test_partial_filter_pushdown(self):
+        store = self.new_number_name_store()
+        search_filter = EvenFilter() & filter_factory(NumberName).num_value.lt(10)
+        where_clause, residue = store.get_store()._search_filter_to_where_clause(
+            search_filter
+        )
+        self.assertEqual("number_name.num_value < :num_value_1", str(where_clause))
+        self.assertIsInstance(residue, EvenFilter)
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(self.context.engine, "before_cursor_execute", listener)
+        try:
+            self.assertEqual(4, store.count(search_filter))
+            results = store.search(search_filter).results
+        finally:
+            event.remove(self.context.engine, "before_cursor_execute", listener)
+        self.assertEqual([2, 4, 6, 8], sorted(n.num_value for n in results))
+        self.assertEqual(2, len(statements))
+        self.assertTrue(all("num_value <" in s for s in statements))
+
+    def test_converted_filters(self):
+        store = SqlalchemyTableStoreFactory(self.context, triggers=False).create(
+            get_meta(Reading)
+        )
+        for pk in range(10):
+            store.create(Reading(pk=pk, sk=0, level=pk if pk % 3 else None))
+        filters = filter_factory(Reading)
+        one_of = filters.level.oneof([3, 5, 7])
+        self._check_converted_filters(
+            store,
+            [
+                one_of,
+                ~one_of & filters.level.lt(8),
+                filters.level.oneof([]),
+                filters.level.lt(3) | filters.level.gt(7),
+                ~filters.level.exists(None),
+            ],
+        )
+
+    def test_converted_str_filters(self):
+        store = self.new_number_name_store()
+        filters = filter_factory(NumberName)
+        store.create(NumberName(title="100%", num_value=100))
+        self._check_converted_filters(
+            store,
+            [QueryFilter("Ninety"), filters.title.contains("0%"), QueryFilter("_")],
+        )
+
+    def _check_converted_filters(self, store, search_filters):
+        attrs = store.get_meta().attrs
+        items = list(store.search_all())
+        for search_filter in search_filters:
+            locked_filter = search_filter.lock_attrs(attrs)
+            where_clause, residue = store.get_store()._search_filter_to_where_clause(
+                search_filter
+            )
+            self.assertIsNotNone(where_clause)
+            self.assertIs(INCLUDE_ALL, residue)
+            expected = [i for i in items if locked_filter.match(i, attrs)]
+            self.assertEqual(expected, list(store.search_all(search_filter)))
+            self.assertEqual(len(expected), store.count(search_filter))
+
+    def test_unhandled_sub_filters(self):
+        store = self.new_number_name_store()
+        filters = filter_factory(NumberName)
+        search_filters = [
+            ~(EvenFilter() & filters.num_value.lt(10)),
+            EvenFilter() | filters.num_value.lt(10),
+        ]
+        for search_filter in search_filters:
+            where_clause, residue = store.get_store()._search_filter_to_where_clause(
+                search_filter
+            )
+            self.assertIsNone(where_clause)
+            expected = [
+                n
+                for n in NUMBER_NAMES
+                if search_filter.match(n, store.get_meta().attrs)
+            ]
+            results = list(store.search_all(search_filter))
+            self.assertEqual(expected, sorted(results, key=lambda n: n.num_value))
+            self.assertEqual(len(expected), store.count(search_filter))
+
+    def test_search_all_streams_results(self):
+        store = self.new_number_name_store()
+        execution_options = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            execution_options.append(context.execution_options)
+
+        event.listen(self.context.engine, "before_cursor_execute", listener)
+        try:
+            results = store.search_all(
+                search_order=filter_factory(NumberName).num_value.asc()
+            )
+            self.assertEqual(NUMBER_NAMES, list(results))
+        finally:
+            event.remove(self.context.engine, "before_cursor_execute", listener)
+        self.assertEqual(1, len(execution_options))
+        self.assertTrue(execution_options[0]["stream_results"])
+
+    def test_keyset_paging(self):
+        store = SqlalchemyTableStoreFactory(self.context, triggers=False).create(
+            get_meta(Reading)
+        )
+        readings = [
+            Reading(pk=pk, sk=sk, level=None if (pk + sk) % 5 == 0 else (pk * sk) % 4)
+            for pk in range(4)
+            for sk in range(6)
+        ]
+        for reading in readings:
+            store.create(reading)
+        order_factory = filter_factory(Reading).level
+        for search_order, desc in (
+            (order_factory.asc(), 1),
+            (order_factory.desc(), -1),
+        ):
+            statements = []
+
+            def listener(conn, cursor, statement, parameters, context, executemany):
+                statements.append((statement, parameters))
+
+            event.listen(self.context.engine, "before_cursor_execute", listener)
+            try:
+                results = []
+                page_key = None
+                while True:
+                    result_set = store.search(
+                        search_order=search_order, page_key=page_key, limit=5
+                    )
+                    results.extend(result_set.results)
+                    page_key = result_set.next_page_key
+                    if not page_key:
+                        break
+            finally:
+                event.remove(self.context.engine, "before_cursor_execute", listener)
+            expected = sorted(
+                readings,
+                key=lambda r: (
+                    r.level is None,
+                    (r.level or 0) * desc,
+                    r.pk * desc,
+                    r.sk * desc,
+                ),
+            )
+            self.assertEqual(expected, results)
+            # sqlite always renders an OFFSET along with a LIMIT, but it should never skip rows
+            offsets = [p[-1] for s, p in statements if "OFFSET" in s]
+            self.assertEqual([0] * len(offsets), offsets)
+
+    def test_keyset_paging_composite_key(self):
+        store = SqlalchemyTableStoreFactory(self.context, triggers=False).create(
+            get_meta(Reading)
+        )
+        readings = [
+            Reading(pk=pk, sk=sk, level=None) for pk in range(3) for sk in range(3)
+        ]
+        for reading in readings:
+            store.create(reading)
+        result_set = store.search(limit=4)
+        self.assertEqual(readings[:4], result_set.results)
+        result_set = store.search(page_key=result_set.next_page_key, limit=4)
+        self.assertEqual(readings[4:8], result_set.results)
+
     def seed_table(self, store_meta: StoreMeta, items: Iterator[ExternalItemType]):
         table = self.context.get_table(store_meta)
         with self.context.engine.begin() as conn:
@@ -73,3 +576,38 @@ class TestSqlalchemyTableStore(TestCase, StoreTstABC):
             for item in items:
                 conn.execute(stmt, item)
             conn.commit()
+
+
+class EvenFilter(SearchFilterABC):
+    """Filter which can not be converted to sql"""
+
+    def lock_attrs(self, attrs: Tuple[Attr, ...]) -> SearchFilterABC:
+        return self
+
+    def match(self, item, attrs: Tuple[Attr, ...]) -> bool:
+        return item.num_value % 2 == 0
+
+
+@stored(
+    key_config=CompositeKeyConfig(
+        (AttrKeyConfig("pk", AttrType.INT), AttrKeyConfig("sk", AttrType.INT))
+    ),
+)
+class Reading:
+    pk: int
+    sk: int
+    level: Optional[int] = Attr(sortable=True, permitted_filter_ops=tuple(AttrFilterOp))
+
+
+@stored
+class Tally:
+    """Stored type with a key generated by the database"""
+
+    id: Optional[int] = None
+    title: str = ""
+
+
+@stored
+class Note:
+    id: UUID
+    tags: List[str]
@@ -30,6 +30,35 @@ class TestAttrFilter(TestCase):
         attr_filter = AttrFilter("bar", AttrFilterOp.lt, "zap")
         self.assertFalse(attr_filter.match(FooBar(10, uuid4())))
 
+    def test_compile(self):
+        items = [
+            FooBar(10, "zapbang"),
+            FooBar(11, "ZOPBANG"),
+            FooBar(None, "bang"),
+            FooBar(12, None),
+            FooBar(13, uuid4()),
+        ]
+        values = {
+            AttrFilterOp.contains: "PBA",
+            AttrFilterOp.endswith: "BANG",
+            AttrFilterOp.oneof: ["bang", "zapbang"],
+            AttrFilterOp.startswith: "zap",
+        }
+        for op in AttrFilterOp:
+            for name in ("foo", "bar"):
+                value = values.get(op, 11 if name == "foo" else "zop")
+                attr_filter = AttrFilter(name, op, value)
+                search_filters = (attr_filter, ~attr_filter, attr_filter & ~attr_filter)
+                search_filters += (
+                    attr_filter | AttrFilter("foo", AttrFilterOp.eq, 10),
+                )
+                for search_filter in search_filters:
+                    match = search_filter.compile(tuple())
+                    for item in items:
+                        self.assertEqual(
+                            search_filter.match(item, tuple()), match(item)
+                        )
+
     def test_build_filter_expression_starts_with(self):
         attr_filter = AttrFilter("foo", AttrFilterOp.startswith, "bar")
         filter_expression, handled = attr_filter.build_filter_expression(tuple())
@@ -4,6 +4,7 @@ from uuid import UUID
 
 from servey.security.authorization import Authorization
 
+from persisty.batch_edit import BatchEdit
 from persisty.impl.mem.mem_store import MemStore
 from persisty.security.owned_store_security import OwnedStoreSecurity
 from persisty.store_meta import get_meta
@@ -40,6 +41,27 @@ class TestOwnedStoreFactory(TestCase):
         msg_2_read = subject_2_store.read(msg_2.id)
         self.assertEqual(msg_2, msg_2_read)
 
+    def test_upsert_owned_by_other(self):
+        meta = get_meta(Message)
+        subject_1 = Authorization("subject-1", frozenset(), None, None)
+        subject_2 = Authorization("subject-2", frozenset(), None, None)
+        unsecured_store = MemStore(meta)
+        subject_1_store = meta.store_security.get_secured(unsecured_store, subject_1)
+        subject_2_store = meta.store_security.get_secured(unsecured_store, subject_2)
+        msg = subject_2_store.create(
+            Message(id=UUID("078709c0-0a7c-4a06-9599-b52511a6afa8"), text="Original")
+        )
+        upsert = Message(id=msg.id, text="Overwritten")
+        self.assertIsNone(subject_1_store.upsert(dataclasses.replace(upsert)))
+        results = subject_1_store.edit_batch(
+            [BatchEdit(upsert_item=dataclasses.replace(upsert))]
+        )
+        self.assertFalse(results[0].success)
+        self.assertEqual(msg, subject_2_store.read(msg.id))
+        upserted = subject_2_store.upsert(dataclasses.replace(upsert))
+        self.assertEqual("Overwritten", upserted.text)
+        self.assertEqual("subject-2", upserted.owner)
+
     def test_create_actions(self):
         meta = get_meta(Message)
         actions = meta.action_factory.create_actions(meta)
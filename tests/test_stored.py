@@ -2,6 +2,8 @@ import math
 from unittest import TestCase
 
 from persisty.errors import PersistyError
+from persisty.impl.mem.mem_store import MemStore
+from persisty.store_meta import get_meta
 from persisty.stored import stored
 
 
@@ -23,6 +25,13 @@ class Vector3D(Vector2D):
         return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
 
 
+@stored(slots=True)
+class SlottedVector2D:
+    id: int
+    x: float
+    y: float
+
+
 class TestFunctionsOnStored(TestCase):
     def test_function_on_stored(self):
         vector = Vector2D(x=3, y=4)
@@ -42,3 +51,22 @@ class TestFunctionsOnStored(TestCase):
                 @property
                 def properties_are_not_allowed(self) -> str:
                     return "nope"
+
+    def test_slots_on_stored(self):
+        vector = SlottedVector2D(id=1, x=3, y=4)
+        self.assertFalse(hasattr(vector, "__dict__"))
+        self.assertEqual(SlottedVector2D(id=1, x=3, y=4), vector)
+        self.assertNotEqual(SlottedVector2D(id=1, x=3, y=5), vector)
+        self.assertEqual(hash(SlottedVector2D(id=1, x=3, y=5)), hash(vector))
+        self.assertEqual({vector}, {SlottedVector2D(id=1, x=3, y=4)})
+        with self.assertRaises(AttributeError):
+            vector.z = 5
+
+    def test_slots_in_store(self):
+        meta = get_meta(SlottedVector2D)
+        self.assertTrue(meta.slots)
+        store = MemStore(meta)
+        store.create(SlottedVector2D(id=1, x=3, y=4))
+        store.update(SlottedVector2D(id=1, y=5))
+        self.assertEqual(SlottedVector2D(id=1, x=3, y=5), store.read("1"))
+        self.assertFalse(hasattr(store.items["1"], "__dict__"))
@@ -0,0 +1,14 @@
+from unittest import TestCase
+
+from persisty.util.codegen import compile_function
+
+
+class TestCodegen(TestCase):
+    def test_compile_function(self):
+        fn = compile_function(
+            "add_offset",
+            ["def add_offset(value):", "    return value + offset"],
+            {"offset": 3},
+        )
+        self.assertEqual(5, fn(2))
+        self.assertEqual("add_offset", fn.__name__)